@@ -0,0 +1,346 @@
+"""
+ICS3U
+Paul Chen
+This file holds the agents, which are bots that play Dungeon Escape through the real game loop.
+An agent makes a decision at each choice point in the game: the difficulty, the room to go to, whether to
+drink the witch's potion and what to type for each sequence in a battle. `AgentKeyboard` answers the menus in
+`main.py` and keeps a clock that only moves when the agent waits or types, and `AgentInterface` hands the
+choice points of the game to the agent, so no terminal is needed and thousands of games can be played in one
+process.
+"""
+
+from abc import ABC, abstractmethod
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from math import inf, nextafter
+from random import choice, randint, random, uniform
+from string import ascii_lowercase
+from os import devnull
+from time import perf_counter
+from interface import CHOICE_PROMPT, Interface
+from keyboard import Keyboard
+from main import run
+from simulate import TypingModel
+
+
+class Agent(ABC):
+    """Class that decides what a bot does at each choice point. This is the parent class of the built-in
+    agents, and other agents have to override the abstract methods below.
+
+    Attributes:
+        difficulty (int): the difficulty the agent plays on. It is a number from 1 to 3.
+        hints (bool): True if the agent asks for a hint before choosing each room else False.
+    """
+    def __init__(self, difficulty=1, hints=False):
+        """
+        Inits agent class.
+        Args
+            difficulty (int): the difficulty the agent plays on. It is a number from 1 to 3.
+            hints (bool): True if the agent asks for a hint before choosing each room else False.
+        """
+        self.difficulty = difficulty
+        self.hints = hints
+
+    def select_difficulty(self) -> int:
+        """
+        Chooses the difficulty at the start of a game.
+        Args
+            None
+        Returns
+            int: 1 if easy, 2 if medium, 3 if hard.
+        """
+        return self.difficulty
+
+    @abstractmethod
+    def choose_room(self, rooms: list, hint: str) -> int:
+        """
+        Chooses the room to go to next.
+        Args
+            rooms (list[str]): the names of the rooms that can be gone to, in the order they are listed.
+            hint (str): the name of the room that the hint says to go to, or None if the agent doesn't use hints.
+        Returns
+            int: the number of the room, starting from 1.
+        """
+
+    @abstractmethod
+    def drink_potion(self, hp: int) -> bool:
+        """
+        Chooses whether to drink the potion in the witch's hut.
+        Args
+            hp (int): the player's HP.
+        Returns
+            bool: True to drink the potion else False.
+        """
+
+    @abstractmethod
+    def type_challenge(self, challenge: str, tm: float) -> tuple:
+        """
+        Types one sequence in a battle.
+        Args
+            challenge (str): the sequence to type.
+            tm (float): the number of seconds left in the attack.
+        Returns
+            tuple[str, float]: what was typed and the number of seconds it took. If it took longer than `tm`,
+            the input times out.
+        """
+
+
+class RandomAgent(Agent):
+    """Agent that does everything at random, including mashing the keys in battles. It almost never wins,
+    which makes it good at finding the paths through the game that a real player rarely takes.
+    Inherits from `Agent`.
+
+    Attributes:
+        drink (float): the chance of drinking the potion.
+        speed (float): the most seconds it takes to mash out a sequence.
+    """
+    def __init__(self, difficulty=1, drink=0.5, speed=2.0):
+        """
+        Inits random agent class.
+        Args
+            difficulty (int): the difficulty the agent plays on. It is a number from 1 to 3.
+            drink (float): the chance of drinking the potion.
+            speed (float): the most seconds it takes to mash out a sequence.
+        """
+        super().__init__(difficulty)
+        self.drink = drink
+        self.speed = speed
+
+    def choose_room(self, rooms: list, hint: str) -> int:
+        return randint(1, len(rooms))
+
+    def drink_potion(self, hp: int) -> bool:
+        return random() < self.drink
+
+    def type_challenge(self, challenge: str, tm: float) -> tuple:
+        return "".join(choice(ascii_lowercase) for c in challenge), uniform(0.1, self.speed)
+
+
+class GreedyAgent(Agent):
+    """Agent that asks for a hint at every room and goes where it says, only drinks the potion when it can't
+    die from it, and types every sequence correctly at a steady speed. Inherits from `Agent`.
+
+    Attributes:
+        seconds (float): the number of seconds it takes to type a sequence.
+        safe (int): the HP above which the potion can't kill the player.
+    """
+    def __init__(self, difficulty=1, seconds=1.0, safe=10):
+        """
+        Inits greedy agent class.
+        Args
+            difficulty (int): the difficulty the agent plays on. It is a number from 1 to 3.
+            seconds (float): the number of seconds it takes to type a sequence.
+            safe (int): the HP above which the potion can't kill the player.
+        """
+        super().__init__(difficulty, hints=True)
+        self.seconds = seconds
+        self.safe = safe
+
+    def choose_room(self, rooms: list, hint: str) -> int:
+        return rooms.index(hint) + 1 if hint in rooms else 1
+
+    def drink_potion(self, hp: int) -> bool:
+        return hp > self.safe
+
+    def type_challenge(self, challenge: str, tm: float) -> tuple:
+        return challenge, self.seconds
+
+
+class TypingAgent(Agent):
+    """Agent that wanders the dungeon at random and types like a person, using the simulator's
+    `TypingModel`: each sequence takes a reaction time plus one keystroke per character and the enter key, with
+    some jitter, and has a small chance of a typo. Inherits from `Agent`.
+
+    Attributes:
+        model (TypingModel): how quickly and how accurately the agent types.
+        drink (float): the chance of drinking the potion.
+    """
+    def __init__(self, difficulty=1, cps=5.0, reaction=0.4, accuracy=0.95, jitter=0.2, drink=0.5):
+        """
+        Inits typing agent class.
+        Args
+            difficulty (int): the difficulty the agent plays on. It is a number from 1 to 3.
+            cps (float): the number of characters typed per second.
+            reaction (float): the number of seconds it takes to read a new sequence.
+            accuracy (float): the chance that a sequence is typed without any mistakes.
+            jitter (float): the standard deviation of the time for each sequence, as a fraction of the mean.
+            drink (float): the chance of drinking the potion.
+        """
+        super().__init__(difficulty)
+        self.model = TypingModel(cps, reaction, accuracy, jitter)
+        self.drink = drink
+
+    def choose_room(self, rooms: list, hint: str) -> int:
+        return randint(1, len(rooms))
+
+    def drink_potion(self, hp: int) -> bool:
+        return random() < self.drink
+
+    def type_challenge(self, challenge: str, tm: float) -> tuple:
+        seconds = self.model.seconds(len(challenge))
+        if self.model.correct():
+            return challenge, seconds
+        i = randint(0, len(challenge) - 1) # Swaps one letter for a wrong one.
+        return challenge[:i] + choice(ascii_lowercase.replace(challenge[i], "")) + challenge[i + 1:], seconds
+
+
+class AgentKeyboard(Keyboard):
+    """Keyboard that answers the menus for an agent. It plays a number of games and then quits. The clock
+    only moves when the game pauses or the agent types. Inherits from `Keyboard`.
+
+    Attributes:
+        agent (Agent): the agent.
+        games (int): the number of games to play.
+        played (int): the number of games started so far.
+        now (float): the time in seconds.
+    """
+    def __init__(self, agent, games):
+        """
+        Inits agent keyboard class.
+        Args
+            agent (Agent): the agent.
+            games (int): the number of games to play.
+        """
+        self.agent = agent
+        self.games = games
+        self.played = 0
+        self.now = 0.0
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        if prompt != CHOICE_PROMPT: # Type anything to continue...
+            return "", False
+        if self.played < self.games: # Main menu, play another game.
+            self.played += 1
+            return "1", False
+        return "3", False
+
+    def pause(self, tm) -> None:
+        # Always moves the clock, even if `tm` is too small to change it, so a battle can't get stuck.
+        if tm > 0:
+            self.now = max(self.now + tm, nextafter(self.now, inf))
+
+    def clock(self) -> float:
+        return self.now
+
+
+class AgentInterface(Interface):
+    """Interface that hands the choice points of the game to an agent instead of asking the player. The history
+    is still kept, but nothing is drawn. Any other question is answered by the keyboard. Inherits from `Interface`.
+
+    Attributes:
+        agent (Agent): the agent.
+    """
+    def __init__(self, keyboard):
+        """
+        Inits agent interface class.
+        Args
+            keyboard (AgentKeyboard): the keyboard that holds the agent and the clock.
+        """
+        self.agent = keyboard.agent
+        super().__init__(keyboard)
+        self.show_map = False
+
+    def write(self, text) -> None:
+        pass
+
+    def render(self) -> None:
+        pass
+
+    def select_difficulty(self) -> int:
+        return self.agent.select_difficulty()
+
+    def choose_room(self, rooms, hint) -> "Location":
+        nxt = hint()[1].name if self.agent.hints else None # The route is only planned if it is used.
+        return rooms[self.agent.choose_room([room.name for room in rooms], nxt) - 1]
+
+    def drink_potion(self, hp) -> bool:
+        return self.agent.drink_potion(hp)
+
+    def type_challenge(self, challenge, tm) -> tuple:
+        typed, seconds = self.agent.type_challenge(challenge, tm)
+        timed_out = seconds >= tm
+        if timed_out: # Only part of the sequence was typed in time.
+            typed = typed[:int(len(typed) * tm / seconds)]
+        self.keyboard.pause(min(seconds, tm))
+        self.push(typed, delay=False)
+        return typed, timed_out
+
+
+class Results:
+    """Class that collects the finished games. Its `add()` is passed to `run()` as the `on_game_over` hook.
+
+    Attributes:
+        games (list[tuple[bool, int, int, int, float]]): whether each game was won, the HP left,
+        the battles fought, the hits landed and how long it took.
+    """
+    def __init__(self):
+        """
+        Inits results class.
+        """
+        self.games = []
+
+    def add(self, player) -> None:
+        """
+        Adds a finished game.
+        Args
+            player (Player): the player at the end of the game.
+        Returns
+            None
+        """
+        self.games.append((player.won, player.hp, player.battles, player.hits, player.seconds))
+
+
+def play_games(agent, games: int, rooms=0, seed=None) -> list:
+    """
+    Has an agent play games through the menus and game loop in `main.py`.
+    Args
+        agent (Agent): the agent.
+        games (int): the number of games to play.
+        rooms (int): the number of rooms in a procedurally generated dungeon, or 0 for the normal dungeon.
+        seed (int): the seed for the random number generators, or None for a random seed.
+    Returns
+        list[tuple[bool, int, int, int, float]]: whether each game was won, the HP left, the battles fought,
+        the hits landed and how long it took.
+    """
+    results = Results()
+    with open(devnull, "w") as out, redirect_stdout(out): # Throws away the logo and menus.
+        run(AgentKeyboard(agent, games), rooms, seed, AgentInterface, on_game_over=results.add)
+    return results.games
+
+
+# The built-in agents, keyed by the name used on the command line.
+AGENTS = {"random": RandomAgent, "greedy": GreedyAgent, "typing": TypingAgent}
+
+
+def main() -> None:
+    """
+    Entry point for the agents. Plays games with an agent and prints how it did.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Plays Dungeon Escape with a bot.")
+    parser.add_argument("agent", choices=list(AGENTS), help="the agent to play with")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--difficulty", type=int, choices=[1, 2, 3], default=1, help="difficulty to play on")
+    parser.add_argument("--rooms", type=int, default=0,
+                        help="play in a procedurally generated dungeon with this many rooms")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random number generator")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    games = play_games(AGENTS[args.agent](args.difficulty), args.games, args.rooms, args.seed)
+    elapsed = perf_counter() - start
+
+    wins = [game for game in games if game[0]]
+    print(f"{'Games':>8}{'Win rate':>10}{'Avg HP':>8}{'Battles':>9}{'Hits':>8}{'Game min':>10}{'Games/s':>9}")
+    print(f"{len(games):>8}{len(wins) / max(len(games), 1):>10.2%}"
+          f"{sum(game[1] for game in wins) / max(len(wins), 1):>8.1f}"
+          f"{sum(game[2] for game in games) / max(len(games), 1):>9.1f}"
+          f"{sum(game[3] for game in games) / max(len(games), 1):>8.1f}"
+          f"{sum(game[4] for game in games) / max(len(games), 1) / 60:>10.1f}{len(games) / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
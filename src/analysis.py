@@ -0,0 +1,310 @@
+"""
+ICS3U
+Paul Chen
+This file holds the battle solver, which works out the exact chance of the player surviving a room or a route
+through the dungeon. Instead of playing games, it keeps the probability of every possible amount of player HP
+and moves it through each round of a battle with NumPy.
+"""
+
+from argparse import ArgumentParser
+from itertools import groupby
+from random import seed
+import numpy as np
+from content import CONTENT
+from locations import World, generate_enemies, generate_graph
+from simulate import RandomWalk, SimPlayer, TypingModel
+
+# The most HP that the player can have.
+MAX_HP = 80
+
+
+def typing_hits(model, tl: float, samples=20000) -> dict:
+    """
+    Estimates the distribution of the number of hits in one attack from a typing model.
+    Args
+        model (callable): the typing model, which takes the sequence length and time limit and returns the hits.
+        tl (float): the time limit for each attack.
+        samples (int): the number of attacks to sample for each sequence length.
+    Returns
+        dict[int, np.ndarray]: the chance of each number of hits, keyed by the sequence length (1 to 5).
+    """
+    hits = {}
+    for seq_len in range(1, 6):
+        counts = np.bincount([model(seq_len, tl) for i in range(samples)])
+        hits[seq_len] = counts / samples
+    return hits
+
+
+def fight(hp: np.ndarray, enemy, atk: int, hits: dict, tol=1e-12, max_rounds=1000) -> np.ndarray:
+    """
+    Works out the player's HP after fighting one enemy, the same way as `Location.battle`.
+    The state is a matrix with the chance of every pair of player HP and enemy HP. Each attack moves
+    the chances along one side of the matrix by every possible amount of damage.
+    Args
+        hp (np.ndarray): the chance of each amount of player HP before the fight. Index 0 is the chance of being dead.
+        enemy (EnemyType): the enemy.
+        atk (int): the player's ATK.
+        hits (dict[int, np.ndarray]): the chance of each number of hits, keyed by the sequence length.
+        tol (float): the fight stops when the chance of it still going is less than this.
+        max_rounds (int): the most rounds to work out. Fights that are still going after this count as losses.
+    Returns
+        np.ndarray: the chance of each amount of player HP after the fight.
+    """
+    size = len(hp)
+    enemy_hp = enemy.hp
+    player_hits = hits[enemy.difficulty]
+    lo, hi = enemy.num_hits
+    enemy_dmg = [(h * enemy.atk, 1 / (hi - lo + 1)) for h in range(lo, hi + 1)]
+
+    out = np.zeros(size)
+    out[0] = hp[0]
+    state = np.zeros((size, enemy_hp + 1)) # state[player HP, enemy HP]
+    state[1:, enemy_hp] = hp[1:]
+
+    for i in range(max_rounds):
+        # The player's attack lowers the enemy's HP.
+        new = np.zeros_like(state)
+        for k, chance in enumerate(player_hits):
+            dmg = k * atk
+            if chance == 0:
+                continue
+            if dmg == 0:
+                new += chance * state
+            else:
+                new[:, 0] += chance * state[:, :dmg + 1].sum(axis=1)
+                if dmg < enemy_hp:
+                    new[:, 1:enemy_hp + 1 - dmg] += chance * state[:, dmg + 1:]
+        state = new
+
+        # The enemy has been defeated.
+        out[1:] += state[1:, 0]
+        state[:, 0] = 0
+
+        # The enemy's attack lowers the player's HP.
+        new = np.zeros_like(state)
+        for dmg, chance in enemy_dmg:
+            new[0, :] += chance * state[:dmg + 1, :].sum(axis=0)
+            if dmg < size - 1:
+                new[1:size - dmg, :] += chance * state[dmg + 1:, :]
+        state = new
+
+        # The player has died.
+        out[0] += state[0, :].sum()
+        state[0, :] = 0
+        if state.sum() < tol:
+            break
+    out[0] += state.sum()
+    return out
+
+
+def battle(state: dict, enemies: list, hits: dict) -> dict:
+    """
+    Works out the player's HP and ATK after fighting a stack of enemies. The last enemy is fought first.
+    Args
+        state (dict[int, np.ndarray]): the chance of each amount of HP, keyed by the player's ATK.
+        enemies (list[EnemyType]): the enemies in the room.
+        hits (dict[int, np.ndarray]): the chance of each number of hits, keyed by the sequence length.
+    Returns
+        dict[int, np.ndarray]: the chance of each amount of HP after the battle, keyed by the player's ATK.
+    """
+    out = {}
+    for atk, hp in state.items():
+        for enemy in reversed(enemies):
+            hp = fight(hp, enemy, atk, hits)
+        out[atk] = hp
+    return out
+
+
+def change_hp(hp: np.ndarray, changes: list) -> np.ndarray:
+    """
+    Changes the HP of a living player by a random amount, capped between 0 and `MAX_HP`.
+    Args
+        hp (np.ndarray): the chance of each amount of HP.
+        changes (list[tuple[int, float]]): each change and its chance.
+    Returns
+        np.ndarray: the chance of each amount of HP after the change.
+    """
+    out = np.zeros_like(hp)
+    out[0] = hp[0]
+    alive = np.arange(1, len(hp))
+    for change, chance in changes:
+        np.add.at(out, np.clip(alive + change, 0, MAX_HP), chance * hp[1:])
+    return out
+
+
+def room_effect(state: dict, behaviour: str, drink: bool) -> dict:
+    """
+    Works out the player's HP and ATK after `on_battle_finish` runs the first time the player clears a room.
+    Args
+        state (dict[int, np.ndarray]): the chance of each amount of HP, keyed by the player's ATK.
+        behaviour (str): the name of the `Location` class that runs the room.
+        drink (bool): True if the player drinks the potion in the witch's hut else False.
+    Returns
+        dict[int, np.ndarray]: the chance of each amount of HP after the room, keyed by the player's ATK.
+    """
+    if behaviour == "Armoury":
+        return {atk + 2: hp for atk, hp in state.items()}
+    if behaviour == "Hospital":
+        return {atk: change_hp(hp, [(20, 1.0)]) for atk, hp in state.items()}
+    if behaviour == "WitchsHut" and drink:
+        # Half the time the HP changes by -10 to 15, the other half the ATK changes by -1 to 2.
+        out = {}
+        for atk, hp in state.items():
+            out[atk] = out.get(atk, 0) + change_hp(hp, [(c, 0.5 / 26) for c in range(-10, 16)])
+            for c in range(-1, 3):
+                new_atk = max(0, atk + c)
+                alive = hp.copy()
+                alive[0] = 0 # Dead players were already counted above.
+                out[new_atk] = out.get(new_atk, 0) + 0.125 * alive
+        return out
+    return state
+
+
+def enemy_stacks(room_type, difficulty: int) -> list:
+    """
+    Lists every stack of enemies that `generate_room_enemies()` can put in a room and the chance of each.
+    Args
+        room_type (RoomType): the room.
+        difficulty (int): the player's difficulty, which is 4, 8 or 12.
+    Returns
+        list[tuple[float, tuple[EnemyType]]]: each stack of enemies and its chance.
+    """
+    stacks = []
+
+    def grow(stack, room_diff, chance):
+        if not room_type.possible_enemies or room_diff >= difficulty or len(stack) >= 4:
+            stacks.append((chance, stack))
+            return
+        for e in room_type.possible_enemies:
+            grow(stack + (e,), room_diff + e.difficulty, chance / len(room_type.possible_enemies))
+
+    grow(room_type.enemies, 0, 1.0)
+    return stacks
+
+
+def room_outcome(room_type, diff: int, hits: dict, atk=6, hp=MAX_HP) -> np.ndarray:
+    """
+    Works out the chance of each amount of HP after the battle in a room, over every stack of enemies it can have.
+    Args
+        room_type (RoomType): the room.
+        diff (int): the difficulty chosen by the player. It is a number from 1 to 3.
+        hits (dict[int, np.ndarray]): the chance of each number of hits, keyed by the sequence length.
+        atk (int): the player's ATK.
+        hp (int): the player's HP when entering the room.
+    Returns
+        np.ndarray: the chance of each amount of HP. Index 0 is the chance of dying.
+    """
+    start = np.zeros(MAX_HP + 1)
+    start[hp] = 1.0
+    out = np.zeros(MAX_HP + 1)
+    for chance, stack in enemy_stacks(room_type, diff * 4):
+        out += chance * battle({atk: start}, list(stack), hits)[atk]
+    return out
+
+
+def route_outcome(world: World, route: list, hits: dict, drink=False) -> np.ndarray:
+    """
+    Works out the chance of each amount of HP at the end of a route through a world's dungeon.
+    Battles and room effects only happen the first time a room is entered. The final room of
+    the route is fought again if it is the entrance, which is where the dragon is.
+    Args
+        world (World): the game, after its enemies and rooms have been generated.
+        route (list[Location]): the rooms in the order they are entered.
+        hits (dict[int, np.ndarray]): the chance of each number of hits, keyed by the sequence length.
+        drink (bool): True if the player drinks the potion in the witch's hut else False.
+    Returns
+        np.ndarray: the chance of each amount of HP. Index 0 is the chance of dying.
+    """
+    state = {world.player.atk: np.zeros(MAX_HP + 1)}
+    state[world.player.atk][world.player.hp] = 1.0
+    seen = set()
+    for room in route:
+        if room in seen:
+            if room is world["Entrance"]:
+                state = battle(state, [world.content.enemy("Dragon")], hits)
+            continue
+        seen.add(room)
+        state = battle(state, room.enemies, hits)
+        state = room_effect(state, room.type.behaviour, drink)
+    return sum(state.values())
+
+
+def winning_route(world: World) -> list:
+    """
+    Finds the shortest route that collects the key and the treasure and returns to the entrance.
+    Args
+        world (World): the game, after its rooms have been generated.
+    Returns
+        list[Location]: the rooms in the order they are entered.
+    """
+    # Finds each room's parent in the tree under the hall.
+    hall = world["Hall"]
+    parent = {hall: None}
+    order = [hall]
+    for room in order:
+        for nxt in room.rooms:
+            if nxt not in parent and nxt is not world["Stairway"]:
+                parent[nxt] = room
+                order.append(nxt)
+
+    # The rooms that have to be visited are the ones between the hall and the prison or the treasure room.
+    needed = set()
+    for goal in [world["Prison"], world["TreasureRoom"]]:
+        while goal is not None:
+            needed.add(goal)
+            goal = parent[goal]
+
+    # Walks through the needed rooms depth first, going back through each room on the way out.
+    route = []
+
+    def walk(room):
+        route.append(room)
+        for nxt in room.rooms:
+            if nxt in needed and parent.get(nxt) is room:
+                walk(nxt)
+                route.append(room)
+
+    walk(hall)
+    return [world["Entrance"], world["Stairway"]] + route + [world["Stairway"], world["Entrance"]]
+
+
+def main() -> None:
+    """
+    Entry point for the battle solver. Prints the chance of surviving each room on each difficulty,
+    and the chance of winning along the shortest winning route of a random dungeon.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Works out the exact chance of surviving each room in Dungeon Escape.")
+    parser.add_argument("--cps", type=float, default=5.0, help="characters typed per second")
+    parser.add_argument("--reaction", type=float, default=0.4, help="seconds to read a sequence")
+    parser.add_argument("--accuracy", type=float, default=0.95, help="chance of typing a sequence correctly")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random dungeon")
+    args = parser.parse_args()
+    model = TypingModel(args.cps, args.reaction, args.accuracy)
+
+    seed(args.seed)
+    print(f"{'Room':<20}{'Difficulty':>12}{'Survive':>10}{'HP left':>10}")
+    for diff in range(1, 4):
+        hits = typing_hits(model, 9 - diff)
+        for room_type in CONTENT.rooms:
+            hp = room_outcome(room_type, diff, hits)
+            alive = 1 - hp[0]
+            hp_left = (hp * np.arange(MAX_HP + 1)).sum() / max(alive, 1e-12)
+            print(f"{room_type.name:<20}{diff:>12}{alive:>10.2%}{hp_left:>10.1f}")
+
+        player = SimPlayer(diff, model, RandomWalk())
+        world = World(player)
+        generate_enemies(world, player.difficulty)
+        generate_graph(world)
+        route = winning_route(world)
+        hp = route_outcome(world, route, hits)
+        names = " -> ".join(name for name, group in groupby(room.name for room in route))
+        print(f"Winning route on difficulty {diff}: {names}")
+        print(f"Chance of winning: {1 - hp[0]:.2%}\n")
+
+
+if __name__ == "__main__":
+    main()
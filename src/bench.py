@@ -0,0 +1,243 @@
+"""
+ICS3U
+Paul Chen
+This file holds the benchmarks for the parts of the game that need to be fast.
+Run it with `python3 src/bench.py`, and add `--json FILE` to save the results to compare with other commits.
+Everything runs against a fake terminal, so the benchmarks don't need a real one.
+"""
+
+from argparse import ArgumentParser
+from json import dump
+from platform import python_version
+from random import randrange, seed
+from time import perf_counter
+from challenges import ChallengeSource
+from interface import Interface
+from keyboard import Keyboard
+from locations import World, decode_prufer, generate_enemies, generate_graph
+from player import Player
+from procedural import ProceduralWorld
+from simulate import RandomWalk, SimPlayer, TypingModel, play_game
+
+
+class FakeTerminal(Interface):
+    """Interface that draws every frame but only counts the characters written, and is played by a script
+    instead of a person. The script types every sequence correctly, taking `step` seconds on the clock of
+    the fake terminal, which moves forward without waiting. Inherits from `Interface`.
+
+    Attributes:
+        answer (callable): function that takes the question and the last message pushed and returns the reply.
+        last (str): the last message that was pushed.
+        step (float): the number of seconds the script takes to answer.
+        time (float): the time on the fake terminal's clock.
+        written (int): the number of characters written to the fake terminal.
+    """
+    def __init__(self, answer, step=0.3):
+        """
+        Inits fake terminal class.
+        Args
+            answer (callable): function that takes the question and the last message pushed and returns the reply.
+            step (float): the number of seconds the script takes to answer.
+        """
+        self.answer = answer
+        self.last = ""
+        self.step = step
+        self.time = 0.0
+        self.written = 0
+        super().__init__(Keyboard())
+        self.width, self.height = 80, 24
+
+    def push(self, message, delay=True) -> None:
+        self.last = message
+        super().push(message, delay)
+
+    def write(self, text) -> None:
+        self.written += len(text)
+
+    def read(self, prompt) -> str:
+        self.time += self.step
+        return self.answer(prompt, self.last)
+
+    def read_timed(self, tm) -> tuple:
+        if self.step >= tm:
+            # Moves past the timeout by a whole step, since a tiny timeout could be lost to rounding.
+            self.time += self.step
+            return "", True
+        self.time += self.step
+        return self.last, False
+
+    def ignore(self, tm) -> None:
+        self.time += tm
+        self.update()
+
+    def clock(self) -> float:
+        return self.time
+
+
+def timeit(func, repeat: int, number=1) -> float:
+    """
+    Runs a function a number of times and returns the fastest time.
+    Args
+        func (callable): the function to time.
+        repeat (int): the number of times to run it.
+        number (int): the number of operations that each run does.
+    Returns
+        float: the fastest time for one operation in seconds.
+    """
+    best = float("inf")
+    for i in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best / number
+
+
+def bench_interface(sizes: list, repeat: int, frames=1000) -> list:
+    """
+    Times drawing the screen with histories of each size: `display()` when the room info changes,
+    `update()` when nothing has changed, and `push()` when an event is added.
+    Args
+        sizes (list[int]): the numbers of events in the history.
+        repeat (int): the number of times to run each benchmark.
+        frames (int): the number of frames drawn in each run.
+    Returns
+        list[tuple[str, int, float]]: the name, size and fastest time for one frame of each benchmark.
+    """
+    results = []
+    for size in sizes:
+        io = FakeTerminal(RandomWalk())
+        for i in range(size):
+            io.history.append(f"Event {i}")
+        infos = [f"Room description\n\n    HP: {hp}\n    ATK: 6\n" for hp in range(frames)]
+
+        def display():
+            for info in infos:
+                io.set_room_info(info)
+
+        def push():
+            for i in range(frames):
+                io.push("The Guard has hit you 2 times dealing 10 damage.", delay=False)
+                io.pop()
+
+        results.append(("Interface.display", size, timeit(display, repeat, frames)))
+        results.append(("Interface.update", size, timeit(lambda: [io.update() for i in range(frames)],
+                                                         repeat, frames)))
+        results.append(("Interface.push", size, timeit(push, repeat, frames * 2)))
+    return results
+
+
+def bench_generation(sizes: list, repeat: int) -> list:
+    """
+    Times dungeon generation: `generate_graph()` for the normal dungeon, `generate_enemies()` for each
+    difficulty, and `decode_prufer()` and `ProceduralWorld` for each size.
+    Args
+        sizes (list[int]): the numbers of rooms to generate.
+        repeat (int): the number of times to run each benchmark.
+    Returns
+        list[tuple[str, int, float]]: the name, size (or difficulty) and fastest time of each benchmark.
+    """
+    player = SimPlayer(1, TypingModel(), RandomWalk())
+    results = [("generate_graph", 8, timeit(lambda: generate_graph(World(player)), repeat))]
+    for difficulty in [4, 8, 12]:
+        results.append(("generate_enemies", difficulty,
+                        timeit(lambda: generate_enemies(World(player), difficulty), repeat)))
+    for size in sizes:
+        prufer = [randrange(size) for i in range(size - 2)]
+        results.append(("decode_prufer", size, timeit(lambda: decode_prufer(prufer, size), repeat)))
+        results.append(("ProceduralWorld", size, timeit(lambda: ProceduralWorld(player, size), repeat)))
+    return results
+
+
+def bench_battle(stacks: list, repeat: int, battles=20) -> list:
+    """
+    Times `Location.battle()` with a real `Player` played by the fake terminal's script, so the
+    timed input and every frame of the battle are included.
+    Args
+        stacks (list[int]): the numbers of guards to fight in each battle.
+        repeat (int): the number of times to run each benchmark.
+        battles (int): the number of battles in each run.
+    Returns
+        list[tuple[str, int, float]]: the name, number of guards and fastest time for one battle.
+    """
+    results = []
+    for stack in stacks:
+        player = Player(1, FakeTerminal(RandomWalk()), ChallengeSource(0))
+        world = World(player)
+        hall = world["Hall"]
+        guard = world.content.enemy("Guard")
+
+        def battle():
+            for i in range(battles):
+                player.hp = 80
+                hall.enemies = [guard] * stack
+                hall.battle()
+
+        results.append(("Location.battle", stack, timeit(battle, repeat, battles)))
+    return results
+
+
+def bench_games(games: int, repeat: int) -> list:
+    """
+    Times whole games on each difficulty: headless games with the typing model from `simulate.py`,
+    and games through the fake terminal with a real `Player`.
+    Args
+        games (int): the number of games in each run.
+        repeat (int): the number of times to run each benchmark.
+    Returns
+        list[tuple[str, int, float]]: the name, difficulty and fastest time for one game.
+    """
+    results = []
+    for diff in range(1, 4):
+        def headless():
+            for i in range(games):
+                play_game(diff, TypingModel(), RandomWalk())
+
+        def terminal():
+            for i in range(games):
+                player = Player(diff, FakeTerminal(RandomWalk()), ChallengeSource(i))
+                world = World(player)
+                generate_enemies(world, player.difficulty)
+                generate_graph(world)
+                curr = world["Entrance"]
+                while player:
+                    curr = curr.run()
+
+        results.append(("game (headless)", diff, timeit(headless, repeat, games)))
+        results.append(("game (terminal)", diff, timeit(terminal, repeat, games)))
+    return results
+
+
+def main() -> None:
+    """
+    Entry point for the benchmarks.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Benchmarks for Dungeon Escape.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+                        help="numbers of rooms to generate")
+    parser.add_argument("--histories", type=int, nargs="+", default=[10, 10 ** 3, 10 ** 5],
+                        help="numbers of events in the history when drawing the screen")
+    parser.add_argument("--games", type=int, default=20, help="games to play on each difficulty")
+    parser.add_argument("--repeat", type=int, default=3, help="times to run each benchmark")
+    parser.add_argument("--json", metavar="FILE", help="also save the results to a JSON file")
+    args = parser.parse_args()
+
+    seed(0)
+    results = (bench_interface(args.histories, args.repeat) + bench_generation(args.sizes, args.repeat)
+               + bench_battle([1, 2, 4], args.repeat) + bench_games(args.games, args.repeat))
+    print(f"{'Benchmark':<20}{'Size':>10}{'Seconds':>14}{'Per second':>14}")
+    for name, size, seconds in results:
+        print(f"{name:<20}{size:>10}{seconds:>14.9f}{1 / seconds:>14.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            dump({"python": python_version(),
+                  "results": [{"name": name, "size": size, "seconds": seconds}
+                              for name, size, seconds in results]}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `ChallengeSource` class, which makes the random sequences that the player types in a battle.
+The sequences are made ahead of time in large batches, so making one doesn't eat into the player's time limit.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from string import ascii_lowercase
+from threading import Lock
+
+# The thread that refills the pools of every `ChallengeSource` in the background.
+_refiller = ThreadPoolExecutor(max_workers=1, thread_name_prefix="challenges")
+
+
+class ChallengeSource:
+    """Class that hands out the sequences for the player to type. There is a pool of ready-made sequences for each
+    difficulty, and when a pool runs low it is refilled in the background. Each difficulty has its own random
+    number generator made from the seed, so a seeded source always gives the same sequences in the same order.
+
+    Attributes:
+        seed (int): the seed, or None for a random seed.
+        alphabets (dict[int, str]): the letters used for each difficulty. Difficulties not listed use `alphabet`.
+        alphabet (str): the letters used by default.
+        lengths (dict[int, int]): the length of the sequences for each difficulty. Difficulties not listed
+            use the difficulty as the length.
+        pool_size (int): the number of sequences made at a time.
+        background (bool): True if pools are refilled in the background else False.
+        pools (dict[int, deque[str]]): the ready-made sequences for each difficulty.
+        randoms (dict[int, Random]): the random number generator for each difficulty.
+        locks (dict[int, Lock]): held while a pool is being refilled.
+    """
+    def __init__(self, seed=None, alphabet=ascii_lowercase, alphabets=None, lengths=None, pool_size=256,
+                 background=True):
+        """
+        Inits challenge source class.
+        Args
+            seed (int): the seed, or None for a random seed.
+            alphabet (str): the letters used by default.
+            alphabets (dict[int, str]): the letters used for each difficulty.
+            lengths (dict[int, int]): the length of the sequences for each difficulty.
+            pool_size (int): the number of sequences made at a time.
+            background (bool): True if pools are refilled in the background else False.
+        """
+        self.seed = seed
+        self.alphabet = alphabet
+        self.alphabets = alphabets or {}
+        self.lengths = lengths or {}
+        self.pool_size = pool_size
+        self.background = background
+        self.pools = {}
+        self.randoms = {}
+        self.locks = {}
+
+    def refill(self, difficulty: int) -> None:
+        """
+        Makes `pool_size` new sequences for a difficulty in one batch.
+        Args
+            difficulty (int): the difficulty.
+        Returns
+            None
+        """
+        with self.locks[difficulty]:
+            length = self.lengths.get(difficulty, difficulty)
+            letters = "".join(self.randoms[difficulty].choices(self.alphabets.get(difficulty, self.alphabet),
+                                                                 k=length * self.pool_size))
+            self.pools[difficulty].extend(letters[i:i + length] for i in range(0, len(letters), length))
+
+    def next(self, difficulty: int) -> str:
+        """
+        Returns the next sequence for a difficulty.
+        Args
+            difficulty (int): the difficulty of the enemy.
+        Returns
+            str: the sequence.
+        """
+        pool = self.pools.get(difficulty)
+        if pool is None:
+            # The first time a difficulty is used, its generator and pool are made.
+            seed = None if self.seed is None else f"{self.seed}:{difficulty}"
+            self.randoms[difficulty] = Random(seed)
+            self.locks[difficulty] = Lock()
+            pool = self.pools[difficulty] = deque()
+        if not pool:
+            # The background refill didn't finish in time, so the pool is refilled here.
+            self.refill(difficulty)
+        challenge = pool.popleft()
+        if len(pool) == self.pool_size // 4 and self.background:
+            _refiller.submit(self.refill, difficulty)
+        return challenge
@@ -0,0 +1,168 @@
+"""
+ICS3U
+Paul Chen
+This file holds the code that loads the game's content, which are the enemies and rooms in the dungeon.
+The content is read once from a JSON file, such as `content.json`, into small records with integer ids.
+"""
+
+from json import load
+from os import path
+from enemy import Enemy
+
+# The content file that comes with the game.
+CONTENT_FILE = path.join(path.dirname(path.abspath(__file__)), "content.json")
+
+
+class EnemyType:
+    """Record for one kind of enemy. Calling the record makes a new `Enemy` with its stats.
+
+    Attributes:
+        id (int): the index of the enemy in `Content.enemies`.
+        key (str): the name used to refer to the enemy in the content file.
+        name (str): the name of the enemy.
+        hp (int): the amount of HP that the enemy has.
+        atk (int): the amount of ATK that the enemy has.
+        num_hits (tuple[int, int]): range of the number of hits that the enemy can hit on each turn.
+        difficulty (int): the difficulty of the enemy, from 1 to 5. It is worked out once when the content is loaded,
+            and is used as the length of the random sequence the player has to type and when randomly
+            generating the enemies located in each room.
+    """
+    __slots__ = ("id", "key", "name", "hp", "atk", "num_hits", "difficulty")
+
+    def __init__(self, id: int, key: str, name: str, hp: int, atk: int, num_hits: tuple):
+        """
+        Inits enemy type class.
+        Args
+            id (int): the index of the enemy in `Content.enemies`.
+            key (str): the name used to refer to the enemy in the content file.
+            name (str): the name of the enemy.
+            hp (int): the amount of HP that the enemy has.
+            atk (int): the amount of ATK that the enemy has.
+            num_hits (tuple[int, int]): range of the number of hits that the enemy can hit on each turn.
+        """
+        self.id = id
+        self.key = key
+        self.name = name
+        self.hp = hp
+        self.atk = atk
+        self.num_hits = num_hits
+        self.difficulty = max(1, min(
+            5, int((hp + atk * (num_hits[0] + num_hits[1])) // 15))) # Calculates the difficulty of the enemy.
+
+    def __call__(self) -> Enemy:
+        """
+        Makes an enemy of this type.
+        Args
+            None
+        Returns
+            Enemy: the enemy.
+        """
+        return Enemy(self)
+
+
+class RoomType:
+    """Record for one kind of room. The code that runs in the room is the `Location` class named by `behaviour`.
+
+    Attributes:
+        id (int): the index of the room in `Content.rooms`.
+        key (str): the name used to refer to the room in the code and the content file.
+        name (str): the name of the room.
+        behaviour (str): the name of the `Location` class that runs the room.
+        description (str): the description of the room, for rooms whose description doesn't change.
+        enemies (tuple[EnemyType]): the enemies that the room starts with.
+        possible_enemies (tuple[EnemyType]): the enemies that can be generated in the room.
+        unique (bool): True if a procedurally generated dungeon should only have one of this room else False.
+    """
+    __slots__ = ("id", "key", "name", "behaviour", "description", "enemies", "possible_enemies", "unique")
+
+    def __init__(self, id: int, key: str, name: str, behaviour: str, description: str,
+                 enemies: tuple, possible_enemies: tuple, unique: bool):
+        """
+        Inits room type class.
+        Args
+            id (int): the index of the room in `Content.rooms`.
+            key (str): the name used to refer to the room in the code and the content file.
+            name (str): the name of the room.
+            behaviour (str): the name of the `Location` class that runs the room.
+            description (str): the description of the room.
+            enemies (tuple[EnemyType]): the enemies that the room starts with.
+            possible_enemies (tuple[EnemyType]): the enemies that can be generated in the room.
+            unique (bool): True if a procedurally generated dungeon should only have one of this room else False.
+        """
+        self.id = id
+        self.key = key
+        self.name = name
+        self.behaviour = behaviour
+        self.description = description
+        self.enemies = enemies
+        self.possible_enemies = possible_enemies
+        self.unique = unique
+
+
+class Content:
+    """Class that holds all the enemies and rooms from a content file.
+
+    Attributes:
+        enemies (list[EnemyType]): every enemy, indexed by id.
+        rooms (list[RoomType]): every room, indexed by id.
+        enemy_ids (dict[str, int]): the id of each enemy, keyed by its key.
+        room_ids (dict[str, int]): the id of each room, keyed by its key.
+    """
+    def __init__(self, data: dict):
+        """
+        Inits content class.
+        Args
+            data (dict): the contents of a content file.
+        """
+        self.enemies = []
+        self.enemy_ids = {}
+        for entry in data["enemies"]:
+            self.enemy_ids[entry["key"]] = len(self.enemies)
+            self.enemies.append(EnemyType(len(self.enemies), entry["key"], entry["name"], entry["hp"],
+                                          entry["atk"], tuple(entry["num_hits"])))
+
+        self.rooms = []
+        self.room_ids = {}
+        for entry in data["rooms"]:
+            self.room_ids[entry["key"]] = len(self.rooms)
+            self.rooms.append(RoomType(len(self.rooms), entry["key"], entry["name"], entry["behaviour"],
+                                       entry.get("description", ""),
+                                       tuple(self.enemy(key) for key in entry["enemies"]),
+                                       tuple(self.enemy(key) for key in entry["possible_enemies"]),
+                                       entry.get("unique", False)))
+
+    def enemy(self, key: str) -> EnemyType:
+        """
+        Looks up an enemy.
+        Args
+            key (str): the enemy's key.
+        Returns
+            EnemyType: the enemy.
+        """
+        return self.enemies[self.enemy_ids[key]]
+
+    def room(self, key: str) -> RoomType:
+        """
+        Looks up a room.
+        Args
+            key (str): the room's key.
+        Returns
+            RoomType: the room.
+        """
+        return self.rooms[self.room_ids[key]]
+
+
+def load_content(filename: str) -> Content:
+    """
+    Loads a content file.
+    Args
+        filename (str): the path to the JSON file.
+    Returns
+        Content: the enemies and rooms in the file.
+    """
+    with open(filename, encoding="utf-8") as file:
+        return Content(load(file))
+
+
+# The content that comes with the game, loaded once when the module is first imported.
+CONTENT = load_content(CONTENT_FILE)
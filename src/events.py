@@ -0,0 +1,285 @@
+"""
+ICS3U
+Paul Chen
+This file holds the game events and the event bus. The rooms publish an event whenever something happens,
+like an enemy appearing or the player being hit, and anything that cares subscribes to the bus: the interface
+shows the events as messages, and loggers and stats collectors can read the events' fields. An event only
+holds numbers and references, and its messages are only formatted when `messages()` is called, so nothing is
+formatted in games that nobody watches.
+"""
+
+
+class Event:
+    """Parent class of every event. Subclasses hold what happened in their attributes."""
+    __slots__ = ()
+
+    def messages(self) -> tuple:
+        """
+        Formats the event for the player.
+        Args
+            None
+        Returns
+            tuple[str]: the messages to show, one after another.
+        """
+        return ()
+
+
+class RoomEntered(Event):
+    """Event for the player entering a room.
+
+    Attributes:
+        location (Location): the room.
+    """
+    __slots__ = ("location",)
+
+    def __init__(self, location):
+        """
+        Inits room entered class.
+        Args
+            location (Location): the room.
+        """
+        self.location = location
+
+    def messages(self) -> tuple:
+        return (f"You entered the {self.location.name}.",)
+
+
+class EnemyAppeared(Event):
+    """Event for an enemy starting a fight with the player.
+
+    Attributes:
+        enemy (EnemyType): the kind of enemy.
+        hp (int): the enemy's HP.
+    """
+    __slots__ = ("enemy", "hp")
+
+    def __init__(self, enemy, hp: int):
+        """
+        Inits enemy appeared class.
+        Args
+            enemy (EnemyType): the kind of enemy.
+            hp (int): the enemy's HP.
+        """
+        self.enemy = enemy
+        self.hp = hp
+
+    def messages(self) -> tuple:
+        determiner = "An" if self.enemy.name[0].lower() in "aeiou" else "A"
+        return (f"""{determiner} {self.enemy.name} walks up to you...
+    HP: {self.hp}
+    ATK: {self.enemy.atk}""",)
+
+
+class EnemyHit(Event):
+    """Event for the player hitting an enemy at the end of an attack.
+
+    Attributes:
+        enemy (EnemyType): the kind of enemy.
+        hits (int): the number of hits the player landed.
+        damage (int): the damage dealt.
+        hp (int): the enemy's HP left. The enemy has been defeated if this is 0.
+    """
+    __slots__ = ("enemy", "hits", "damage", "hp")
+
+    def __init__(self, enemy, hits: int, damage: int, hp: int):
+        """
+        Inits enemy hit class.
+        Args
+            enemy (EnemyType): the kind of enemy.
+            hits (int): the number of hits the player landed.
+            damage (int): the damage dealt.
+            hp (int): the enemy's HP left.
+        """
+        self.enemy = enemy
+        self.hits = hits
+        self.damage = damage
+        self.hp = hp
+
+    def messages(self) -> tuple:
+        messages = (f"You have hit {self.hits} times dealing {self.damage} damage.",
+                    f"The {self.enemy.name} is left with {self.hp} HP.")
+        if self.hp == 0:
+            messages += (f"The {self.enemy.name} has been defeated! You win!",)
+        return messages
+
+
+class PlayerHit(Event):
+    """Event for an enemy hitting the player.
+
+    Attributes:
+        enemy (EnemyType): the kind of enemy.
+        hits (int): the number of hits the enemy landed.
+        damage (int): the damage dealt.
+    """
+    __slots__ = ("enemy", "hits", "damage")
+
+    def __init__(self, enemy, hits: int, damage: int):
+        """
+        Inits player hit class.
+        Args
+            enemy (EnemyType): the kind of enemy.
+            hits (int): the number of hits the enemy landed.
+            damage (int): the damage dealt.
+        """
+        self.enemy = enemy
+        self.hits = hits
+        self.damage = damage
+
+    def messages(self) -> tuple:
+        return (f"The {self.enemy.name} has hit you {self.hits} times dealing {self.damage} damage.",)
+
+
+class RoomCleared(Event):
+    """Event for the player defeating every enemy in a room.
+
+    Attributes:
+        location (Location): the room.
+    """
+    __slots__ = ("location",)
+
+    def __init__(self, location):
+        """
+        Inits room cleared class.
+        Args
+            location (Location): the room.
+        """
+        self.location = location
+
+    def messages(self) -> tuple:
+        return ("You have defeated every monster in the room!",)
+
+
+class ItemPicked(Event):
+    """Event for the player finding something in a room. The key and the treasure go in the inventory, and the
+    sword and bandages are used on the spot.
+
+    Attributes:
+        item (str): the item, one of `ITEM_MESSAGES`.
+    """
+    __slots__ = ("item",)
+
+    def __init__(self, item: str):
+        """
+        Inits item picked class.
+        Args
+            item (str): the item.
+        """
+        self.item = item
+
+    def messages(self) -> tuple:
+        return ITEM_MESSAGES[self.item]
+
+
+# The messages shown when each item is found.
+ITEM_MESSAGES = {
+    "Key": ("You found a key lying on the ground! Will this open the front door?",),
+    "Treasure": ("You picked up all the treasure in the room.",),
+    "Sword": ("You find a new sword!", "Your ATK has increased by 2."),
+    "Bandages": ("You find some bandages lying around and cover up your wounds.", "Your HP has increased by 20!"),
+}
+
+
+class PotionEffect(Event):
+    """Event for the witch's potion changing one of the player's stats.
+
+    Attributes:
+        stat (str): "HP" or "ATK".
+        change (int): how much the stat changed by. It can be negative or 0.
+    """
+    __slots__ = ("stat", "change")
+
+    def __init__(self, stat: str, change: int):
+        """
+        Inits potion effect class.
+        Args
+            stat (str): "HP" or "ATK".
+            change (int): how much the stat changed by.
+        """
+        self.stat = stat
+        self.change = change
+
+    def messages(self) -> tuple:
+        if self.change < 0:
+            return (f"Oh No! Your {self.stat} has decreased by {-self.change}" + ("!" if self.stat == "ATK" else ""),)
+        if self.change > 0:
+            return (f"Your {self.stat} has increased by {self.change}!",)
+        return ("Nothing has happened...",)
+
+
+class GameOver(Event):
+    """Event for the end of the game.
+
+    Attributes:
+        won (bool): True if the player escaped with the treasure else False.
+    """
+    __slots__ = ("won",)
+
+    def __init__(self, won: bool):
+        """
+        Inits game over class.
+        Args
+            won (bool): True if the player escaped with the treasure else False.
+        """
+        self.won = won
+
+    def messages(self) -> tuple:
+        if self.won:
+            return ("You have found the treasure and defeated the dragon! You Win!",)
+        return ("Your HP has dropped to 0.\nGame Over",)
+
+
+class EventBus:
+    """Class that passes events from the game to whatever has subscribed to them. Each game has its own bus.
+    Publishing an event nobody has subscribed to only costs a dictionary lookup.
+
+    Attributes:
+        handlers (dict[type, list[callable]]): the functions called for each kind of event.
+        everything (list[callable]): the functions called for every event.
+    """
+    def __init__(self):
+        """
+        Inits event bus class.
+        """
+        self.handlers = {}
+        self.everything = []
+
+    def subscribe(self, handler, *kinds) -> None:
+        """
+        Calls a function with every event of some kinds from now on.
+        Args
+            handler (callable): the function, which takes the event.
+            kinds (type): the kinds of event. The function is called with every event if none are given.
+        Returns
+            None
+        """
+        if not kinds:
+            self.everything.append(handler)
+        for kind in kinds:
+            self.handlers.setdefault(kind, []).append(handler)
+
+    def unsubscribe(self, handler) -> None:
+        """
+        Stops calling a function with events.
+        Args
+            handler (callable): the function.
+        Returns
+            None
+        """
+        if handler in self.everything:
+            self.everything.remove(handler)
+        for handlers in self.handlers.values():
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def publish(self, event: Event) -> None:
+        """
+        Calls every function that has subscribed to the kind of event, in the order they subscribed.
+        Args
+            event (Event): the event.
+        Returns
+            None
+        """
+        for handler in self.everything:
+            handler(event)
+        for handler in self.handlers.get(type(event), ()):
+            handler(event)
@@ -0,0 +1,183 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `History` class, which keeps the events shown by `Interface`. Only the newest events are
+kept in memory, in a ring buffer, so a session uses the same amount of memory no matter how long it runs.
+Older events can spill into a `Scrollback` file, which is memory-mapped so the player can page through it.
+"""
+
+from collections import deque
+from itertools import islice
+from mmap import mmap
+
+
+class Scrollback:
+    """Class that stores lines in a memory-mapped file, one line after another with a newline after each.
+    The operating system pages the file in and out as needed, so it doesn't count against the memory of the
+    session. The file is made bigger by doubling it when it fills up.
+
+    Attributes:
+        file (BufferedRandom): the scrollback file.
+        map (mmap): the memory map of the file.
+        end (int): the number of bytes used.
+        count (int): the number of lines stored.
+    """
+    def __init__(self, filename, size=1 << 16):
+        """
+        Inits scrollback class. The file is emptied if it already exists.
+        Args
+            filename (str): the path to the scrollback file.
+            size (int): the starting size of the file in bytes.
+        """
+        self.file = open(filename, "w+b")
+        self.file.truncate(size)
+        self.map = mmap(self.file.fileno(), size)
+        self.end = 0
+        self.count = 0
+
+    def append(self, line) -> None:
+        """
+        Adds a line to the end of the file.
+        Args
+            line (str): the line, which can't contain a newline.
+        Returns
+            None
+        """
+        data = line.encode("utf-8") + b"\n"
+        if self.end + len(data) > len(self.map):
+            size = max(2 * len(self.map), self.end + len(data))
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap(self.file.fileno(), size)
+        self.map[self.end:self.end + len(data)] = data
+        self.end += len(data)
+        self.count += 1
+
+    def pop(self) -> str:
+        """
+        Removes the last line.
+        Args
+            None
+        Returns
+            str: the line.
+        """
+        start = self.map.rfind(b"\n", 0, self.end - 1) + 1
+        line = self.map[start:self.end - 1].decode("utf-8")
+        self.end = start
+        self.count -= 1
+        return line
+
+    def last(self, n, skip=0) -> list:
+        """
+        Reads lines from the end of the file.
+        Args
+            n (int): the most lines to read.
+            skip (int): the number of lines at the end to skip over first.
+        Returns
+            list[str]: up to `n` lines that come before the skipped lines, oldest first.
+        """
+        lines = []
+        end = self.end
+        for i in range(min(skip + n, self.count)):
+            start = self.map.rfind(b"\n", 0, end - 1) + 1
+            if i >= skip:
+                lines.append(self.map[start:end - 1].decode("utf-8"))
+            end = start
+        lines.reverse()
+        return lines
+
+    def clear(self) -> None:
+        """
+        Forgets every line, so the file can be used again without making a new one.
+        Args
+            None
+        Returns
+            None
+        """
+        self.end = 0
+        self.count = 0
+
+    def close(self) -> None:
+        """
+        Closes the scrollback file.
+        Args
+            None
+        Returns
+            None
+        """
+        self.map.close()
+        self.file.close()
+
+
+class History:
+    """Class that holds the event history as a stack of lines. The newest `capacity` lines are kept in a ring
+    buffer, and older lines are either thrown away or moved to a scrollback file. Lines are moved back out of
+    the scrollback file when lines are popped, so popping works the same as with a list.
+
+    Attributes:
+        recent (deque[str]): the newest lines.
+        scrollback (Scrollback): where older lines go, or None to throw them away.
+    """
+    def __init__(self, capacity=100, scrollback=None):
+        """
+        Inits history class.
+        Args
+            capacity (int): the number of lines kept in memory.
+            scrollback (Scrollback): where older lines go, or None to throw them away. It is cleared, so the
+                history starts empty.
+        """
+        self.recent = deque(maxlen=capacity)
+        self.scrollback = scrollback
+        if scrollback is not None:
+            scrollback.clear()
+
+    def append(self, line) -> None:
+        """
+        Adds a line to the top of the stack.
+        Args
+            line (str): the line.
+        Returns
+            None
+        """
+        if len(self.recent) == self.recent.maxlen and self.scrollback is not None:
+            self.scrollback.append(self.recent[0])
+        self.recent.append(line)
+
+    def pop(self) -> str:
+        """
+        Removes the line at the top of the stack.
+        Args
+            None
+        Returns
+            str: the line.
+        """
+        line = self.recent.pop()
+        if self.scrollback is not None and self.scrollback.count:
+            self.recent.appendleft(self.scrollback.pop())
+        return line
+
+    def tail(self, n, skip=0) -> list:
+        """
+        Returns lines from the top of the stack.
+        Args
+            n (int): the most lines to return.
+            skip (int): the number of newest lines to skip over first, used to page back through the history.
+        Returns
+            list[str]: up to `n` lines that come before the skipped lines, oldest first.
+        """
+        size = len(self.recent)
+        start = max(0, size - skip - n)
+        lines = list(islice(self.recent, start, max(0, size - skip)))
+        if len(lines) < n and self.scrollback is not None:
+            lines = self.scrollback.last(n - len(lines), max(0, skip - size)) + lines
+        return lines
+
+    def __len__(self) -> int:
+        """
+        Returns the number of lines in the history, including the scrollback file.
+        Args
+            None
+        Returns
+            int: the number of lines.
+        """
+        return len(self.recent) + (self.scrollback.count if self.scrollback is not None else 0)
@@ -0,0 +1,189 @@
+"""
+ICS3U
+Paul Chen
+This file holds the input log, which records everything the player types so that a game can be played again
+exactly. `RecordingKeyboard` writes the log while the game is played, and `ReplayKeyboard` reads it back with
+the recorded times standing in for the clock, so a replay runs as fast as the computer can go.
+"""
+
+from struct import Struct
+from keyboard import Keyboard
+
+# The start of every log file, followed by the version of the format. Version 2 added the clock readings at the
+# start and end of every game and before every room.
+MAGIC = b"DELG"
+VERSION = 2
+HEADER = Struct("<4sB")
+
+# Each record is its kind, the time it was made, and the length of the text after it.
+RECORD = Struct("<BdI")
+
+# The kinds of records.
+START = 0 # The seed and the number of rooms, written when the log is opened.
+LINE = 1 # A line read without a timeout.
+TIMED = 2 # A line read with a timeout that was finished in time.
+TIMEOUT = 3 # A line read with a timeout that ran out. The text is what was typed before it did.
+CLOCK = 4 # A reading of the clock. The time is the reading.
+
+
+class ReplayError(Exception):
+    """Raised when a replayed game asks for something different from what was recorded."""
+
+
+class InputLog:
+    """Class that writes records to a log file. A log holds one session, so an old file with the same name is
+    replaced. Each record is written and flushed right away, so the log is complete up to the last input even
+    if the game crashes.
+
+    Attributes:
+        file (BufferedWriter): the log file.
+    """
+    def __init__(self, filename):
+        """
+        Inits input log class and writes the header.
+        Args
+            filename (str): the path to the log file.
+        """
+        self.file = open(filename, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+
+    def write(self, kind, tm, text="") -> None:
+        """
+        Appends a record to the log.
+        Args
+            kind (int): the kind of record.
+            tm (float): the time of the record.
+            text (str): the text of the record.
+        Returns
+            None
+        """
+        data = text.encode("utf-8")
+        self.file.write(RECORD.pack(kind, tm, len(data)) + data)
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        Closes the log file.
+        Args
+            None
+        Returns
+            None
+        """
+        self.file.close()
+
+
+def read_log(filename) -> list:
+    """
+    Reads every record in a log file.
+    Args
+        filename (str): the path to the log file.
+    Returns
+        list[tuple[int, float, str]]: the kind, time and text of each record.
+    """
+    with open(filename, "rb") as file:
+        data = file.read()
+    if data[:HEADER.size] != HEADER.pack(MAGIC, VERSION): # Also catches files too short to have a header.
+        raise ReplayError(f"{filename} is not a version {VERSION} input log.")
+
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        kind, tm, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        records.append((kind, tm, data[offset:offset + length].decode("utf-8")))
+        offset += length
+    return records
+
+
+class RecordingKeyboard(Keyboard):
+    """Keyboard that passes everything through to another keyboard and records every line read and every
+    reading of the clock. Inherits from `Keyboard`.
+
+    Attributes:
+        keyboard (Keyboard): the keyboard that is read from.
+        log (InputLog): the log that is written to.
+    """
+    def __init__(self, keyboard, log, seed, rooms):
+        """
+        Inits recording keyboard class and records the settings of the session.
+        Args
+            keyboard (Keyboard): the keyboard that is read from.
+            log (InputLog): the log that is written to.
+            seed (int): the seed for the random number generators.
+            rooms (int): the number of rooms in a procedurally generated dungeon, or 0 for the normal dungeon.
+        """
+        self.keyboard = keyboard
+        self.log = log
+        self.log.write(START, keyboard.clock(), f"{seed} {rooms}")
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        line, timed_out = self.keyboard.read_line(prompt, tm)
+        kind = LINE if tm is None else TIMEOUT if timed_out else TIMED
+        self.log.write(kind, self.keyboard.clock(), line)
+        return line, timed_out
+
+    def read_until(self, target, tm) -> tuple:
+        # Recorded like a timed line, so it is replayed through `read_line()`.
+        line, timed_out = self.keyboard.read_until(target, tm)
+        self.log.write(TIMEOUT if timed_out else TIMED, self.keyboard.clock(), line)
+        return line, timed_out
+
+    def pause(self, tm) -> None:
+        self.keyboard.pause(tm)
+
+    def clock(self) -> float:
+        now = self.keyboard.clock()
+        self.log.write(CLOCK, now)
+        return now
+
+
+class ReplayKeyboard(Keyboard):
+    """Keyboard that plays back a log. Lines and clock readings are handed out in the order they were recorded,
+    pauses return right away, and an `EOFError` is raised when the log runs out, like Ctrl-D. Inherits from
+    `Keyboard`.
+
+    Attributes:
+        records (list[tuple[int, float, str]]): the records in the log.
+        position (int): the index of the next record.
+        seed (int): the seed for the random number generators.
+        rooms (int): the number of rooms in a procedurally generated dungeon, or 0 for the normal dungeon.
+    """
+    def __init__(self, records):
+        """
+        Inits replay keyboard class.
+        Args
+            records (list[tuple[int, float, str]]): the records in the log, from `read_log()`.
+        """
+        self.records = records
+        self.position = 0
+        seed, rooms = self.next(START)[2].split()
+        self.seed = int(seed)
+        self.rooms = int(rooms)
+
+    def next(self, *kinds) -> tuple:
+        """
+        Returns the next record, checking that it is one of the kinds the game is asking for.
+        Args
+            kinds (int): the kinds of record that are allowed.
+        Returns
+            tuple[int, float, str]: the kind, time and text of the record.
+        """
+        if self.position >= len(self.records):
+            raise EOFError()
+        record = self.records[self.position]
+        if record[0] not in kinds:
+            raise ReplayError(f"Record {self.position} has kind {record[0]}, but the game asked for {kinds}.")
+        self.position += 1
+        return record
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        if tm is None:
+            return self.next(LINE)[2], False
+        kind, now, line = self.next(TIMED, TIMEOUT)
+        return line, kind == TIMEOUT
+
+    def pause(self, tm) -> None:
+        pass
+
+    def clock(self) -> float:
+        return self.next(CLOCK)[1]
@@ -5,36 +5,77 @@ This file holds the `Interface` class, which helps to make IO neater.
 """
 
 from os import name, system
-from pytimedinput import timedInput
-from time import time
+from shutil import get_terminal_size
+from history import History
+from keyboard import open_keyboard
 from sys import stdout
 
+# Turns on ANSI escape codes in the Windows console, which the screen is drawn with.
+if name == "nt":
+    system("")
+
+# The number of seconds to pause before each event is shown.
+PAUSE = 0.2
+
+# The questions that the game asks. Bots and the load tester look for these.
+CHOICE_PROMPT = "Your choice: "
+ROOM_PROMPT = "Where would you like to go: "
+DRINK_PROMPT = "Do you want to drink it [Y/n]? "
+TURN_PROMPT = "It's your turn, type anything to begin! "
+CONTINUE_PROMPT = "Type anything to continue... "
+
+# The line shown above each sequence in a battle.
+TYPE_LETTERS = "Type the letters that appear on screen: "
+
 
 class Interface:
     """Class that deals with IO. The terminal is seperated into two parts: one showing general information
     and another showing the list of events. I wanted both these components to always show on screen, so it 
     only shows the last ten events that have occurred so that the description doesn't scroll off screen. 
     The event history is implemented as a stack where you can push and pop messages to the stacks.
+    Only the newest lines are kept in memory, and older lines can go to a scrollback file. Typing `<` or `>`
+    at a prompt pages back or forward through the history.
+    All the reading and writing goes through `write()`, `read()`, `read_timed()` and `clock()`, so other
+    transports, like a network connection, only need to override those.
+
+    The screen is double buffered. `frame` holds the lines that are on screen, and each redraw only
+    rewrites the lines that have changed, with a single write for the whole frame.
 
     Attributes:
         room_info (str): the description of the current room. Shows a description of the room, player stats, and a list of enemies in the room.
-        history (list[str]): message list.
-        nl (int): the number of newlines that are currently being shown in the event history.
+        history (History): message list.
+        offset (int): the number of newest lines skipped over while paging back through the history.
+        frame (list[str]): the lines that are currently on screen.
+        width (int): the width of the screen. Longer lines are split so every line in `frame` is one row.
+        height (int): the height of the screen. The frame is cut down to leave one row for the prompt.
         default_ignore (int): the number of seconds to pause after every event.
         lines (int): the number of events to show on screen at a time.
+        keyboard (Keyboard): where the input is read from.
+        show_map (bool): True if the map of the explored rooms is drawn next to the room info, else False.
+        streaming (bool): True if the sequences in battles are accepted as soon as they are typed, without
+            pressing Enter, else False.
     """
-    def __init__(self):
+    def __init__(self, keyboard=None, scrollback=None, streaming=False):
         """
         Inits interface class.
         Args
-            None
+            keyboard (Keyboard): where the input is read from. Defaults to the terminal's keyboard.
+            scrollback (Scrollback): where old events are kept, or None to throw them away. It is shared by
+                the games in a session and closed by whoever made it.
+            streaming (bool): True to accept the sequences in battles without waiting for Enter.
         """
-        self.clear()
         self.room_info = ""
-        self.history = []
-        self.nl = 0
-        self.default_ignore = 0.2
+        self.history = History(scrollback=scrollback)
+        self.offset = 0
+        self.frame = []
+        self.width = 80
+        self.height = 24
+        self.default_ignore = PAUSE
         self.lines = 10
+        self.keyboard = keyboard if keyboard is not None else open_keyboard()
+        self.show_map = True
+        self.streaming = streaming
+        self.clear()
 
     def set_room_info(self, info) -> None:
         """
@@ -47,6 +88,37 @@ class Interface:
         self.room_info = info
         self.display()
 
+    def room_rows(self) -> int:
+        """
+        Works out how many rows the room info can take up without the frame getting taller than the screen.
+        Args
+            None
+        Returns
+            int: the number of rows.
+        """
+        return self.height - self.lines - 3 # The line under the room info, the paging note and the prompt.
+
+    def attach(self, events) -> None:
+        """
+        Subscribes to a game's events, so they are shown as messages.
+        Args
+            events (EventBus): the game's event bus.
+        Returns
+            None
+        """
+        events.subscribe(self.show)
+
+    def show(self, event) -> None:
+        """
+        Pushes the messages for an event.
+        Args
+            event (Event): the event.
+        Returns
+            None
+        """
+        for message in event.messages():
+            self.push(message)
+
     def push(self, message, delay=True) -> None:
         """
         Pushes an event into the message stack and redraws the event history.
@@ -60,6 +132,7 @@ class Interface:
             self.ignore(self.default_ignore)
         for line in message.split("\n"):
             self.history.append(line)
+        self.offset = 0
         self.update()
 
     def pop(self):
@@ -71,6 +144,7 @@ class Interface:
             None
         """
         self.history.pop()
+        self.offset = 0
         self.update()
 
     def input(self, message, delay=True) -> str:
@@ -86,23 +160,24 @@ class Interface:
         if delay:
             self.ignore(self.default_ignore)
 
-        # Takes in input.
-        inp = input(message)
-        if delay:
-            stdout.write("\033[F")
-            stdout.write("\033[K")
+        # Takes in input, paging through the history until something else is typed.
+        inp = self.read(message)
+        while self.scroll(inp):
+            inp = self.read(message)
 
         # Inserts the message and input into the message stack.
         self.push(message + inp, delay=delay)
         return inp
 
-    def timed_input(self, tm, delay=True) -> tuple:
+    def timed_input(self, tm, delay=True, target=None) -> tuple:
         """
         Takes in input with a timeout, pushes said info into the message stack, 
         and redraws the event history. The input stops if the timeout elapses.
         Args
             tm (int): length of timeout in seconds.
             delay (bool): True if we add a pause before showing a message else False.
+            target (str): the string the player is meant to type. If `streaming` is True, the input
+                stops as soon as it matches, without waiting for Enter.
         Returns
             tuple[str, int]: the string taken in through `input()` and a boolean 
             that represents whether the input timed out or not.
@@ -112,14 +187,89 @@ class Interface:
             self.ignore(self.default_ignore)
 
         # Takes in timed input.
-        inp = timedInput(timeout=tm, resetOnInput=False)
+        inp = self.read_until(target, tm) if self.streaming and target is not None else self.read_timed(tm)
         self.push(inp[0], delay=delay)
-        stdout.write("\033[F")
-        stdout.write("\033[K")
+        return inp
+
+    def select_difficulty(self) -> int:
+        """
+        Asks the player to choose a difficulty from the menu on screen.
+        Args
+            None
+        Returns
+            int: 1 if easy, 2 if medium, 3 if hard.
+        """
+        # Keeps taking in input until it is valid.
+        inp = self.read(CHOICE_PROMPT)
+        while not inp.isdigit() or int(inp) < 1 or int(inp) > 3:
+            self.write("Invalid Input\n")
+            inp = self.read(CHOICE_PROMPT)
+        return int(inp)
+
+    def choose_room(self, rooms, hint) -> "Location":
+        """
+        Lists the rooms that can be travelled to and asks the player to choose one. Typing ? shows a hint instead.
+        Args
+            rooms (list[Location]): the rooms that can be travelled to.
+            hint (callable): works out the hint when it is asked for, returning the number of moves left to
+                escape and the room to go to next.
+        Returns
+            Location: next location to visit.
+        """
+        # Displays the list of rooms that can be travelled to.
+        self.push("Choose one of the following rooms to go to: " + "".join(
+            f"\n    {i + 1}. {rooms[i].name}"
+            for i in range(len(rooms))))
+
+        # Keeps taking in input until it is valid.
+        inp = self.input(ROOM_PROMPT)
+        while not inp.isdigit() or int(inp) < 1 or int(inp) > len(rooms):
+            if inp == "?":
+                moves, nxt = hint()
+                self.push(f"Hint: go to the {nxt.name}. You are {moves} rooms away from escaping.")
+            else:
+                self.push("Invalid Input")
+            inp = self.input(ROOM_PROMPT)
+        return rooms[int(inp) - 1]
+
+    def drink_potion(self, hp) -> bool:
+        """
+        Asks the player whether to drink the potion in the witch's hut.
+        Args
+            hp (int): the player's HP.
+        Returns
+            bool: True if the player drinks the potion else False.
+        """
+        choice = self.input(DRINK_PROMPT)
+        return len(choice) > 0 and choice[0].lower() == "y"
 
-        # Updates screen.
+    def type_challenge(self, challenge, tm) -> tuple:
+        """
+        Has the player type one sequence in a battle.
+        Args
+            challenge (str): the sequence to type, which is already on screen.
+            tm (float): the number of seconds left in the attack.
+        Returns
+            tuple[str, bool]: what was typed and whether the input timed out or not.
+        """
+        return self.timed_input(tm, delay=False, target=challenge)
+
+    def scroll(self, key) -> bool:
+        """
+        Pages back or forward through the history by one screen.
+        Args
+            key (str): `<` to page back or `>` to page forward.
+        Returns
+            bool: True if the key was a paging key else False.
+        """
+        if key == "<":
+            self.offset = min(self.offset + self.lines, max(0, len(self.history) - self.lines))
+        elif key == ">":
+            self.offset = max(0, self.offset - self.lines)
+        else:
+            return False
         self.update()
-        return inp
+        return True
 
     def ignore(self, tm) -> None:
         """
@@ -130,49 +280,120 @@ class Interface:
         Returns
             None
         """
-        # Keeps looping until the timeout elapses.
-        start = time()
-        while time() - start < tm:
-            timedInput(timeout=float(tm) - (time() - start),
-                       resetOnInput=False)
-            # If the user types anything during this time, erase it and redraw the screen.
-            stdout.write("\033[F")
-            stdout.write("\033[K")
-            self.update()
+        self.keyboard.pause(tm)
+
+        # If the user typed anything during this time, erase it by redrawing the screen.
+        self.update()
+
+    def write(self, text) -> None:
+        """
+        Writes text to the screen.
+        Args
+            text (str): the text to write.
+        Returns
+            None
+        """
+        stdout.write(text)
+        stdout.flush()
+
+    def read(self, prompt) -> str:
+        """
+        Shows a prompt and reads a line of input.
+        Args
+            prompt (str): the prompt.
+        Returns
+            str: the line that was read.
+        """
+        return self.keyboard.read_line(prompt)[0]
+
+    def read_timed(self, tm) -> tuple:
+        """
+        Reads a line of input, stopping if the timeout elapses.
+        Args
+            tm (float): length of timeout in seconds.
+        Returns
+            tuple[str, bool]: the string that was read and whether the input timed out or not.
+        """
+        return self.keyboard.read_line("", tm)
+
+    def read_until(self, target, tm) -> tuple:
+        """
+        Reads input until it matches a string, Enter is pressed or the timeout elapses.
+        Args
+            target (str): the string to match.
+            tm (float): length of timeout in seconds.
+        Returns
+            tuple[str, bool]: the string that was read and whether the input timed out or not.
+        """
+        return self.keyboard.read_until(target, tm)
+
+    def clock(self) -> float:
+        """
+        Returns the current time. Used to time battles and pauses.
+        Args
+            None
+        Returns
+            float: the time in seconds.
+        """
+        return self.keyboard.clock()
 
     def clear(self) -> None:
         """
-        Clears the screen.
+        Clears the screen. The next redraw will draw every line.
         Args
             None
         Returns
             None
         """
-        if name == "posix":
-            system("clear")
-        else:
-            system("cls")
+        # Keeps the last size if it isn't a terminal, or the terminal doesn't know its size.
+        self.width, self.height = get_terminal_size((self.width, self.height))
+        self.frame = []
+        self.write("\033[2J\033[H")
 
-    def display(self):
+    def render(self) -> None:
         """
-        Fully redraws the screen.
+        Draws the room info and the last `lines` events, only rewriting the lines that differ
+        from the last frame. The cursor is left on the line below the frame, where prompts go.
         Args
             None
         Returns
             None
         """
-        # Clears screen.
-        self.clear()
+        # Builds the new frame, splitting long lines so each one takes up exactly one row.
+        note = f"({self.offset} newer lines, type > to page forward)" if self.offset else ""
+        lines = self.room_info.split("\n") + ["_" * 50, note] + self.history.tail(self.lines, self.offset)
+        frame = []
+        for line in lines:
+            frame.extend(line[i:i + self.width] for i in range(0, max(len(line), 1), self.width))
 
-        # Prints room_info.
-        print(self.room_info)
+        # Rows past the bottom of the terminal would scroll the screen and leave old rows behind, so if the
+        # terminal is too short, the top of the room info is left off and the newest events stay on screen.
+        rows = max(1, self.height - 1)
+        if len(frame) > rows:
+            frame = frame[len(frame) - rows:]
 
-        # Prints seperator.
-        print("_" * 50 + "\n")
+        # Rewrites the changed rows. A full row doesn't need to be cleared to its end.
+        out = []
+        for row, line in enumerate(frame):
+            if row >= len(self.frame) or self.frame[row] != line:
+                out.append(f"\033[{row + 1};1H{line}")
+                if len(line) < self.width:
+                    out.append("\033[K")
 
-        # Prints the required number of lines and stores the number of lines in `nl`.
-        self.nl = len(self.history) - max(len(self.history) - self.lines, 0)
-        print("\n".join(self.history[-self.nl:]))
+        # Clears everything below the frame, which removes old rows and anything the user typed.
+        out.append(f"\033[{len(frame) + 1};1H\033[J")
+        self.frame = frame
+        self.write("".join(out))
+
+    def display(self):
+        """
+        Redraws the screen.
+        Args
+            None
+        Returns
+            None
+        """
+        self.render()
 
     def update(self):
         """
@@ -182,11 +403,4 @@ class Interface:
         Returns
             None
         """
-        # Clears the message history.
-        for i in range(self.nl):
-            stdout.write("\033[F")
-            stdout.write("\033[K")
-
-        # Prints the required number of lines and stores the number of lines in `nl`.
-        self.nl = len(self.history) - max(len(self.history) - self.lines, 0)
-        print("\n".join(self.history[-self.nl:]))
+        self.render()
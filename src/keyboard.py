@@ -0,0 +1,228 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `Keyboard` classes, which read input from the terminal for `Interface`.
+On POSIX systems the keyboard is read with `selectors` in cbreak mode, so waiting for input
+or pausing doesn't use any CPU. Other systems fall back to `pytimedinput`.
+"""
+
+from codecs import getincrementaldecoder
+from os import name, read
+from pytimedinput import timedInput
+from sys import stdin, stdout
+from time import monotonic, sleep
+
+if name == "posix":
+    import selectors
+    import termios
+
+
+class Keyboard:
+    """Class that reads lines from the terminal with `input()` and `pytimedinput`. This is used when the
+    terminal can't be read from directly, and is the parent class of `PosixKeyboard`.
+    """
+    def read_line(self, prompt, tm=None) -> tuple:
+        """
+        Shows a prompt and reads a line of input, stopping if the timeout elapses.
+        Args
+            prompt (str): the prompt.
+            tm (float): length of timeout in seconds, or None to wait forever.
+        Returns
+            tuple[str, bool]: the string that was read and whether the input timed out or not.
+        """
+        if tm is None:
+            return input(prompt), False
+        return timedInput(prompt, timeout=tm, resetOnInput=False)
+
+    def read_until(self, target, tm) -> tuple:
+        """
+        Reads what the player types until it matches a string, Enter is pressed or the timeout elapses. A match
+        is taken as soon as its last key is typed, without waiting for Enter. This keyboard can only read whole
+        lines, so Enter is always needed here.
+        Args
+            target (str): the string to match.
+            tm (float): length of timeout in seconds.
+        Returns
+            tuple[str, bool]: the string that was read and whether the input timed out or not.
+        """
+        return self.read_line("", tm)
+
+    def pause(self, tm) -> None:
+        """
+        Waits for a certain amount of time and throws away everything typed in that time.
+        Args
+            tm (float): length of the pause in seconds.
+        Returns
+            None
+        """
+        start = monotonic()
+        while monotonic() - start < tm:
+            timedInput(timeout=float(tm) - (monotonic() - start), resetOnInput=False)
+
+    def clock(self) -> float:
+        """
+        Returns the current time. Used to time battles, and by the timeouts of `read_line()`.
+        Args
+            None
+        Returns
+            float: the time in seconds.
+        """
+        return monotonic()
+
+
+class PosixKeyboard(Keyboard):
+    """Class that reads the terminal one key at a time. The terminal is only put into cbreak mode (no line
+    buffering and no echo) while a line is being read or during a pause, so `input()` still works elsewhere.
+    Inherits from `Keyboard`.
+
+    Attributes:
+        fd (int): the file descriptor of the terminal.
+        selector (selectors.BaseSelector): used to sleep until a key is pressed.
+        decoder (codecs.IncrementalDecoder): turns the bytes that are read into characters.
+        pending (str): characters that were read after the end of the last line. They start the next line.
+    """
+    def __init__(self, fd):
+        """
+        Inits POSIX keyboard class.
+        Args
+            fd (int): the file descriptor of the terminal.
+        """
+        self.fd = fd
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(fd, selectors.EVENT_READ)
+        self.decoder = getincrementaldecoder("utf-8")(errors="ignore")
+        self.pending = ""
+
+    def cbreak(self) -> list:
+        """
+        Turns off line buffering and echo.
+        Args
+            None
+        Returns
+            list: the old terminal settings, to be passed to `restore()`.
+        """
+        old = termios.tcgetattr(self.fd)
+        new = termios.tcgetattr(self.fd)
+        new[3] &= ~(termios.ICANON | termios.ECHO)
+        new[6][termios.VMIN] = 1
+        new[6][termios.VTIME] = 0
+        termios.tcsetattr(self.fd, termios.TCSANOW, new)
+        return old
+
+    def restore(self, old) -> None:
+        """
+        Puts back the terminal settings from `cbreak()`.
+        Args
+            old (list): the old terminal settings.
+        Returns
+            None
+        """
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, old)
+
+    def read_keys(self, tm) -> str:
+        """
+        Sleeps until keys are pressed or the timeout elapses.
+        Args
+            tm (float): length of timeout in seconds, or None to wait forever.
+        Returns
+            str: the keys that were pressed, which is empty if the input timed out.
+        """
+        if self.pending:
+            keys, self.pending = self.pending, ""
+            return keys
+        if not self.selector.select(tm):
+            return ""
+        return self.decoder.decode(read(self.fd, 1024))
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        return self.read_text(prompt, tm)
+
+    def read_until(self, target, tm) -> tuple:
+        return self.read_text("", tm, target)
+
+    def read_text(self, prompt, tm=None, target=None) -> tuple:
+        """
+        Shows a prompt and reads keys until Enter is pressed, the timeout elapses or the line matches a string.
+        Every key is checked as soon as it is read, so a match ends the line on the key that completes it.
+        Args
+            prompt (str): the prompt.
+            tm (float): length of timeout in seconds, or None to wait forever.
+            target (str): the string that ends the line when it is typed, or None to wait for Enter.
+        Returns
+            tuple[str, bool]: the string that was read and whether the input timed out or not.
+        """
+        stdout.write(prompt)
+        stdout.flush()
+        deadline = None if tm is None else monotonic() + tm
+        line = []
+        escape = False # True while skipping an escape sequence, like the arrow keys.
+        old = self.cbreak()
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return "".join(line), True
+                keys = self.read_keys(remaining)
+                echo = []
+                for i, key in enumerate(keys):
+                    if escape:
+                        escape = not key.isalpha() and key != "~"
+                    elif key in "\r\n" and target is not None and not line:
+                        pass # An Enter typed out of habit after the last match, which shouldn't end this line.
+                    elif key in "\r\n": # End of the line, keep the rest for the next line.
+                        self.pending = keys[i + 1:]
+                        stdout.write("".join(echo) + "\n")
+                        stdout.flush()
+                        return "".join(line), False
+                    elif key in "\x7f\x08": # Backspace
+                        if line:
+                            line.pop()
+                            echo.append("\b \b")
+                    elif key == "\x1b":
+                        escape = True
+                    elif key == "\x04" and not line: # Ctrl-D
+                        raise EOFError()
+                    elif key.isprintable():
+                        line.append(key)
+                        echo.append(key)
+                        if target is not None and len(line) == len(target) and "".join(line) == target:
+                            # Matched, so the rest of the keys start the next line.
+                            self.pending = keys[i + 1:]
+                            stdout.write("".join(echo) + "\n")
+                            stdout.flush()
+                            return target, False
+                stdout.write("".join(echo))
+                stdout.flush()
+        finally:
+            self.restore(old)
+
+    def pause(self, tm) -> None:
+        # Echo is off during the pause, so nothing shows up on screen, and what was typed is flushed after.
+        old = self.cbreak()
+        try:
+            sleep(tm)
+            termios.tcflush(self.fd, termios.TCIFLUSH)
+            self.pending = ""
+        finally:
+            self.restore(old)
+
+
+# The keyboard for this process's terminal, made by `open_keyboard()`.
+_keyboard = None
+
+
+def open_keyboard() -> Keyboard:
+    """
+    Returns the keyboard for this process's terminal. There is only one terminal, so every `Interface` shares it.
+    Args
+        None
+    Returns
+        Keyboard: a `PosixKeyboard` if stdin is a terminal on a POSIX system else a `Keyboard`.
+    """
+    global _keyboard
+    if _keyboard is None:
+        if name == "posix" and stdin.isatty():
+            _keyboard = PosixKeyboard(stdin.fileno())
+        else:
+            _keyboard = Keyboard()
+    return _keyboard
@@ -0,0 +1,188 @@
+"""
+ICS3U
+Paul Chen
+This file holds the leaderboard, which keeps a summary of every finished game in an SQLite database.
+Games are written in batches by a background thread, so recording a game never slows down the game loop,
+and the table is indexed so the best runs and percentiles for each difficulty can be found quickly.
+"""
+
+import sqlite3
+from argparse import ArgumentParser
+from queue import Empty, Queue
+from threading import Thread
+from time import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,
+    difficulty INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    hp INTEGER NOT NULL,
+    atk INTEGER NOT NULL,
+    battles INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    hits_per_battle REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_seconds ON runs (difficulty, won, seconds);
+CREATE INDEX IF NOT EXISTS runs_hp ON runs (difficulty, won, hp);
+CREATE INDEX IF NOT EXISTS runs_hits ON runs (difficulty, won, hits_per_battle);
+"""
+
+# The columns that runs can be ranked by, and the order that puts the best runs first.
+RANKINGS = {"seconds": "ASC", "hp": "DESC", "hits_per_battle": "DESC"}
+
+
+class Leaderboard:
+    """Class that records finished games to a database. `record()` only
+    puts the game in a queue, and a background thread writes everything in the queue in one transaction.
+
+    Attributes:
+        filename (str): the path to the database.
+        batch (int): the most games written in one transaction.
+        queue (Queue): the games waiting to be written. None marks the end.
+        writer (Thread): the thread that writes the games.
+    """
+    def __init__(self, filename, batch=1000):
+        """
+        Inits leaderboard class, making the database if it doesn't exist.
+        Args
+            filename (str): the path to the database.
+            batch (int): the most games written in one transaction.
+        """
+        self.filename = filename
+        self.batch = batch
+        with self.connect() as db:
+            db.executescript(SCHEMA)
+        self.queue = Queue()
+        self.writer = Thread(target=self.write, name="leaderboard", daemon=True)
+        self.writer.start()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database. Each thread needs its own connection.
+        Args
+            None
+        Returns
+            sqlite3.Connection: the connection.
+        """
+        db = sqlite3.connect(self.filename)
+        db.execute("PRAGMA journal_mode=WAL") # Lets the queries run while games are being written.
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def record(self, player, seconds: float) -> None:
+        """
+        Queues a finished game to be written.
+        Args
+            player (Player): the player at the end of the game.
+            seconds (float): how long the game took.
+        Returns
+            None
+        """
+        self.queue.put((time(), player.difficulty // 4, player.won, seconds, player.hp, player.atk,
+                        player.battles, player.hits, player.hits / max(player.battles, 1)))
+
+    def write(self) -> None:
+        """
+        Writes queued games until `close()` is called. This runs in the background thread.
+        Args
+            None
+        Returns
+            None
+        """
+        db = self.connect()
+        done = False
+        while not done:
+            rows = [self.queue.get()]
+            # Takes everything else that is waiting, up to the batch size.
+            while len(rows) < self.batch:
+                try:
+                    rows.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            if rows[-1] is None:
+                done = True
+                rows.pop()
+            with db:
+                db.executemany("INSERT INTO runs (finished, difficulty, won, seconds, hp, atk, battles, hits, "
+                               "hits_per_battle) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.close()
+
+    def close(self) -> None:
+        """
+        Writes every queued game and stops the background thread.
+        Args
+            None
+        Returns
+            None
+        """
+        self.queue.put(None)
+        self.writer.join()
+
+
+def top(db: sqlite3.Connection, difficulty: int, by="seconds", n=10) -> list:
+    """
+    Finds the best winning runs on a difficulty.
+    Args
+        db (sqlite3.Connection): the database.
+        difficulty (int): the difficulty, from 1 to 3.
+        by (str): the column to rank by, one of `RANKINGS`.
+        n (int): the number of runs.
+    Returns
+        list[tuple]: the finish time, seconds, HP left, ATK, battles and hits of each run, best first.
+    """
+    return db.execute(f"SELECT finished, seconds, hp, atk, battles, hits FROM runs "
+                      f"WHERE difficulty = ? AND won = 1 ORDER BY {by} {RANKINGS[by]} LIMIT ?",
+                      (difficulty, n)).fetchall()
+
+
+def percentile(db: sqlite3.Connection, difficulty: int, by: str, p: float) -> float:
+    """
+    Finds a percentile of a column over the winning runs on a difficulty. The index on the column is
+    walked in order, so no sorting is done.
+    Args
+        db (sqlite3.Connection): the database.
+        difficulty (int): the difficulty, from 1 to 3.
+        by (str): the column, one of `RANKINGS`.
+        p (float): the percentile, from 0 to 100. Lower percentiles are better runs.
+    Returns
+        float: the value at the percentile, or None if there are no runs.
+    """
+    count = db.execute("SELECT COUNT(*) FROM runs WHERE difficulty = ? AND won = 1", (difficulty,)).fetchone()[0]
+    if count == 0:
+        return None
+    row = db.execute(f"SELECT {by} FROM runs WHERE difficulty = ? AND won = 1 ORDER BY {by} {RANKINGS[by]} "
+                     f"LIMIT 1 OFFSET ?", (difficulty, min(count - 1, int(count * p / 100)))).fetchone()
+    return row[0]
+
+
+def main() -> None:
+    """
+    Entry point for the leaderboard. Prints the best runs and the percentiles for each difficulty.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Shows the Dungeon Escape leaderboard.")
+    parser.add_argument("database", help="the leaderboard database")
+    parser.add_argument("--by", choices=list(RANKINGS), default="seconds", help="what to rank runs by")
+    parser.add_argument("--top", type=int, default=10, help="number of runs to show")
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.database)
+    for difficulty in range(1, 4):
+        print(f"Difficulty {difficulty}")
+        print(f"{'Rank':<6}{'Seconds':>10}{'HP left':>10}{'ATK':>6}{'Battles':>10}{'Hits':>8}")
+        for rank, (finished, seconds, hp, atk, battles, hits) in enumerate(top(db, difficulty, args.by, args.top)):
+            print(f"{rank + 1:<6}{seconds:>10.1f}{hp:>10}{atk:>6}{battles:>10}{hits:>8}")
+        values = [percentile(db, difficulty, args.by, p) for p in [10, 50, 90]]
+        if values[0] is not None:
+            print(f"{args.by}: p10 {values[0]:.1f}, p50 {values[1]:.1f}, p90 {values[2]:.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+ICS3U
+Paul Chen
+This file holds the load tester, which finds out how many players one server can handle. It starts the server,
+then connects more and more simulated players to it. Each simulated player keeps a copy of the screen from
+what the server sends, and plays full games with an agent from `agents.py`, waiting as long as the agent takes
+to type each sequence. For each number of players it reports the latency percentiles, the throughput and the
+memory the server uses for each session.
+"""
+
+import asyncio
+import re
+import socket
+import sys
+from argparse import ArgumentParser
+from codecs import getincrementaldecoder
+from os import path
+from subprocess import Popen
+from time import perf_counter
+from agents import AGENTS
+from interface import CHOICE_PROMPT, CONTINUE_PROMPT, DRINK_PROMPT, PAUSE, ROOM_PROMPT, TURN_PROMPT, TYPE_LETTERS
+from main import DIFFICULTY_MENU
+from player import time_limit
+from server import NOP, RESUME_PROMPT
+
+# The escape codes and text that the server writes: moving the cursor to a row, clearing the screen, moving
+# the cursor home, clearing to the end of the line and clearing below the cursor. An escape code cut off at the
+# end of a read is kept until the rest arrives.
+TOKEN = re.compile(r"\x1b\[(\d+);1H|\x1b\[(2J|H|K|J)|(\r\n)|([^\x1b\r]+|\r)|(\x1b[\[\d;]*)")
+
+# The questions that the server asks.
+PROMPTS = [CHOICE_PROMPT, RESUME_PROMPT, ROOM_PROMPT, DRINK_PROMPT, TURN_PROMPT, CONTINUE_PROMPT]
+
+# Finds a room in the list of rooms, the room that a hint says to go to, and the player's HP in the room info.
+ROOM = re.compile(r"    \d+\. (.*)")
+HINT = re.compile(r"Hint: go to the (.*?)\. You are")
+HP = re.compile(r"    HP: (\d+)")
+
+
+class Screen:
+    """Class that keeps a copy of a player's screen. It understands the escape codes that `Interface.render()`
+    writes, where every row that is drawn is written in full from its first column.
+
+    Attributes:
+        rows (dict[int, str]): the text on each row, keyed by the row number starting from 1.
+        cursor (int): the row the cursor is on.
+        pending (str): the start of an escape code that was cut off at the end of the last read.
+        drawn (bool): True if `feed()` has stopped right after a redraw else False.
+    """
+    def __init__(self):
+        """
+        Inits screen class.
+        """
+        self.rows = {}
+        self.cursor = 1
+        self.pending = ""
+        self.drawn = False
+
+    def feed(self, text: str):
+        """
+        Updates the screen with text from the server. This is a generator that stops after every redraw, since
+        one read can hold several, and once more at the end.
+        Args
+            text (str): the text.
+        Returns
+            generator: yields None after each redraw and at the end.
+        """
+        text = self.pending + text
+        self.pending = ""
+        for match in TOKEN.finditer(text):
+            row, code, newline, chars, partial = match.groups()
+            if row is not None:
+                self.cursor = int(row)
+                self.rows[self.cursor] = ""
+            elif code == "2J":
+                self.rows.clear()
+            elif code == "H":
+                self.cursor = 1
+            elif code == "J": # Every redraw ends by clearing below the frame.
+                for r in [r for r in self.rows if r >= self.cursor]:
+                    del self.rows[r]
+                self.drawn = True
+                yield
+                self.drawn = False
+            elif newline is not None:
+                self.cursor += 1
+            elif chars is not None:
+                self.rows[self.cursor] = self.rows.get(self.cursor, "") + chars
+            elif partial is not None and match.end() == len(text):
+                self.pending = partial
+        yield
+
+    def line(self) -> str:
+        """
+        Returns the row the cursor is on, which holds the question being asked.
+        Args
+            None
+        Returns
+            str: the row.
+        """
+        return self.rows.get(self.cursor, "")
+
+    def bottom(self, n=1) -> str:
+        """
+        Returns a row of the frame counting up from the bottom, where the newest events are.
+        Args
+            n (int): 1 for the bottom row, 2 for the row above it and so on.
+        Returns
+            str: the row.
+        """
+        return self.rows.get(self.cursor - n, "")
+
+    def find(self, text: str) -> int:
+        """
+        Finds the lowest row that starts with some text.
+        Args
+            text (str): the text.
+        Returns
+            int: the row number, or 0 if no row starts with the text.
+        """
+        return max((r for r, line in self.rows.items() if line.startswith(text)), default=0)
+
+
+class Stats:
+    """Class that collects the measurements of every simulated player in a stage.
+
+    Attributes:
+        echo (list[float]): the seconds from sending a typed sequence to the screen being redrawn.
+        attack (list[float]): the seconds from the end of an attack to the next question, not counting the
+            server's pauses before each message.
+        keystrokes (int): the number of lines sent.
+        games (int): the number of games finished.
+        errors (int): the number of players whose connection failed.
+    """
+    def __init__(self):
+        """
+        Inits stats class.
+        """
+        self.echo = []
+        self.attack = []
+        self.keystrokes = 0
+        self.games = 0
+        self.errors = 0
+
+
+class Client:
+    """Class for one simulated player. It reads what the server sends, and whenever the server asks a question
+    or shows a new sequence in a battle, it asks its agent what to type.
+
+    The end of an attack is when the line above the sequences is taken off the screen. The server sends a telnet
+    NOP before each of the pauses that the game makes between messages, and the attack latency leaves those
+    pauses out, so it only measures the server's own delay.
+
+    Attributes:
+        agent (Agent): the agent that decides what to type.
+        stats (Stats): where the measurements go.
+        screen (Screen): the copy of the screen.
+        answered (bool): True if the question or sequence on screen has been answered else False.
+        ready (bool): True if the next new sequence on screen should be typed else False.
+        attack_start (float): when the current attack started, or None outside of attacks.
+        attack_end (float): when the last attack ended, or None if the next question has been asked.
+        pauses (int): the number of pauses the server has made.
+        attack_pauses (int): the number of pauses the server had made when the last attack ended.
+        sent (float): when the last typed sequence was sent, or None if the screen has been redrawn since.
+        typing (asyncio.TimerHandle): sends the sequence being typed once the agent has finished, or None.
+        writer (asyncio.StreamWriter): the stream to write to.
+    """
+    def __init__(self, agent, stats):
+        """
+        Inits client class.
+        Args
+            agent (Agent): the agent that decides what to type.
+            stats (Stats): where the measurements go.
+        """
+        self.agent = agent
+        self.stats = stats
+        self.screen = Screen()
+        self.answered = False
+        self.ready = False
+        self.attack_start = None
+        self.attack_end = None
+        self.pauses = 0
+        self.attack_pauses = 0
+        self.sent = None
+        self.typing = None
+        self.writer = None
+
+    async def play(self, host: str, port: int) -> None:
+        """
+        Plays games until the connection closes or the task is cancelled.
+        Args
+            host (str): the server's address.
+            port (int): the server's port.
+        Returns
+            None
+        """
+        try:
+            reader, self.writer = await asyncio.open_connection(host, port)
+        except OSError:
+            self.stats.errors += 1
+            return
+        decoder = getincrementaldecoder("utf-8")(errors="ignore")
+        carry = b"" # The first byte of a NOP that was cut off at the end of a read.
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                data, carry = carry + data, b""
+                if data.endswith(NOP[:1]):
+                    data, carry = data[:-1], NOP[:1]
+                for part, text in enumerate(data.split(NOP)):
+                    if part: # A pause starts here.
+                        self.pauses += 1
+                    for i in self.screen.feed(decoder.decode(text)):
+                        now = perf_counter()
+                        if self.screen.drawn:
+                            if self.sent is not None:
+                                self.stats.echo.append(now - self.sent)
+                                self.sent = None
+                            self.answered = False
+                        self.react(now)
+        except (ConnectionError, OSError):
+            self.stats.errors += 1
+        finally:
+            if self.typing is not None:
+                self.typing.cancel()
+            self.writer.close()
+
+    def react(self, now: float) -> None:
+        """
+        Answers the question or sequence on screen, if there is a new one. A sequence is sent once the agent has
+        had time to type it, without waiting here, so the client keeps reading while it types.
+        Args
+            now (float): when the screen was last redrawn.
+        Returns
+            None
+        """
+        screen = self.screen
+        attacking = screen.find(TYPE_LETTERS) != 0
+        if self.attack_start is not None and not attacking: # The attack is over.
+            self.attack_start = None
+            self.attack_end = now
+            self.attack_pauses = self.pauses
+        if self.answered:
+            return
+
+        # A question.
+        line = screen.line()
+        prompt = next((p for p in PROMPTS if line.endswith(p)), None)
+        if prompt is not None:
+            if self.attack_end is not None:
+                self.stats.attack.append(now - self.attack_end - PAUSE * (self.pauses - self.attack_pauses))
+                self.attack_end = None
+            self.send(self.answer(prompt))
+            return
+
+        # A sequence in a battle, shown below the line above the sequences.
+        if not attacking:
+            return
+        if screen.bottom() == TYPE_LETTERS:
+            if self.attack_start is None:
+                self.attack_start = now
+            self.ready = True
+        elif self.ready and screen.bottom(2) == TYPE_LETTERS:
+            self.ready = False
+            self.answered = True
+            tm = time_limit(self.agent.difficulty) - (now - self.attack_start)
+            typed, seconds = self.agent.type_challenge(screen.bottom(), tm)
+            if seconds < tm: # Anything slower times out, so nothing is sent.
+                self.typing = asyncio.get_running_loop().call_later(seconds, self.send_typed, typed)
+
+    def answer(self, prompt: str) -> str:
+        """
+        Works out the answer to a question.
+        Args
+            prompt (str): the question.
+        Returns
+            str: the answer.
+        """
+        screen = self.screen
+        if prompt == CHOICE_PROMPT: # The main menu or the difficulty menu.
+            if screen.find(DIFFICULTY_MENU.split("\n")[0]):
+                return str(self.agent.select_difficulty())
+            return "1"
+        if prompt == ROOM_PROMPT:
+            start = screen.find("Choose one of the following rooms")
+            rooms = []
+            for r in range(start + 1, screen.cursor):
+                match = ROOM.fullmatch(screen.rows.get(r, "").rstrip())
+                if match is None:
+                    break
+                rooms.append(match.group(1))
+            hint_row = screen.find("Hint:")
+            if hint_row > start:
+                hint = HINT.search("".join(screen.rows.get(r, "") for r in range(hint_row, screen.cursor)))
+                return str(self.agent.choose_room(rooms, hint.group(1) if hint else None))
+            return "?" if self.agent.hints else str(self.agent.choose_room(rooms, None))
+        if prompt == DRINK_PROMPT:
+            match = next(m for m in (HP.match(screen.rows[r]) for r in sorted(screen.rows)) if m)
+            return "y" if self.agent.drink_potion(int(match.group(1))) else "n"
+        if prompt == CONTINUE_PROMPT: # Only shown after a game, since the tutorial is never chosen.
+            self.stats.games += 1
+        return ""
+
+    def send(self, line: str) -> None:
+        """
+        Sends a line to the server.
+        Args
+            line (str): the line, without the newline.
+        Returns
+            None
+        """
+        self.answered = True
+        self.stats.keystrokes += 1
+        self.writer.write((line + "\r\n").encode())
+
+    def send_typed(self, line: str) -> None:
+        """
+        Sends a sequence that the agent has finished typing, and starts timing its echo.
+        Args
+            line (str): the sequence.
+        Returns
+            None
+        """
+        self.typing = None
+        self.send(line)
+        self.sent = perf_counter()
+
+
+def percentiles(values: list, ps=(50, 95, 99)) -> list:
+    """
+    Works out percentiles of some values.
+    Args
+        values (list[float]): the values.
+        ps (tuple[float]): the percentiles, from 0 to 100.
+    Returns
+        list[float]: the value at each percentile, or None for each if there are no values.
+    """
+    if not values:
+        return [None] * len(ps)
+    values = sorted(values)
+    return [values[min(len(values) - 1, int(len(values) * p / 100))] for p in ps]
+
+
+def rss(pid: int) -> int:
+    """
+    Finds how much memory a process is using. This only works on Linux.
+    Args
+        pid (int): the process.
+    Returns
+        int: the resident set size in bytes, or None if it can't be read.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+async def stage(host: str, port: int, clients: int, seconds: float, agent, pid=None) -> dict:
+    """
+    Connects a number of simulated players and lets them play for a while.
+    Args
+        host (str): the server's address.
+        port (int): the server's port.
+        clients (int): the number of simulated players.
+        seconds (float): how long to play for.
+        agent (type): the `Agent` class that each player uses.
+        pid (int): the server's process, to measure its memory, or None to not measure it.
+    Returns
+        dict: the measurements.
+    """
+    stats = Stats()
+    tasks = [asyncio.create_task(Client(agent(), stats).play(host, port)) for i in range(clients)]
+    await asyncio.sleep(seconds)
+    memory = rss(pid) if pid is not None else None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"clients": clients, "echo": percentiles(stats.echo), "attack": percentiles(stats.attack),
+            "keystrokes": stats.keystrokes / seconds, "games": stats.games * 60 / seconds,
+            "errors": stats.errors, "rss": memory}
+
+
+async def wait_for_server(host: str, port: int, timeout=10.0) -> None:
+    """
+    Waits until the server accepts connections.
+    Args
+        host (str): the server's address.
+        port (int): the server's port.
+        timeout (float): the most seconds to wait.
+    Returns
+        None
+    """
+    deadline = perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def free_port() -> int:
+    """
+    Finds a port that nothing is listening on.
+    Args
+        None
+    Returns
+        int: the port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ms(value: float) -> str:
+    """
+    Formats a number of seconds as milliseconds for the report.
+    Args
+        value (float): the seconds, or None.
+    Returns
+        str: the milliseconds.
+    """
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+async def load_test(stages: list, seconds: float, agent, connect=None) -> None:
+    """
+    Runs each stage and prints a line of the report for it.
+    Args
+        stages (list[int]): the number of simulated players in each stage.
+        seconds (float): how long each stage lasts.
+        agent (type): the `Agent` class that each player uses.
+        connect (tuple[str, int]): the address of a running server, or None to start one.
+    Returns
+        None
+    """
+    server = None
+    if connect is None:
+        host, port = "127.0.0.1", free_port()
+        server = Popen([sys.executable, path.join(path.dirname(path.abspath(__file__)), "server.py"),
+                        "--host", host, "--port", str(port), "--max-sessions", str(max(stages))])
+    else:
+        host, port = connect
+    try:
+        await wait_for_server(host, port)
+        idle = rss(server.pid) if server is not None else None
+        print(f"{'Clients':>8}{'Echo p50':>10}{'p95':>8}{'p99':>8}{'Attack p50':>12}{'p95':>8}{'p99':>8}"
+              f"{'Keys/s':>8}{'Games/min':>11}{'Errors':>8}{'KB/session':>12}")
+        for clients in stages:
+            result = await stage(host, port, clients, seconds, agent, server.pid if server is not None else None)
+            per_session = "-" if idle is None or result["rss"] is None else \
+                f"{(result['rss'] - idle) / clients / 1024:.0f}"
+            echo, attack = result["echo"], result["attack"]
+            print(f"{clients:>8}{ms(echo[0]):>10}{ms(echo[1]):>8}{ms(echo[2]):>8}{ms(attack[0]):>12}"
+                  f"{ms(attack[1]):>8}{ms(attack[2]):>8}{result['keystrokes']:>8.1f}{result['games']:>11.1f}"
+                  f"{result['errors']:>8}{per_session:>12}", flush=True)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    """
+    Entry point for the load tester.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Finds how many players a Dungeon Escape server can handle.")
+    parser.add_argument("--clients", default="10,50,100,200",
+                        help="comma separated numbers of simulated players, one stage each")
+    parser.add_argument("--seconds", type=float, default=60.0, help="how long each stage lasts")
+    parser.add_argument("--agent", choices=list(AGENTS), default="typing", help="the agent each player uses")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="test a server that is already running instead of starting one")
+    args = parser.parse_args()
+    connect = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        connect = (host, int(port))
+    asyncio.run(load_test([int(n) for n in args.clients.split(",")], args.seconds, AGENTS[args.agent], connect))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,16 @@
 ICS3U
 Paul Chen
 This file holds the code for the `Location` class as well as all the classes that inherit
-from it. It holds all the information about the locations present in the game.
+from it. It holds all the code for the locations present in the game. The rooms themselves,
+with their names, descriptions and enemies, are listed in `content.json`.
 """
 
-import enemy
+from array import array
+from content import CONTENT, RoomType
+from events import EnemyAppeared, EnemyHit, GameOver, ItemPicked, PlayerHit, PotionEffect, RoomCleared, RoomEntered
+from functools import partial
+from minimap import beside, get_minimap
+from planner import plan
 from player import Player
 from random import choice, randint
 
@@ -13,29 +19,36 @@ from random import choice, randint
 class Location:
     """Class that represents a location. Each location represents a node in the tree that 
     represents the map. These locations would be connected together at random at game start.
+    Every game has its own instance of each location, which is made by `World` from a `RoomType`
+    in the content. This class runs rooms that don't do anything special, and is the parent class
+    of the rooms that do.
 
     Attributes:
+        type (RoomType): the room's entry in the content.
         rooms (list[Location]): the rooms that are adjacent to the current location.
-        enemies (list[Enemy]): the enemies present in a location.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room. Used when enemies 
-            are generated. This list is left empty if the enemies in the room aren't generated at random.
+        enemies (list[EnemyType]): the enemies present in a location.
+        possible_enemies (tuple[EnemyType]): the enemies that can appear in a room. Used when enemies 
+            are generated. This is left empty if the enemies in the room aren't generated at random.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
+        world (World): the game that the location belongs to.
         player (Player): the player.
     """
-    rooms: list
-    enemies: list
-    possible_enemies: list
-    name: str
-    visited: bool
-
-    def __init__(self, player: Player):
+    def __init__(self, world: "World", room_type: RoomType):
         """
         Inits location class.
         Args
-            player (Player): the player.
-        """
-        self.player = player
+            world (World): the game that the location belongs to.
+            room_type (RoomType): the room's entry in the content.
+        """
+        self.type = room_type
+        self.world = world
+        self.player = world.player
+        self.rooms = []
+        self.enemies = list(room_type.enemies)
+        self.possible_enemies = room_type.possible_enemies
+        self.name = room_type.name
+        self.visited = False
 
     def on_enter(self) -> None:
         """
@@ -45,17 +58,17 @@ class Location:
         Returns
             None
         """
-        self.player.io.push(f"You entered the {self.name}.")
+        self.player.events.publish(RoomEntered(self))
 
     def description(self) -> str:
         """
-        Returns the description of the room.
+        Returns the description of the room. By default this is the description in the content.
         Args
             None
         Returns
             str: the description of the room.
         """
-        pass
+        return self.type.description
 
     def display(self) -> None:
         """
@@ -66,7 +79,7 @@ class Location:
             None
         """
         # Adds the location description, name; the player's HP, ATK, and items; and the enemies present in the room.
-        self.player.io.set_room_info(f"""{self.description()}
+        info = f"""{self.description()}
 
     Location: {self.name}
     HP: {self.player.hp}
@@ -74,7 +87,12 @@ class Location:
     Items: [{", ".join(self.player.items)}]
 
 {"Enemies in this room: [" + (", ".join(e.name for e in reversed(self.enemies))) + "]"}
-""")
+"""
+
+        # Adds the map of the explored rooms next to the info, if there is room for it.
+        if self.player.io.show_map:
+            info = beside(info, get_minimap(self.world).draw(self), self.player.io.width, self.player.io.room_rows())
+        self.player.io.set_room_info(info)
 
     def battle(self) -> None:
         """
@@ -88,37 +106,29 @@ class Location:
         if len(self.enemies) == 0:
             return
 
-        # Lambda function to generate the determiner that precedes a word.
-        determiner = lambda next: "An" if next[0].lower() in "aeiou" else "A"
+        self.player.battles += 1
+        events = self.player.events
 
         # Main battle loop, keeps running until all the enemies in the room have been defeated.
         while len(self.enemies) and self.player:
-            enemy_name = self.enemies[-1].name  # Enemy's name
-            enemy_inst = self.enemies[-1]()  # Instance of Enemy's class
+            enemy_type = self.enemies[-1]  # Enemy's stats, worked out when the content was loaded
+            enemy_inst = enemy_type()  # Instance of Enemy's class, which only holds its HP
 
             # Add message.
-            self.player.io.push(
-                f"""{determiner(enemy_name)} {enemy_name} walks up to you...
-    HP: {enemy_inst.hp}
-    ATK: {enemy_inst.atk}""")
+            events.publish(EnemyAppeared(enemy_type, enemy_inst.hp))
 
             # Loop that keeps running until either the current enemy or the player dies.
             while enemy_inst.hp > 0 and self.player:
                 # The player's attack
                 num_hits = self.player.attack(
-                    enemy_inst.difficulty)  # Number of hits
+                    enemy_type.difficulty)  # Number of hits
+                self.player.hits += num_hits
                 dmg_dealt = num_hits * self.player.atk  # Damage dealt
-                self.player.io.push(
-                    f"You have hit {num_hits} times dealing {dmg_dealt} damage."
-                )
                 enemy_inst.hp = max(0, enemy_inst.hp - dmg_dealt)
-                self.player.io.push(
-                    f"The {enemy_name} is left with {enemy_inst.hp} HP.")
+                events.publish(EnemyHit(enemy_type, num_hits, dmg_dealt, enemy_inst.hp))
 
                 # Checks if the enemy is has been defeated, if so, break out of the loop.
                 if enemy_inst.hp == 0:
-                    self.player.io.push(
-                        f"The {enemy_name} has been defeated! You win!")
                     self.enemies.pop()
                     self.display(
                     )  # We popped an enemy from the list, so we redraw the screen.
@@ -126,17 +136,15 @@ class Location:
 
                 # The enemy's attack
                 enemy_hits = enemy_inst.attack()  # Number of hits
-                enemy_dmg = enemy_hits * enemy_inst.atk  # Damage dealt
-                self.player.io.push(
-                    f"The {enemy_name} has hit you {enemy_hits} times dealing {enemy_dmg} damage."
-                )
+                enemy_dmg = enemy_hits * enemy_type.atk  # Damage dealt
+                events.publish(PlayerHit(enemy_type, enemy_hits, enemy_dmg))
                 self.player.hp = max(0, self.player.hp - enemy_dmg)
                 self.display(
                 )  # The player's HP would've changed, so we redraw the screen.
         if self.player.hp == 0:  # Player loses.
-            self.player.io.push(f"Your HP has dropped to 0.\nGame Over")
+            events.publish(GameOver(False))
         else:  # Player wins.
-            self.player.io.push("You have defeated every monster in the room!")
+            events.publish(RoomCleared(self))
 
     def on_battle_finish(self) -> None:
         """
@@ -156,17 +164,8 @@ class Location:
         Returns
             Location: next location to visit.
         """
-        # Displays the list of rooms that can be travelled to.
-        self.player.io.push("Choose one of the following rooms to go to: " + "".join(
-            f"\n    {i + 1}. {self.rooms[i].name}"
-            for i in range(len(self.rooms))))
-
-        # Keeps taking in input until it is valid.
-        inp = self.player.io.input("Where would you like to go: ")
-        while not inp.isdigit() or int(inp) < 1 or int(inp) > len(self.rooms):
-            self.player.io.push("Invalid Input")
-            inp = self.player.io.input("Where would you like to go: ")
-        return self.rooms[int(inp) - 1]
+        # The route is only planned if the player asks for a hint.
+        return self.player.io.choose_room(self.rooms, partial(plan, self.world, self))
 
     def run(self) -> "Location":
         """
@@ -176,6 +175,7 @@ class Location:
         Returns
             Location: next location to visit.
         """
+        self.world.enter(self)
         self.on_enter()
         self.display()
         self.battle()
@@ -197,17 +197,12 @@ class Entrance(Location):
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list 
             isn't randomly generated and should only contain `Stairway`.
-        enemies (list[Enemy]): the enemies present in a location. This list should be empty at the beginning of 
+        enemies (list[EnemyType]): the enemies present in a location. This list should be empty at the beginning of 
             the game and should contain one `Dragon` at the end which also serves as the final boss of the game.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room. This list should always be empty.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room. This list should always be empty.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = []
-    possible_enemies = []
-    name = "Entrance"
-    visited = False
 
     def on_enter(self) -> None:
         """
@@ -218,8 +213,8 @@ class Entrance(Location):
             None
         """
         super().on_enter()
-        if Entrance.visited:
-            Entrance.enemies.append(enemy.Dragon)
+        if self.visited:
+            self.enemies.append(self.world.content.enemy("Dragon"))
 
     def description(self) -> str:
         """
@@ -230,7 +225,7 @@ class Entrance(Location):
         Returns
             str: the description.
         """
-        if Entrance.visited:
+        if self.visited:
             return """Just as you think that you have made it out alive, a dragon flies down 
 from the sky and lands next to you!"""
         return """You are a knight looking for a treasure chest hidden in the DUNGEON OF DOOM.
@@ -245,12 +240,10 @@ Search through the dungeon to find it!"""
         Returns
             None
         """
-        if Entrance.visited:
-            self.player.io.push(
-                "You have found the treasure and defeated the dragon! You Win!"
-            )
-            self.player.hp = 0
-        Entrance.visited = True
+        if self.visited:
+            self.player.won = True
+            self.player.events.publish(GameOver(True))
+        self.visited = True
 
 
 class Stairway(Location):
@@ -262,16 +255,11 @@ class Stairway(Location):
             isn't randomly generated and should only contain `Entrance` and `Hall`. After the player
             enters this room, `Entrance` is taken off of this list until the player finds the key
             and the treasure.
-        enemies (list[Enemy]): the enemies present in a location. This list should only contain one `Guard`.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room. This list should always be empty.
+        enemies (list[EnemyType]): the enemies present in a location. This list should only contain one `Guard`.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room. This list should always be empty.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = [enemy.Guard]
-    possible_enemies = []
-    name = "Narrow Stairway"
-    visited = False
 
     def on_enter(self) -> None:
         """
@@ -283,9 +271,10 @@ class Stairway(Location):
         """
         super().on_enter()
         # Append `Entrance` to the rooms that can be visited if the player has the key and the treasure.
+        entrance = self.world["Entrance"]
         if all(e in self.player.items for e in
-               ["Key", "Treasure"]) and not Stairway.rooms.count(Entrance):
-            Stairway.rooms.append(Entrance)
+               ["Key", "Treasure"]) and not self.rooms.count(entrance):
+            self.rooms.append(entrance)
 
     def description(self) -> str:
         """
@@ -297,7 +286,7 @@ class Stairway(Location):
         Returns
             str: the description.
         """
-        if not Stairway.visited: # First visit
+        if not self.visited: # First visit
             return """You enter through the stairway as the doors suddenly shut and lock behind you.
 You're trapped unless you find the key to the door!"""
         if all(e in self.player.items for e in ["Key", "Treasure"]): # Player has key and treasure
@@ -319,7 +308,7 @@ but you just need a way to unlock the door!"""
         Returns
             None
         """
-        Stairway.visited = True
+        self.visited = True
 
 
 class Hall(Location):
@@ -330,26 +319,11 @@ class Hall(Location):
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will contain `Stairway`
         but the rest of the contents will be randomized.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = []
-    possible_enemies = [enemy.Guard, enemy.Goblin]
-    name = "Main Hall"
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You enter through a grand hallway. It seems nearly endless."
 
     def on_battle_finish(self) -> None:
         """
@@ -359,7 +333,7 @@ class Hall(Location):
         Returns
             None
         """
-        Hall.visited = True
+        self.visited = True
 
 
 class WitchsHut(Location):
@@ -368,26 +342,11 @@ class WitchsHut(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = []
-    possible_enemies = [enemy.Witch, enemy.Guard, enemy.Ghost]
-    name = "Witch's Hut"
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You find a room filled with potions containing mysterious liquids and bubbling cauldrons."
 
     def on_battle_finish(self) -> None:
         """
@@ -398,25 +357,17 @@ class WitchsHut(Location):
         Returns
             None
         """
-        if WitchsHut.visited:
+        if self.visited:
             return
-        WitchsHut.visited = True
+        self.visited = True
         # Asks the user if they want to drink the potion.
         self.player.io.push("You find a glass containing a mysterious liquid.")
-        choice = self.player.io.input("Do you want to drink it [Y/n]? ")
         # Check if the player wants to drink the potion, and return if not.
-        if len(choice) == 0 or choice[0].lower() != "y":
+        if not self.player.io.drink_potion(self.player.hp):
             return
         if randint(0, 1): # Change HP if True
             change_val = randint(-10, 15) # Amount that your HP will change by.
-            if change_val < 0: # HP goes down
-                self.player.io.push(
-                    f"Oh No! Your HP has decreased by {-change_val}")
-            elif change_val > 0: # HP goes up
-                self.player.io.push(
-                    f"Your HP has increased by {change_val}!")
-            else: # HP stays the same
-                self.player.io.push("Nothing has happened...")
+            self.player.events.publish(PotionEffect("HP", change_val))
 
             # Update player HP.
             self.player.hp = min(max(0, self.player.hp + change_val), 80)
@@ -426,18 +377,11 @@ class WitchsHut(Location):
             
             # Runs if the player dies from the potion.
             if self.player.hp == 0:
-                self.player.io.push(f"Your HP has dropped to 0.\nGame Over")
+                self.player.events.publish(GameOver(False))
                 return
         else: # Change ATK if False
             change_val = randint(-1, 2) # Amount that your ATK will change by.
-            if change_val < 0: # ATK goes down
-                self.player.io.push(
-                    f"Oh No! Your ATK has decreased by {-change_val}!")
-            elif change_val > 0: # ATK goes up
-                self.player.io.push(
-                    f"Your ATK has increased by {change_val}!")
-            else: # ATK stays the same
-                self.player.io.push("Nothing has happened...")
+            self.player.events.publish(PotionEffect("ATK", change_val))
 
             # Update player ATK.
             self.player.atk = max(0, self.player.atk + change_val)
@@ -452,26 +396,11 @@ class Armoury(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    name = "Armoury"
-    enemies = []
-    possible_enemies = [enemy.Guard, enemy.Ogre]
-    rooms = []
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You find a room filled with weapons and armour."
 
     def on_battle_finish(self) -> None:
         """
@@ -481,11 +410,10 @@ class Armoury(Location):
         Returns
             None
         """
-        if Armoury.visited:
+        if self.visited:
             return
-        Armoury.visited = True
-        self.player.io.push("You find a new sword!") # Sends message.
-        self.player.io.push("Your ATK has increased by 2.")
+        self.visited = True
+        self.player.events.publish(ItemPicked("Sword")) # Sends message.
         self.player.atk += 2 # Update player ATK.
         self.display() # Redraw screen with new stats.
 
@@ -495,26 +423,11 @@ class Prison(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    name = "Prison"
-    enemies = []
-    possible_enemies = [enemy.Guard, enemy.Ghost, enemy.Ogre]
-    rooms = []
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You enter a large room containing rows of prison cells."
 
     def on_battle_finish(self) -> None:
         """
@@ -524,12 +437,10 @@ class Prison(Location):
         Returns
             None
         """
-        if Prison.visited:
+        if self.visited:
             return
-        Prison.visited = True
-        self.player.io.push( # Send message.
-            "You found a key lying on the ground! Will this open the front door?"
-        )
+        self.visited = True
+        self.player.events.publish(ItemPicked("Key")) # Send message.
         self.player.items.append("Key") # Add key to inventory.
         self.display() # Redraw screen with new info.
 
@@ -540,26 +451,11 @@ class Hatchery(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = [enemy.DragonHatchling, enemy.Guard, enemy.Guard]
-    possible_enemies = []
-    name = "Hatchery"
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You have found a small, heavily guarded room with one single egg in the middle."
 
     def on_battle_finish(self) -> None:
         """
@@ -569,7 +465,7 @@ class Hatchery(Location):
         Returns
             None
         """
-        Hatchery.visited = True
+        self.visited = True
 
 
 class Hospital(Location):
@@ -578,26 +474,11 @@ class Hospital(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    name = "Hospital"
-    enemies = []
-    possible_enemies = [enemy.Guard, enemy.Ghost, enemy.Goblin, enemy.Witch]
-    rooms = []
-    visited = False
-
-    def description(self) -> str:
-        """
-        Returns the description for the room.
-        Args
-            None
-        Returns
-            str: the description.
-        """
-        return "You enter a room that contains a couple beds. There are medical supplies scattered throughout."
 
     def on_battle_finish(self) -> None:
         """
@@ -607,12 +488,10 @@ class Hospital(Location):
         Returns
             None
         """
-        if Hospital.visited:
+        if self.visited:
             return
-        Hospital.visited = True
-        self.player.io.push( # Send message
-            "You find some bandages lying around and cover up your wounds.")
-        self.player.io.push(f"Your HP has increased by 20!")
+        self.visited = True
+        self.player.events.publish(ItemPicked("Bandages")) # Send message
         self.player.hp = min(self.player.hp + 20, 80) # Update player HP, make sure that it is capped at 80.
         self.display() # Redraw screen because of new stats.
 
@@ -622,16 +501,11 @@ class TreasureRoom(Location):
 
     Attributes:
         rooms (list[Location]): the rooms that are adjacent to the current location. This list will be generated randomly.
-        enemies (list[Enemy]): the enemies present in a location. This list will be generated randomly.
-        possible_enemies (list[Enemy]): the enemies that can appear in a room.
+        enemies (list[EnemyType]): the enemies present in a location. This list will be generated randomly.
+        possible_enemies (list[EnemyType]): the enemies that can appear in a room.
         name (str): the name of the location.
         visited (bool): True if the room as been visited else False.
     """
-    rooms = []
-    enemies = []
-    possible_enemies = [enemy.Guard, enemy.Goblin, enemy.Ogre]
-    name = "Treasure Room"
-    visited = False
 
     def description(self) -> str:
         """
@@ -642,7 +516,7 @@ class TreasureRoom(Location):
         Returns
             str: the description.
         """
-        if not TreasureRoom.visited:
+        if not self.visited:
             return "You enter a room filled with gold. You have found the room containing the treasure in the dungeon!"
         return "You enter the treasure room that you have already collected."
 
@@ -654,93 +528,219 @@ class TreasureRoom(Location):
         Returns
             None
         """
-        if TreasureRoom.visited:
+        if self.visited:
             return
-        TreasureRoom.visited = True
-        self.player.io.push("You picked up all the treasure in the room.") # Send message
+        self.visited = True
+        self.player.events.publish(ItemPicked("Treasure")) # Send message
         self.player.items.append("Treasure") # Update inventory
         self.display() # Redraw screen with new info
 
 
-def generate_enemies(difficulty: int) -> None:
+# The `Location` class that runs each kind of room, keyed by the `behaviour` given in the content.
+BEHAVIOURS = {room.__name__: room for room in [Location] + Location.__subclasses__()}
+
+
+class World:
+    """Class that holds a single game. It owns the player and one location for every room in the content, so
+    the adjacency, enemies and visited flags of one game are separate from every other game in the process.
+
+    Attributes:
+        player (Player): the player.
+        content (Content): the rooms and enemies that the game is made from.
+        locations (dict[str, Location]): the location for each room in this game, keyed by the room's key.
+        size (int): the number of rooms. Each room is numbered by the id of its `RoomType`.
+        planner (Planner): the route planner for the hints, made the first time a hint is asked for.
+        minimap (Minimap): the map of the explored rooms, made the first time a room is shown.
+    """
+    def __init__(self, player: Player, content=None):
+        """
+        Inits world class.
+        Args
+            player (Player): the player.
+            content (Content): the rooms and enemies that the game is made from. Defaults to `CONTENT`.
+        """
+        self.player = player
+        self.content = content if content is not None else CONTENT
+        self.locations = {room.key: BEHAVIOURS[room.behaviour](self, room) for room in self.content.rooms}
+        self.size = len(self.content.rooms)
+        self.planner = None
+        self.minimap = None
+
+    def __getitem__(self, key: str) -> Location:
+        """
+        Returns this game's location for a room.
+        Args
+            key (str): the key of the room in the content.
+        Returns
+            Location: the location.
+        """
+        return self.locations[key]
+
+    def room(self, index: int) -> Location:
+        """
+        Returns the location for a numbered room.
+        Args
+            index (int): the number of the room.
+        Returns
+            Location: the location.
+        """
+        return self.locations[self.content.rooms[index].key]
+
+    def index(self, location: Location) -> int:
+        """
+        Returns the number of a room.
+        Args
+            location (Location): the location.
+        Returns
+            int: the number of the room.
+        """
+        return location.type.id
+
+    def find(self, key: str) -> int:
+        """
+        Returns the number of the first room made from a room in the content.
+        Args
+            key (str): the key of the room in the content.
+        Returns
+            int: the number of the room.
+        """
+        return self.content.room_ids[key]
+
+    def neighbours(self, index: int) -> list:
+        """
+        Returns the rooms next to a room.
+        Args
+            index (int): the number of the room.
+        Returns
+            list[int]: the numbers of the rooms next to it.
+        """
+        return [room.type.id for room in self.room(index).rooms]
+
+    def enter(self, location: Location) -> None:
+        """
+        Runs when the player enters a location, before anything else happens. Every room in this
+        world is connected up front, so this does nothing. Worlds that make their rooms as they
+        are reached override this.
+        Args
+            location (Location): the location being entered.
+        Returns
+            None
+        """
+        pass
+
+
+def generate_enemies(world: World, difficulty: int) -> None:
     """
     Randomly generate enemies to put into each room of the dungeon.
     Args
+        world (World): the game to generate enemies for.
         difficulty (int): number of enemies is based on difficulty.
     Returns
         None
     """
-    # Go through all Locations.
-    for room in Location.__subclasses__():
-        # If there are no possible enemies, we don't need to add any enemies to the room.
-        if len(room.possible_enemies) == 0:
-            continue
-        
-        # Until the sum of the difficulty of the enemies in a room is greater than 
-        # `difficulty`, add a random enemy into the room
-        room_diff = 0 # Sum of difficulties in the room.
-        while room_diff < difficulty and len(room.enemies) < 4:
-            e = choice(room.possible_enemies)
-            room_diff += e().difficulty
-            room.enemies.append(e)
-
-
-def generate_graph() -> None:
+    # Go through all Locations, starting each one from the enemies it always has, so a world can be set up again.
+    for room in world.locations.values():
+        room.enemies = list(room.type.enemies)
+        generate_room_enemies(room, difficulty)
+
+
+def generate_room_enemies(room: Location, difficulty: int) -> None:
     """
-    Connects all the rooms in the dungeon randomly. 
+    Randomly generate enemies to put into one room.
     Args
+        room (Location): the room.
+        difficulty (int): number of enemies is based on difficulty.
+    Returns
         None
+    """
+    # If there are no possible enemies, we don't need to add any enemies to the room.
+    if len(room.possible_enemies) == 0:
+        return
+
+    # Until the sum of the difficulty of the enemies in a room is greater than 
+    # `difficulty`, add a random enemy into the room
+    room_diff = 0 # Sum of difficulties in the room.
+    while room_diff < difficulty and len(room.enemies) < 4:
+        e = choice(room.possible_enemies)
+        room_diff += e.difficulty
+        room.enemies.append(e)
+
+
+def decode_prufer(prufer: list, n: int) -> array:
+    """
+    Decodes a Prufer sequence into the tree that it represents in linear time. Each step joins the
+    smallest leaf to the next number in the sequence. Instead of searching for the smallest leaf every
+    time, a pointer only moves forward through the vertices, and a vertex that becomes a leaf below the
+    pointer is used right away because it must be the smallest.
+    Source: https://cp-algorithms.com/graph/pruefer_code.html
+    Args
+        prufer (list[int]): the Prufer sequence. It has n - 2 numbers from 0 to n - 1.
+        n (int): the number of vertices in the tree.
+    Returns
+        array[int]: the parent of each vertex when the tree is rooted at vertex n - 1. The root's parent is -1.
+    """
+    parent = array("l", [-1]) * n
+    if n < 2:
+        return parent
+
+    # The degree of each vertex, which is one more than the number of times it appears in the sequence.
+    degree = [1] * n
+    for v in prufer:
+        degree[v] += 1
+
+    ptr = degree.index(1) # Smallest leaf that hasn't been passed yet.
+    leaf = ptr
+    for v in prufer:
+        parent[leaf] = v
+        degree[v] -= 1
+        if degree[v] == 1 and v < ptr: # `v` just became the smallest leaf.
+            leaf = v
+        else:
+            ptr += 1
+            while degree[ptr] != 1:
+                ptr += 1
+            leaf = ptr
+
+    # The last two vertices are `leaf` and n - 1.
+    parent[leaf] = n - 1
+    return parent
+
+
+def generate_graph(world: World) -> None:
+    """
+    Connects all the rooms in the dungeon randomly. 
+    Args
+        world (World): the game to connect the rooms of.
     Returns
         None
     """
+    entrance, stairway, hall = world["Entrance"], world["Stairway"], world["Hall"]
+
+    # Removes any old connections, so connecting a world again makes a new dungeon instead of adding to the old
+    # one. The planner and minimap were made for the old dungeon.
+    for room in world.locations.values():
+        room.rooms.clear()
+    world.planner = None
+    world.minimap = None
+
     # Connect `Entrance`, `Stairway`, and `Hall`.
-    Entrance.rooms.append(Stairway) 
+    entrance.rooms.append(stairway)
     # We don't want to connect `Entrance` and `Stairway` because the player can't re-enter
     # the entrance until they find the key and the treasure.
-    Stairway.rooms.append(Hall)
-    Hall.rooms.append(Stairway)
+    stairway.rooms.append(hall)
+    hall.rooms.append(stairway)
 
-    # Gets a list of all rooms that connect randomly. These are all the rooms that inherit from `Location`.
-    other_rooms = list(filter(lambda l : l not in [Entrance, Stairway], Location.__subclasses__()))
+    # Gets a list of all rooms that connect randomly. These are all the other rooms in the content.
+    other_rooms = [l for l in world.locations.values() if l not in [entrance, stairway]]
 
-    # Uses a randomly generated Prufer sequence generate a tree of all the rooms.
-    # Source: https://www.geeksforgeeks.org/random-tree-generator-using-prufer-sequence-with-examples/
+    # Uses a randomly generated Prufer sequence to generate a tree of all the rooms.
     # In the following code, each room is represented by an integer, corresponding to the index of the room's
     # occurence in `other_rooms`
-
-    # number of rooms.
     n = len(other_rooms)
+    parent = decode_prufer([randint(0, n - 1) for i in range(n - 2)], n)
+
+    # Connect the rooms in the graph. Every room except the last one has a parent.
+    for i in range(n - 1):
+        other_rooms[i].rooms.append(other_rooms[parent[i]])
+        other_rooms[parent[i]].rooms.append(other_rooms[i])
 
-    # Generate Prufer sequence.
-    prufer = [randint(0, n - 1) for i in range(n - 2)]
-
-    # Number of occurences of each room.
-    vertex_set = [prufer.count(i) for i in range(n)]
-
-    # List of all the edges in the graph.
-    edges = []
-    
-    # Add the first n - 2 edges.
-    for i in range(n - 2): # Iterate through each room
-        for j in range(n): # Find a that doesn't appear in `prufer`
-            if vertex_set[j] == 0:
-                vertex_set[j] = -1
-                edges.append((j, prufer[i])) # Add the edge
-                vertex_set[prufer[i]] -= 1
-                break
-
-    # Add the final edge.
-    j = 0
-    for i in range(n):
-        # Find the two rooms that are remaining and connect them.
-        if vertex_set[i] == 0 and j == 0:
-            nl = i
-            j += 1
-        elif vertex_set[i] == 0 and j == 1:
-            nr = i
-    edges.append((nl, nr))
-
-    # Connect the rooms in the graph.
-    for edge in edges:
-        other_rooms[edge[0]].rooms.append(other_rooms[edge[1]])
-        other_rooms[edge[1]].rooms.append(other_rooms[edge[0]])
@@ -5,9 +5,66 @@ This program is an adventure game called Dungeon Escape.
 This file is the main entry point into the rest of the code.
 """
 
-from os import name, system
+import random
+from argparse import ArgumentParser
+from functools import partial
+from challenges import ChallengeSource
+from history import Scrollback
+from inputlog import InputLog, RecordingKeyboard
+from interface import CHOICE_PROMPT, CONTINUE_PROMPT, Interface
+from keyboard import Keyboard, open_keyboard
+from leaderboard import Leaderboard
+from metrics import METRICS, enable
+from os import path, remove
 from player import Player
-from locations import Entrance, generate_enemies, generate_graph
+from locations import World, generate_enemies, generate_graph
+from procedural import ProceduralWorld
+from save import read_save, write_save
+from telemetry import Telemetry
+
+# Text shown by `logo()`.
+LOGO = """
+·▄▄▄▄  ▄• ▄▌ ▐ ▄  ▄▄ • ▄▄▄ .       ▐ ▄   ▄▄▄ ..▄▄ ·  ▄▄·  ▄▄▄·  ▄▄▄·▄▄▄ .
+██· ██ █▪██▌•█▌▐█▐█ ▀ ▪▀▄.▀· ▄█▀▄ •█▌▐█  ▀▄.▀·▐█ ▀. ▐█ ▌▪▐█ ▀█ ▐█ ▄█▀▄.▀·
+▐█▪ ▐█▌█▌▐█▌▐█▐▐▌▄█ ▀█▄▐▀▀▪▄▐█▌.▐▌▐█▐▐▌  ▐▀▀▪▄▄▀▀▀█▄██ ▄▄▄█▀▀█  ██▀·▐▀▀▪▄
+██. ██ ▐█▄█▌██▐█▌▐█▄▪▐█▐█▄▄▌▐█▌.▐▌██▐█▌  ▐█▄▄▌▐█▄▪▐█▐███▌▐█▪ ▐▌▐█▪·•▐█▄▄▌
+▀▀▀▀▀•  ▀▀▀ ▀▀ █▪·▀▀▀▀  ▀▀▀  ▀█▄▀▪▀▀ █▪   ▀▀▀  ▀▀▀▀ ·▀▀▀  ▀  ▀ .▀    ▀▀▀ 
+"""
+
+# Text shown by `menu()`.
+MENU = """Select an option:
+    1. Play
+    2. Tutorial
+    3. Quit
+"""
+
+# Text shown by `difficulty()`.
+DIFFICULTY_MENU = """Select a game mode:
+    1. Easy
+    2. Medium
+    3. Hard
+"""
+
+# Text shown by `tutorial()`.
+TUTORIAL = """
+Welcome to Dungeon Escape! This game is a short adventure game where you are
+a knight that must search through a dungeon for the hidden treasure. 
+
+Goal: You must find the treasure and make it out of the dungeon.
+
+Player: You have 2 stats: your HP and ATK. Your HP is the amount of health 
+that you have. If this value drops to zero, you lose! Your ATK is the amount of
+damage that your sword does with each hit. You also have a items that you can pick
+up and store in your inventory
+
+Combat: You may run into monsters in the dungeon that you have to fight. To fight
+an enemy, you would be asked to type out multiple short, random sequences of letters.
+The amount of damage that you deal is equal to the number of hits that you strike
+(the number of times you type a sequence in a short span of time) multiplied by your ATK.
+
+Hints: If you are lost, type ? when choosing a room to find out where to go next.
+
+"""
 
 
 def logo() -> None:
@@ -18,66 +75,47 @@ def logo() -> None:
 	Returns
 		None
 	"""
-    print("""
-·▄▄▄▄  ▄• ▄▌ ▐ ▄  ▄▄ • ▄▄▄ .       ▐ ▄   ▄▄▄ ..▄▄ ·  ▄▄·  ▄▄▄·  ▄▄▄·▄▄▄ .
-██· ██ █▪██▌•█▌▐█▐█ ▀ ▪▀▄.▀· ▄█▀▄ •█▌▐█  ▀▄.▀·▐█ ▀. ▐█ ▌▪▐█ ▀█ ▐█ ▄█▀▄.▀·
-▐█▪ ▐█▌█▌▐█▌▐█▐▐▌▄█ ▀█▄▐▀▀▪▄▐█▌.▐▌▐█▐▐▌  ▐▀▀▪▄▄▀▀▀█▄██ ▄▄▄█▀▀█  ██▀·▐▀▀▪▄
-██. ██ ▐█▄█▌██▐█▌▐█▄▪▐█▐█▄▄▌▐█▌.▐▌██▐█▌  ▐█▄▄▌▐█▄▪▐█▐███▌▐█▪ ▐▌▐█▪·•▐█▄▄▌
-▀▀▀▀▀•  ▀▀▀ ▀▀ █▪·▀▀▀▀  ▀▀▀  ▀█▄▀▪▀▀ █▪   ▀▀▀  ▀▀▀▀ ·▀▀▀  ▀  ▀ .▀    ▀▀▀ 
-""")
+    print(LOGO)
 
 
-def menu() -> int:
+def menu(keyboard: Keyboard) -> int:
     """
 	This function prints the main menu, asks the user to choose an option, and returns the user's choice.
 	Args
-		None
+		keyboard (Keyboard): where the input is read from.
 	Returns
         int: 1 if play, 2 if tutorial, 3 if quit.
 	"""
     # Prints the menu.
-    print("""Select an option:
-    1. Play
-    2. Tutorial
-    3. Quit
-""")
+    print(MENU)
 
     # Keeps taking in input until it is valid.
-    inp = input("Your choice: ")
+    inp = keyboard.read_line(CHOICE_PROMPT)[0]
     while not inp.isdigit() or int(inp) < 1 or int(inp) > 3:
         print("Invalid Input")
-        inp = input("Your choice: ")
+        inp = keyboard.read_line(CHOICE_PROMPT)[0]
     print()
 
     # Returns the result.
     return int(inp)
 
 
-def difficulty() -> int:
+def difficulty(io: Interface) -> int:
     """
 	This function prints a menu for difficulty, asks the user to choose an option, and returns the user's choice.
 	Args
-		None
+		io (Interface): the interface of the game that is about to start.
 	Returns
 		int: 1 if easy, 2 if medium, 3 if hard.
 	"""
 
     # Prints the menu.
-    print("""Select a game mode:
-    1. Easy
-    2. Medium
-    3. Hard
-""")
+    print(DIFFICULTY_MENU)
 
-    # Keeps taking in input until it is valid.
-    inp = input("Your choice: ")
-    while not inp.isdigit() or int(inp) < 1 or int(inp) > 3:
-        print("Invalid Input")
-        inp = input("Your choice: ")
+    # Gets the choice and returns it.
+    mode = io.select_difficulty()
     print()
-
-    # Returns the result.
-    return int(inp)
+    return mode
 
 
 def tutorial() -> None:
@@ -90,64 +128,158 @@ def tutorial() -> None:
 	"""
 
     # Prints the tutorial.
-    print("""
-Welcome to Dungeon Escape! This game is a short adventure game where you are
-a knight that must search through a dungeon for the hidden treasure. 
+    print(TUTORIAL)
+    pass
 
-Goal: You must find the treasure and make it out of the dungeon.
 
-Player: You have 2 stats: your HP and ATK. Your HP is the amount of health 
-that you have. If this value drops to zero, you lose! Your ATK is the amount of
-damage that your sword does with each hit. You also have a items that you can pick
-up and store in your inventory
+def play(player: Player, rooms=0, save=None, leaderboard=None, telemetry=None, on_game_over=None) -> None:
+    """
+	This function sets up a new dungeon for the player and runs the game loop until the game ends.
+	Args
+		player (Player): the player.
+		rooms (int): the number of rooms in a procedurally generated dungeon, or 0 for the normal dungeon.
+		save (str): the path to a save file for the normal dungeon, or None to not save. The game is resumed
+			from the file if it exists, saved before every room, and the file is deleted when the game ends.
+		leaderboard (Leaderboard): where the game is recorded when it ends, or None to not record it.
+		telemetry (Telemetry): where the game's events are written, or None to not write them.
+		on_game_over (callable): function called with the player once the game has been won or lost, or None.
+	Returns
+		None
+	"""
+    # Sets up game
+    if rooms:
+        world = ProceduralWorld(player, rooms)
+        curr = world["Entrance"]
+    elif save is not None and path.exists(save):
+        world, curr = read_save(save, player)
+    else:
+        world = World(player)
+        generate_enemies(world, player.difficulty)
+        generate_graph(world)
+        curr = world["Entrance"]
+    if telemetry is not None:
+        telemetry.watch(player)
 
-Combat: You may run into monsters in the dungeon that you have to fight. To fight
-an enemy, you would be asked to type out multiple short, random sequences of letters.
-The amount of damage that you deal is equal to the number of hits that you strike
-(the number of times you type a sequence in a short span of time) multiplied by your ATK.
+    # Main game loop
+    # The clock is read the same way whether or not the time is used, so recorded games replay the same way.
+    start = player.io.clock() - player.seconds
+    while (player):
+        player.seconds = player.io.clock() - start
+        if save is not None and not rooms:
+            write_save(save, world, curr)
+        curr = curr.run()
+    player.seconds = player.io.clock() - start
+    if save is not None and path.exists(save):
+        remove(save)
 
-""")
-    pass
+    # The game has been won or lost.
+    if leaderboard is not None:
+        leaderboard.record(player, player.seconds)
+    if on_game_over is not None:
+        on_game_over(player)
 
 
-def main() -> None:
+def run(keyboard: Keyboard, rooms=0, seed=None, interface=Interface, save=None, leaderboard=None,
+        telemetry=None, on_game_over=None) -> None:
     """
-	This function is the main entry point to the code and contains the main game loop.
+	This function runs the menus and games until the user chooses to quit.
 	Args
-		None
+		keyboard (Keyboard): where the input is read from.
+		rooms (int): the number of rooms in a procedurally generated dungeon, or 0 for the normal dungeon.
+		seed (int): the seed for the random number generators, or None for a random seed.
+		interface (type): the `Interface` class that each game is shown with.
+		save (str): the path to a save file, which is passed to `play()`.
+		leaderboard (Leaderboard): where finished games are recorded, or None to not record them.
+		telemetry (Telemetry): where the games' events are written, or None to not write them.
+		on_game_over (callable): function called with the player at the end of every game, or None.
 	Returns
 		None
 	"""
+    # Every random choice in a session comes from this seed, including the sequences typed in battles.
+    random.seed(seed)
     logo()
 
     # Keeps running until the user chooses to quit.
-    menu_choice = menu()
+    menu_choice = menu(keyboard)
     while menu_choice != 3:
         if menu_choice == 1: # Play
             # Gets difficulty
-            mode = difficulty()
+            io = interface(keyboard)
+            if save is not None and path.exists(save): # The saved game has the difficulty.
+                print("Carrying on from the saved game.\n")
+                mode = 1
+            else:
+                mode = difficulty(io)
 
             # Sets up game
-            player = Player(mode)
-            generate_enemies(player.difficulty)
-            generate_graph()
-            curr = Entrance
-
-            # Main game loop
-            while (player):
-                curr = curr(player).run()
+            play(Player(mode, io, ChallengeSource(random.getrandbits(32))), rooms, save, leaderboard, telemetry,
+                 on_game_over)
         elif menu_choice == 2: # Tutorial
             tutorial()
-        input("Type anything to continue... ")
+        keyboard.read_line(CONTINUE_PROMPT)
 
         # Clears the screen
-        if name == "posix":
-            system("clear")
-        else:
-            system("cls")
+        print("\033[2J\033[H", end="")
 
         logo()
-        menu_choice = menu()
+        menu_choice = menu(keyboard)
+
+
+def main() -> None:
+    """
+	This function is the main entry point to the code and contains the main game loop.
+	Args
+		None
+	Returns
+		None
+	"""
+    parser = ArgumentParser(description="Dungeon Escape, a terminal-based adventure game.")
+    parser.add_argument("--rooms", type=int, default=0,
+                        help="play in a procedurally generated dungeon with this many rooms")
+    parser.add_argument("--record", metavar="FILE",
+                        help="write everything typed to an input log, which replay.py can play back")
+    parser.add_argument("--scrollback", metavar="FILE",
+                        help="keep old events in FILE so they can be paged through with < and >")
+    parser.add_argument("--stream", action="store_true",
+                        help="accept each sequence in a battle as soon as it is typed, without pressing Enter")
+    parser.add_argument("--save", metavar="FILE",
+                        help="save the game before every room and carry on from FILE if it exists")
+    parser.add_argument("--leaderboard", metavar="FILE", help="record every finished game in this database")
+    parser.add_argument("--telemetry", metavar="FILE", help="write every event of every game to this JSON Lines file")
+    parser.add_argument("--telemetry-mb", type=float, default=64,
+                        help="size in MB that the telemetry file is rotated at")
+    parser.add_argument("--telemetry-gzip", action="store_true", help="compress old telemetry files")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="measure where time is spent and save it on exit (Prometheus format if FILE ends in .prom)")
+    args = parser.parse_args()
+    if args.save and args.rooms:
+        parser.error("only the normal dungeon can be saved")
+    if args.save and args.record: # The log doesn't hold the saved game, so it couldn't be replayed.
+        parser.error("--record can't be used with --save")
+
+    keyboard = open_keyboard()
+    seed = None
+    if args.record:
+        seed = random.SystemRandom().getrandbits(64)
+        keyboard = RecordingKeyboard(keyboard, InputLog(args.record), seed, args.rooms)
+    leaderboard = Leaderboard(args.leaderboard) if args.leaderboard else None
+    telemetry = Telemetry(args.telemetry, int(args.telemetry_mb * 2 ** 20), args.telemetry_gzip) \
+        if args.telemetry else None
+    scrollback = Scrollback(args.scrollback) if args.scrollback else None
+    if args.metrics:
+        enable()
+    try:
+        interface = partial(Interface, scrollback=scrollback, streaming=args.stream)
+        run(keyboard, args.rooms, seed, interface, args.save, leaderboard, telemetry)
+    finally:
+        if scrollback is not None:
+            scrollback.close()
+        if leaderboard is not None:
+            leaderboard.close()
+        if telemetry is not None:
+            telemetry.close()
+        if args.metrics:
+            METRICS.save(args.metrics)
 
 
 if __name__ == "__main__":
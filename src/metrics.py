@@ -0,0 +1,379 @@
+"""
+ICS3U
+Paul Chen
+This file holds the metrics, which measure where the game spends its time: drawing frames, echoing input,
+making challenges, waiting for the player, running each part of a room, and setting up each dungeon. Nothing is
+measured until `enable()` is called, which wraps the methods being measured, so the game runs exactly as before
+when metrics are off. Snapshots can be saved as JSON or in the Prometheus text format.
+"""
+
+import locations
+import sys
+from bisect import bisect_left
+from functools import wraps
+from json import dump
+from os import replace
+from threading import Lock, local
+from time import perf_counter
+from challenges import ChallengeSource
+from interface import Interface
+from locations import Location
+from player import Player
+
+# The upper bounds of the histogram buckets for times in seconds and for sizes in bytes.
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+BYTE_BUCKETS = tuple(2 ** i for i in range(4, 17))
+
+# The parts of `Location.run()` that are timed.
+PHASES = ("on_enter", "battle", "on_battle_finish", "choose_room")
+
+# The functions in `locations` that set up a new dungeon, keyed by the step they are timed as.
+STEPS = {"graph": "generate_graph", "enemies": "generate_enemies"}
+
+# The start of every metric name in the Prometheus format.
+PREFIX = "dungeon_"
+
+
+class Histogram:
+    """Class that counts how many values fall into each bucket.
+
+    Attributes:
+        buckets (tuple[float]): the upper bound of each bucket. Larger values go in one last bucket.
+        counts (list[int]): the number of values in each bucket.
+        sum (float): the total of every value.
+        count (int): the number of values.
+    """
+    def __init__(self, buckets):
+        """
+        Inits histogram class.
+        Args
+            buckets (tuple[float]): the upper bound of each bucket.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        """
+        Adds a value.
+        Args
+            value (float): the value.
+        Returns
+            None
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """
+        Returns the number of values up to each bucket's bound, the way Prometheus counts them.
+        Args
+            None
+        Returns
+            list[tuple[str, int]]: the bound of each bucket and the number of values up to it.
+        """
+        out = []
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            out.append((str(bound), total))
+        return out
+
+
+class Metrics:
+    """Class that holds every counter and histogram. A metric is made the first time a value is recorded
+    for its name and labels.
+
+    Attributes:
+        counters (dict[tuple, float]): the counters, keyed by their name and labels.
+        histograms (dict[tuple, Histogram]): the histograms, keyed by their name and labels.
+        lock (Lock): held while a metric changes, since games on the server run in many threads.
+    """
+    def __init__(self):
+        """
+        Inits metrics class.
+        """
+        self.counters = {}
+        self.histograms = {}
+        self.lock = Lock()
+
+    def add(self, name, value, **labels) -> None:
+        """
+        Adds to a counter.
+        Args
+            name (str): the name of the counter.
+            value (float): the amount to add.
+            labels (str): the labels of the counter.
+        Returns
+            None
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels) -> None:
+        """
+        Adds a value to a histogram.
+        Args
+            name (str): the name of the histogram.
+            value (float): the value.
+            buckets (tuple[float]): the buckets, used if the histogram is new.
+            labels (str): the labels of the histogram.
+        Returns
+            None
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def histogram(self, name, **labels) -> Histogram:
+        """
+        Returns a histogram.
+        Args
+            name (str): the name of the histogram.
+            labels (str): the labels of the histogram.
+        Returns
+            Histogram: the histogram, or None if nothing has been recorded in it.
+        """
+        with self.lock:
+            return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current value of every metric.
+        Args
+            None
+        Returns
+            dict: the counters and histograms, ready to be saved as JSON.
+        """
+        with self.lock:
+            return {
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "buckets": h.cumulative(),
+                                "sum": h.sum, "count": h.count}
+                               for (name, labels), h in sorted(self.histograms.items())],
+            }
+
+    def prometheus(self) -> str:
+        """
+        Returns the current value of every metric in the Prometheus text format.
+        Args
+            None
+        Returns
+            str: the metrics.
+        """
+        def format_labels(labels):
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}" if labels else ""
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for counter in snapshot["counters"]:
+            name = PREFIX + counter["name"]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{format_labels(counter['labels'].items())} {counter['value']}")
+        for histogram in snapshot["histograms"]:
+            name = PREFIX + histogram["name"]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            labels = list(histogram["labels"].items())
+            for bound, count in histogram["buckets"]:
+                lines.append(f"{name}_bucket{format_labels(labels + [('le', bound)])} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, filename) -> None:
+        """
+        Saves a snapshot. Files ending in `.prom` use the Prometheus text format, and other files use JSON.
+        The file is replaced in one step, so a scraper never reads half of it.
+        Args
+            filename (str): the path to the file.
+        Returns
+            None
+        """
+        with open(filename + ".tmp", "w", encoding="utf-8") as file:
+            if filename.endswith(".prom"):
+                file.write(self.prometheus())
+            else:
+                dump(self.snapshot(), file, indent=2)
+        replace(filename + ".tmp", filename)
+
+
+# The metrics that `enable()` records to.
+METRICS = Metrics()
+
+# The methods and functions replaced by `enable()`, keyed by their class or module and name, so `disable()` can
+# put them back.
+_originals = {}
+
+# Values kept between the measured methods of each thread, like the bytes written in the current frame.
+_local = local()
+
+
+def _instrument(base, name, wrapper) -> None:
+    """
+    Wraps a method in a class and in every subclass that overrides it.
+    Args
+        base (type): the class.
+        name (str): the name of the method.
+        wrapper (callable): function that takes the original method and returns the new one.
+    Returns
+        None
+    """
+    classes = [base]
+    for cls in classes:
+        classes.extend(cls.__subclasses__())
+        if name in cls.__dict__ and (cls, name) not in _originals:
+            _originals[(cls, name)] = cls.__dict__[name]
+            setattr(cls, name, wrapper(cls.__dict__[name]))
+
+
+def _instrument_function(module, name, wrapper) -> None:
+    """
+    Wraps a function in a module and in every loaded module that imported it by name, like
+    `from locations import generate_graph`.
+    Args
+        module (module): the module the function is defined in.
+        name (str): the name of the function.
+        wrapper (callable): function that takes the original function and returns the new one.
+    Returns
+        None
+    """
+    func = getattr(module, name)
+    new = wrapper(func)
+    for other in list(sys.modules.values()):
+        if getattr(other, name, None) is func and (other, name) not in _originals:
+            _originals[(other, name)] = func
+            setattr(other, name, new)
+
+
+def _timed(key, begin=None, end=None):
+    """
+    Makes a wrapper that times a method. When an overriding method calls the one it overrides, like
+    `super().on_enter()`, only the outer call is timed.
+    Args
+        key (str): the name that nested calls are tracked under.
+        begin (callable): function called with the object before the outer call.
+        end (callable): function called with the object and the seconds taken after the outer call.
+    Returns
+        callable: the wrapper.
+    """
+    def wrapper(func):
+        @wraps(func)
+        def timed(self, *args, **kwargs):
+            if getattr(_local, key, False):
+                return func(self, *args, **kwargs)
+            setattr(_local, key, True)
+            if begin is not None:
+                begin(self)
+            start = perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                setattr(_local, key, False)
+                end(self, seconds)
+        return timed
+    return wrapper
+
+
+def enable(metrics=METRICS) -> None:
+    """
+    Starts measuring. Classes must be imported before this is called for their methods to be measured, and so
+    must modules that import the functions in `STEPS` by name.
+    Args
+        metrics (Metrics): where the measurements are recorded.
+    Returns
+        None
+    """
+    def start_frame(io):
+        _local.frame_bytes = 0
+
+    def frame(kind):
+        def end(io, seconds):
+            metrics.observe("frame_seconds", seconds, kind=kind)
+            metrics.observe("frame_bytes", _local.frame_bytes, BYTE_BUCKETS, kind=kind)
+        return _timed("frame", start_frame, end)
+
+    def count_bytes(func):
+        @wraps(func)
+        def write(self, text):
+            size = len(text.encode("utf-8"))
+            _local.frame_bytes = getattr(_local, "frame_bytes", 0) + size
+            metrics.add("bytes_written_total", size)
+            return func(self, text)
+        return write
+
+    def end_line(io, seconds):
+        # When the echo of what was typed starts. Every read sets it, so an echo is never timed from an old read.
+        _local.read_end = perf_counter()
+
+    def end_read(io, seconds):
+        # Time spent waiting for the player in an attack.
+        _local.wait = getattr(_local, "wait", 0.0) + seconds
+        end_line(io, seconds)
+
+    def end_echo(io, seconds):
+        read_end = getattr(_local, "read_end", None)
+        _local.read_end = None
+        if read_end is not None: # None if the line was read some other way, like by a class made after enable().
+            metrics.observe("echo_seconds", perf_counter() - read_end)
+
+    def end_challenge(source, seconds):
+        _local.challenge = getattr(_local, "challenge", 0.0) + seconds
+
+    def start_attack(player):
+        _local.challenge = _local.wait = 0.0
+
+    def end_attack(player, seconds):
+        metrics.observe("attack_seconds", seconds)
+        metrics.observe("attack_challenge_seconds", _local.challenge)
+        metrics.observe("attack_wait_seconds", _local.wait)
+
+    def phase(name):
+        def end(location, seconds):
+            metrics.observe("room_phase_seconds", seconds, phase=name, room=location.type.key)
+        return _timed(name, end=end)
+
+    def step(name):
+        def end(world, seconds):
+            metrics.observe("generate_seconds", seconds, step=name)
+        return _timed(STEPS[name], end=end)
+
+    _instrument(Interface, "display", frame("display"))
+    _instrument(Interface, "update", frame("update"))
+    _instrument(Interface, "write", count_bytes)
+    _instrument(Interface, "read", _timed("read", end=end_line))
+    _instrument(Interface, "read_timed", _timed("read_timed", end=end_read))
+    _instrument(Interface, "read_until", _timed("read_until", end=end_read))
+    _instrument(Interface, "timed_input", _timed("timed_input", end=end_echo))
+    _instrument(ChallengeSource, "next", _timed("next", end=end_challenge))
+    _instrument(Player, "attack", _timed("attack", start_attack, end_attack))
+    for name in PHASES:
+        _instrument(Location, name, phase(name))
+    for name in STEPS:
+        _instrument_function(locations, STEPS[name], step(name))
+
+
+def disable() -> None:
+    """
+    Stops measuring and puts back every method and function that `enable()` replaced.
+    Args
+        None
+    Returns
+        None
+    """
+    for (cls, name), func in _originals.items():
+        setattr(cls, name, func)
+    _originals.clear()
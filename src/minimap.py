@@ -0,0 +1,142 @@
+"""
+ICS3U
+Paul Chen
+This file holds the minimap, which draws the rooms the player has explored as a tree next to the room info.
+The map is built up as the player explores: entering a room for the first time adds the rooms next to it below
+it, since the dungeon is a tree and every new room is reached through its parent. Only the rooms around the
+player are drawn, and the drawing is kept until the player moves or explores, so redraws cost nothing.
+"""
+
+
+class Minimap:
+    """Class that holds the explored part of the dungeon and draws it.
+
+    Attributes:
+        parent (dict[Location, Location]): the room that each known room was found from. The entrance has None.
+        depth (dict[Location, int]): the number of rooms between each known room and the entrance.
+        children (dict[Location, list[Location]]): the rooms found from each explored room.
+        version (int): the number of rooms explored, used to tell when the drawing is out of date.
+        up (int): the number of rooms above the player's room that are drawn.
+        rows (int): the most lines drawn, not counting the title.
+        width (int): the most characters in each line.
+        cache (tuple): the room, version and lines of the last drawing.
+    """
+    def __init__(self, root, up=2, rows=9, width=32):
+        """
+        Inits minimap class.
+        Args
+            root (Location): the room the dungeon starts from.
+            up (int): the number of rooms above the player's room that are drawn.
+            rows (int): the most lines drawn, not counting the title.
+            width (int): the most characters in each line.
+        """
+        self.parent = {root: None}
+        self.depth = {root: 0}
+        self.children = {}
+        self.version = 0
+        self.up = up
+        self.rows = rows
+        self.width = width
+        self.cache = (None, -1, [])
+
+    def explore(self, location) -> None:
+        """
+        Adds the rooms next to a room to the map the first time the room is explored.
+        Args
+            location (Location): the room.
+        Returns
+            None
+        """
+        if location in self.children:
+            return
+        if location not in self.parent: # A room that wasn't found from the entrance, like in a resumed game.
+            self.parent[location] = None
+            self.depth[location] = 0
+        found = [room for room in location.rooms if room not in self.parent]
+        for room in found:
+            self.parent[room] = location
+            self.depth[room] = self.depth[location] + 1
+        self.children[location] = found
+        self.version += 1
+
+    def draw(self, location) -> list:
+        """
+        Draws the rooms around a room, exploring it first.
+        Args
+            location (Location): the room the player is in.
+        Returns
+            list[str]: the lines of the map.
+        """
+        self.explore(location)
+        if self.cache[0] is location and self.cache[1] == self.version:
+            return self.cache[2]
+
+        # Starts a few rooms above the player and goes down to the rooms next to the player.
+        top = location
+        for i in range(self.up):
+            if self.parent[top] is not None:
+                top = self.parent[top]
+        bottom = self.depth[location] + 1
+
+        lines = []
+        here = 0 # The line that the player's room is on.
+        stack = [(top, "", "")]
+        while stack and len(lines) < 4 * self.rows:
+            room, lead, indent = stack.pop()
+            if room is location:
+                here = len(lines)
+                name = f"@ {room.name}"
+            else:
+                name = room.name if room in self.children else "?"
+            lines.append((lead + name)[:self.width])
+            kids = self.children.get(room, [])
+            if self.depth[room] < bottom:
+                for i in reversed(range(len(kids))):
+                    last = i == len(kids) - 1
+                    lead = indent + ("└─ " if last else "├─ ")
+                    stack.append((kids[i], lead, indent + ("   " if last else "│  ")))
+
+        # Keeps the lines around the player's room.
+        start = max(0, min(here - self.rows // 2, len(lines) - self.rows))
+        lines = ["Map:"] + lines[start:start + self.rows]
+        self.cache = (location, self.version, lines)
+        return lines
+
+
+def get_minimap(world) -> Minimap:
+    """
+    Returns the minimap for a world, making it the first time.
+    Args
+        world (World): the game.
+    Returns
+        Minimap: the minimap.
+    """
+    if world.minimap is None:
+        world.minimap = Minimap(world["Entrance"])
+    return world.minimap
+
+
+def beside(text: str, lines: list, width: int, height: int) -> str:
+    """
+    Puts lines to the right of some text if they fit on the screen, or else below it. If they don't fit
+    either way, they are left out.
+    Args
+        text (str): the text.
+        lines (list[str]): the lines to add.
+        width (int): the width of the screen.
+        height (int): the most rows that the text and lines can take up.
+    Returns
+        str: the text with the lines added, or just the text.
+    """
+    left = text.split("\n")
+    left_width = max(len(line) for line in left)
+    if left_width + 4 + max(len(line) for line in lines) > width:
+        # Long lines of text take up more than one row.
+        rows = sum(max(1, -(-len(line) // width)) for line in left) + 1 + len(lines)
+        return text + "\n" + "\n".join(lines) + "\n" if rows <= height else text
+    rows = max(len(left), len(lines))
+    if rows > height:
+        return text
+    left += [""] * (rows - len(left))
+    lines = lines + [""] * (rows - len(lines))
+    return "\n".join((a.ljust(left_width) + "    " + b).rstrip() for a, b in zip(left, lines))
@@ -0,0 +1,172 @@
+"""
+ICS3U
+Paul Chen
+This file holds the route planner, which gives the player hints about where to go. The dungeon is a tree, so
+the planner walks it once to make an Euler tour, and afterwards finds the distance between any two rooms from
+their lowest common ancestor (LCA) without searching the dungeon again. This keeps hints fast in procedurally
+generated dungeons with millions of rooms.
+Source: https://cp-algorithms.com/graph/lca.html
+"""
+
+from array import array
+from itertools import permutations
+
+# The room that gives each item needed to escape, keyed by the item.
+GOALS = {"Key": "Prison", "Treasure": "TreasureRoom"}
+
+
+class Planner:
+    """Class that answers distance questions about a tree of rooms. The rooms are numbered from 0 to `size - 1`.
+
+    The Euler tour lists the rooms in the order a walk around the tree passes them, and the LCA of two rooms is
+    the shallowest room between their first visits in the tour. Each step of the tour is stored as a single key,
+    `depth * size + room`, so the smallest key in a stretch of the tour gives both the depth and the room.
+    The tour is split into blocks, and a sparse table holds the smallest key of every run of 2^k blocks, so a
+    query looks at two partial blocks and two entries of the table.
+
+    Attributes:
+        size (int): the number of rooms.
+        block (int): the number of steps of the tour in each block.
+        depth (array[int]): the distance of each room from the root.
+        parent (array[int]): the parent of each room, or -1 for the root.
+        first (array[int]): the index of each room's first visit in the tour.
+        last (array[int]): the index of each room's last visit in the tour. A room's subtree lies between the two.
+        keys (array[int]): the key of each step of the tour.
+        table (list[array[int]]): the sparse table. `table[k][j]` is the smallest key in blocks `j` to `j + 2^k - 1`.
+    """
+    def __init__(self, size: int, neighbours, root=0, block=64):
+        """
+        Inits planner class, walking the tree and building the indexes.
+        Args
+            size (int): the number of rooms.
+            neighbours (callable): function that takes a room and returns the rooms next to it.
+            root (int): the room that the tree hangs from.
+            block (int): the number of steps of the tour in each block.
+        """
+        self.size = size
+        self.block = block
+        self.depth = array("l", [0]) * size
+        self.parent = array("l", [-1]) * size
+        self.first = array("l", [0]) * size
+        self.last = array("l", [0]) * size
+        self.keys = array("q")
+
+        # Walks the tree depth first without recursion, adding a step to the tour every time a room is reached.
+        seen = bytearray(size)
+        seen[root] = 1
+        stack = [root]
+        children = [iter(neighbours(root))]
+        self.keys.append(root)
+        while stack:
+            room = stack[-1]
+            for nxt in children[-1]:
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    self.parent[nxt] = room
+                    self.depth[nxt] = self.depth[room] + 1
+                    self.first[nxt] = len(self.keys)
+                    self.keys.append(self.depth[nxt] * size + nxt)
+                    stack.append(nxt)
+                    children.append(iter(neighbours(nxt)))
+                    break
+            else:
+                stack.pop()
+                children.pop()
+                self.last[room] = len(self.keys) - 1
+                if stack: # Back up to the parent.
+                    self.keys.append(self.depth[stack[-1]] * size + stack[-1])
+
+        # The smallest key of each block, then of every run of 2, 4, 8... blocks.
+        keys = self.keys
+        self.table = [array("q", (min(keys[i:i + block]) for i in range(0, len(keys), block)))]
+        span = 1
+        while 2 * span <= len(self.table[0]):
+            prev = self.table[-1]
+            self.table.append(array("q", map(min, prev[:len(prev) - span], prev[span:])))
+            span *= 2
+
+    def lca(self, u: int, v: int) -> int:
+        """
+        Finds the lowest common ancestor of two rooms.
+        Args
+            u (int): the first room.
+            v (int): the second room.
+        Returns
+            int: the deepest room that has both rooms in its subtree.
+        """
+        lo, hi = sorted((self.first[u], self.first[v]))
+        b_lo, b_hi = lo // self.block, hi // self.block
+        if b_lo == b_hi:
+            key = min(self.keys[lo:hi + 1])
+        else:
+            key = min(min(self.keys[lo:(b_lo + 1) * self.block]), min(self.keys[b_hi * self.block:hi + 1]))
+            if b_lo + 1 < b_hi: # Whole blocks in between, covered by two overlapping runs from the table.
+                k = (b_hi - b_lo - 1).bit_length() - 1
+                row = self.table[k]
+                key = min(key, row[b_lo + 1], row[b_hi - (1 << k)])
+        return key % self.size
+
+    def distance(self, u: int, v: int) -> int:
+        """
+        Finds the number of moves between two rooms.
+        Args
+            u (int): the first room.
+            v (int): the second room.
+        Returns
+            int: the distance.
+        """
+        return self.depth[u] + self.depth[v] - 2 * self.depth[self.lca(u, v)]
+
+    def step(self, u: int, v: int, neighbours) -> int:
+        """
+        Finds the first room on the way from one room to another.
+        Args
+            u (int): the room to start from.
+            v (int): the room to go to. It must be different from `u`.
+            neighbours (callable): function that takes a room and returns the rooms next to it.
+        Returns
+            int: the room next to `u` that is closer to `v`.
+        """
+        if not self.first[u] <= self.first[v] <= self.last[u]: # `v` isn't below `u`, so go up.
+            return self.parent[u]
+        for nxt in neighbours(u):
+            if self.parent[nxt] == u and self.first[nxt] <= self.first[v] <= self.last[nxt]:
+                return nxt
+
+
+def get_planner(world) -> Planner:
+    """
+    Returns the planner for a world, making it the first time.
+    Args
+        world (World): the game.
+    Returns
+        Planner: the planner.
+    """
+    if world.planner is None:
+        world.planner = Planner(world.size, world.neighbours, world.find("Entrance"))
+    return world.planner
+
+
+def plan(world, location) -> tuple:
+    """
+    Works out the shortest route to escape from a room: to the rooms with the items the player doesn't have
+    yet, in whichever order is shorter, then back through the stairway to the entrance.
+    Args
+        world (World): the game.
+        location (Location): the room the player is in.
+    Returns
+        tuple[int, Location]: the number of moves left, and the room to go to next.
+    """
+    planner = get_planner(world)
+    here = world.index(location)
+    goals = [world.find(room) for item, room in GOALS.items() if item not in world.player.items]
+    end = [world.find("Stairway"), world.find("Entrance")]
+
+    best = None
+    for order in permutations(goals):
+        stops = [here, *order, *end]
+        moves = sum(planner.distance(a, b) for a, b in zip(stops, stops[1:]))
+        if best is None or moves < best[0]:
+            best = (moves, next(stop for stop in stops if stop != here))
+    moves, target = best
+    return moves, world.room(planner.step(here, target, world.neighbours))
@@ -4,9 +4,20 @@ Paul Chen
 This file holds the code for the `Player` class, which contains all the information about the player.
 """
 
-from interface import Interface
-from random import randint
-from time import time
+from challenges import ChallengeSource
+from events import EventBus
+from interface import TURN_PROMPT, TYPE_LETTERS, Interface
+
+
+def time_limit(diff: int) -> int:
+    """
+    Works out how long the player has to type in each attack.
+    Args
+        diff (int): the difficulty chosen by the player. It is a number from 1 to 3.
+    Returns
+        int: the time limit in seconds.
+    """
+    return 9 - diff
 
 
 class Player:
@@ -18,47 +29,59 @@ class Player:
         tl (int): the time limit for the battle.
         difficulty (int): a number representing the player's chosen difficulty.
         items (int): the player's items.
+        won (bool): True if the player has escaped the dungeon with the treasure else False.
+        battles (int): the number of battles the player has fought.
+        hits (int): the number of hits the player has landed.
+        seconds (float): how long the game has been played for, counting the time before it was saved.
         io (Interface): the class that deals with io.
+        challenges (ChallengeSource): where the sequences to type in a battle come from.
+        events (EventBus): where the events of the game are published. The interface subscribes to it.
     """
-    def __init__(self, diff):
+    def __init__(self, diff, io=None, challenges=None):
         """
-        Inits location class.
+        Inits player class.
         Args
             diff (int): the difficulty chosen by the player. It is a number from 1 to 3.
+            io (Interface): the class that deals with io. A new terminal `Interface` is made if this is None.
+            challenges (ChallengeSource): where the sequences to type come from. A new unseeded
+                `ChallengeSource` is made if this is None.
         """
         self.hp = 80
         self.atk = 6
-        self.tl = 9 - diff
+        self.tl = time_limit(diff)
         self.difficulty = diff * 4
         self.items = []
-        self.io = Interface()
+        self.won = False
+        self.battles = 0
+        self.hits = 0
+        self.seconds = 0.0
+        self.io = io if io is not None else Interface()
+        self.challenges = challenges if challenges is not None else ChallengeSource()
+        self.events = EventBus()
+        self.io.attach(self.events)
 
     def attack(self, seq_len: int) -> int:
         """
         Allows the player to attack and returns the number of hits that the players has landed.
         Args
-            seq_len (int): the length of the random sequence.
+            seq_len (int): the length of the random sequence, which is the enemy's difficulty.
         Returns
             int: the number of hits that the player has landed.
         """
-        self.io.input("It's your turn, type anything to begin! ")
-        self.io.push("Type the letters that appear on screen: ")
-
-        # Lambda function that generates a random string of characters that has a length of `seq_len`.
-        generate_string = lambda : "".join(chr(97 + randint(0, 25)) for i in range(seq_len))
+        self.io.input(TURN_PROMPT)
+        self.io.push(TYPE_LETTERS)
 
         hits = 0 # number of hits.
-        start_time = time() # start time
+        start_time = self.io.clock() # start time
 
         # Keeps looping until the time elapses.
-        while time() - start_time < self.tl:
-            # Generate and display the string.
-            given_str = generate_string()
+        while self.io.clock() - start_time < self.tl:
+            # Get the next string and display it.
+            given_str = self.challenges.next(seq_len)
             self.io.push(given_str, delay=False)
 
             # Get the user's input.
-            user_str = self.io.timed_input(self.tl - (time() - start_time),
-                                           delay=False)
+            user_str = self.io.type_challenge(given_str, self.tl - (self.io.clock() - start_time))
 
             # Check if the user's input is the same as the one displayed.
             if user_str[0] == given_str:
@@ -79,4 +102,4 @@ class Player:
         Returns
             bool: True if the game is still ongoing else False.
         """
-        return bool(self.hp)
+        return bool(self.hp) and not self.won
@@ -0,0 +1,162 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `ProceduralWorld` class, which makes large dungeons with thousands to millions of rooms.
+The rooms are copies of the rooms in the content, such as the hall and the armoury, which act as templates.
+"""
+
+from array import array
+from content import CONTENT
+from random import choices, randrange, sample
+from locations import BEHAVIOURS, Location, World, decode_prufer, generate_room_enemies
+
+
+def compact_adjacency(size: int, us: array, vs: array) -> tuple:
+    """
+    Stores a list of directed edges in compressed sparse row form. The rooms next to room `i` are
+    `targets[offsets[i]:offsets[i + 1]]`. This uses two flat arrays instead of a list per room.
+    Args
+        size (int): the number of rooms.
+        us (array[int]): the room that each edge starts at.
+        vs (array[int]): the room that each edge goes to.
+    Returns
+        tuple[array[int], array[int]]: the offsets and the targets.
+    """
+    # Counts the edges leaving each room and turns the counts into starting offsets.
+    offsets = array("i", [0]) * (size + 1)
+    for u in us:
+        offsets[u + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    # Places each edge at the next free spot for its room.
+    targets = array("i", [0]) * len(us)
+    fill = offsets[:-1]
+    for u, v in zip(us, vs):
+        targets[fill[u]] = v
+        fill[u] += 1
+    return offsets, targets
+
+
+class ProceduralWorld(World):
+    """Class that holds a game in a large, randomly generated dungeon. Like the normal dungeon, the entrance leads
+    to the stairway, which leads to a tree of rooms with the hall as its root. The tree has one of each unique
+    room in the content, like the prison and the treasure room, and the rest of the rooms are copies of the
+    other rooms. A `Location` is only made when the player first reaches a room, and its `rooms` are only
+    filled in when the player enters it. Inherits from `World`.
+
+    Attributes:
+        player (Player): the player.
+        content (Content): the rooms and enemies that the game is made from.
+        difficulty (int): the difficulty used to generate the enemies in each room.
+        size (int): the number of rooms.
+        kinds (array[int]): the id of each room's `RoomType`.
+        offsets (array[int]): where each room's neighbours start in `targets`.
+        targets (array[int]): the neighbours of every room, one room after another.
+        made (dict[int, Location]): the rooms that have been made so far, keyed by their index.
+        locations (dict[str, Location]): the entrance, stairway and root hall, keyed by their key.
+        planner (Planner): the route planner for the hints, made the first time a hint is asked for.
+        minimap (Minimap): the map of the explored rooms, made the first time a room is shown.
+    """
+    def __init__(self, player, size: int, content=None):
+        """
+        Inits procedural world class and generates the dungeon.
+        Args
+            player (Player): the player.
+            size (int): the number of rooms. There must be room for the entrance, stairway, hall and unique rooms.
+            content (Content): the rooms and enemies that the game is made from. Defaults to `CONTENT`.
+        """
+        self.player = player
+        self.content = content if content is not None else CONTENT
+        self.difficulty = player.difficulty
+        self.size = size
+
+        # Rooms 0, 1 and 2 are the entrance, stairway and hall, a random room is given to each
+        # of the other unique rooms, and the rest are random copies of the other rooms.
+        ids = self.content.room_ids
+        fixed = [ids["Entrance"], ids["Stairway"], ids["Hall"]]
+        unique = [room.id for room in self.content.rooms if room.unique and room.id not in fixed]
+        templates = [room.id for room in self.content.rooms if not room.unique]
+        if size < len(fixed) + len(unique) + 2:
+            raise ValueError(f"A dungeon needs at least {len(fixed) + len(unique) + 2} rooms.")
+        self.kinds = array("H", choices(templates, k=size)) # Two bytes each, so content can have 65536 rooms.
+        self.kinds[0:3] = array("H", fixed)
+        for index, kind in zip(sample(range(3, size), len(unique)), unique):
+            self.kinds[index] = kind
+
+        # Connects rooms 2 and up with a random tree. Vertex `i` of the tree is room `i + 2`.
+        n = size - 2
+        parent = decode_prufer([randrange(n) for i in range(n - 2)], n)
+        us = array("i", [0, 1, 2])
+        vs = array("i", [1, 2, 1])
+        for i in range(n - 1):
+            us.append(i + 2)
+            vs.append(parent[i] + 2)
+            us.append(parent[i] + 2)
+            vs.append(i + 2)
+        self.offsets, self.targets = compact_adjacency(size, us, vs)
+
+        self.made = {}
+        self.planner = None
+        self.minimap = None
+        self.locations = {"Entrance": self.room(0), "Stairway": self.room(1), "Hall": self.room(2)}
+
+    def neighbours(self, index: int) -> array:
+        """
+        Returns the rooms next to a room.
+        Args
+            index (int): the index of the room.
+        Returns
+            array[int]: the indexes of the rooms next to it.
+        """
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def index(self, location: Location) -> int:
+        """
+        Returns the index of a room.
+        Args
+            location (Location): the location.
+        Returns
+            int: the index of the room.
+        """
+        return location.index
+
+    def find(self, key: str) -> int:
+        """
+        Returns the index of the first room made from a room in the content.
+        Args
+            key (str): the key of the room in the content.
+        Returns
+            int: the index of the room.
+        """
+        return self.kinds.index(self.content.room_ids[key])
+
+    def room(self, index: int) -> Location:
+        """
+        Returns the location for a room, making it and its enemies the first time.
+        Args
+            index (int): the index of the room.
+        Returns
+            Location: the location.
+        """
+        location = self.made.get(index)
+        if location is None:
+            room_type = self.content.rooms[self.kinds[index]]
+            location = BEHAVIOURS[room_type.behaviour](self, room_type)
+            location.index = index
+            if index > 2: # There are many rooms of each kind, so they are numbered.
+                location.name = f"{location.name} {index}"
+            generate_room_enemies(location, self.difficulty)
+            self.made[index] = location
+        return location
+
+    def enter(self, location: Location) -> None:
+        """
+        Fills in the rooms next to a location the first time it is entered.
+        Args
+            location (Location): the location being entered.
+        Returns
+            None
+        """
+        if not location.rooms:
+            location.rooms = [self.room(i) for i in self.neighbours(location.index)]
@@ -0,0 +1,89 @@
+"""
+ICS3U
+Paul Chen
+This file holds the replayer, which plays back input logs recorded with `main.py --record`.
+Nothing is drawn and nothing waits, so each game finishes in milliseconds. A log that no longer
+plays back the same way, because the game has changed, stops with a `ReplayError`.
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from functools import partial
+from io import StringIO
+from time import perf_counter
+from inputlog import ReplayKeyboard, read_log
+from interface import Interface
+from main import run
+
+
+class ReplayInterface(Interface):
+    """Interface that throws its output away. The history is still kept, so the game runs the same way.
+    Inherits from `Interface`.
+
+    Attributes:
+        draw (bool): True if every frame is still built, to time the drawing too, else False.
+    """
+    def __init__(self, keyboard=None, draw=False):
+        """
+        Inits replay interface class.
+        Args
+            keyboard (Keyboard): where the input is read from.
+            draw (bool): True if every frame is still built else False.
+        """
+        self.draw = draw
+        super().__init__(keyboard)
+        self.show_map = draw
+
+    def write(self, text) -> None:
+        pass
+
+    def render(self) -> None:
+        if self.draw:
+            super().render()
+
+
+def replay(filename, draw=False) -> tuple:
+    """
+    Plays back one input log.
+    Args
+        filename (str): the path to the log file.
+        draw (bool): True if every frame is still built else False.
+    Returns
+        tuple[bool, int, float]: True if the log was played to the end of the session else False,
+        the number of records used, and the number of seconds the replay took.
+    """
+    keyboard = ReplayKeyboard(read_log(filename))
+    start = perf_counter()
+    finished = True
+    with redirect_stdout(StringIO()):
+        try:
+            run(keyboard, keyboard.rooms, keyboard.seed, partial(ReplayInterface, draw=draw))
+        except EOFError: # The log stops in the middle of the session, like when the game crashed.
+            finished = False
+    return finished, keyboard.position, perf_counter() - start
+
+
+def main() -> None:
+    """
+    Entry point for the replayer. Plays back each log and prints how it went.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Plays back input logs recorded by Dungeon Escape.")
+    parser.add_argument("logs", nargs="+", help="the input logs to play back")
+    parser.add_argument("--draw", action="store_true", help="build every frame, to time the drawing too")
+    args = parser.parse_args()
+
+    total = 0.0
+    print(f"{'Log':<40}{'Records':>10}{'Ended':>10}{'ms':>10}")
+    for filename in args.logs:
+        finished, records, seconds = replay(filename, args.draw)
+        total += seconds
+        print(f"{filename:<40}{records:>10}{'quit' if finished else 'early':>10}{seconds * 1000:>10.2f}")
+    print(f"{len(args.logs)} logs in {total * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+ICS3U
+Paul Chen
+This file holds the code that saves and resumes a game in the normal dungeon. A save is a small binary file:
+a fixed header with the player's stats, followed by the player's items and one record for each room with its
+visited flag, the rooms next to it and the enemies left in it. Rooms and enemies are stored by their id in the
+content, so a save is only a few hundred bytes and is loaded with one read.
+"""
+
+from os import replace
+from struct import Struct
+from zlib import crc32
+from content import CONTENT
+from locations import Location, World
+
+# The start of every save file and the version of the format.
+MAGIC = b"DESV"
+VERSION = 2
+
+# Magic, version, content checksum, HP, ATK, time limit, difficulty, won, number of items, number of rooms,
+# the id of the current room, battles, hits and seconds played.
+HEADER = Struct("<4sBIhhBBBBBBHId")
+
+# Visited flag, number of neighbours and number of enemies. The ids of the neighbours and enemies follow.
+ROOM = Struct("<BBB")
+
+
+def content_checksum(content) -> int:
+    """
+    Works out a checksum of the rooms and enemies in the content, so a save isn't loaded with different content.
+    Args
+        content (Content): the content.
+    Returns
+        int: the checksum.
+    """
+    keys = [room.key for room in content.rooms] + [enemy.key for enemy in content.enemies]
+    return crc32("\n".join(keys).encode("utf-8"))
+
+
+def save_game(world: World, current: Location) -> bytes:
+    """
+    Saves a game in the normal dungeon.
+    Args
+        world (World): the game.
+        current (Location): the room that the player is about to enter.
+    Returns
+        bytes: the save.
+    """
+    player = world.player
+    rooms = world.content.rooms
+    if len(rooms) > 255 or len(world.content.enemies) > 255 or len(player.items) > 255:
+        raise ValueError("Only games with up to 255 rooms, enemies and items can be saved.")
+
+    parts = [HEADER.pack(MAGIC, VERSION, content_checksum(world.content), player.hp, player.atk, player.tl,
+                         player.difficulty, player.won, len(player.items), len(rooms), current.type.id,
+                         player.battles, player.hits, player.seconds)]
+    for item in player.items:
+        data = item.encode("utf-8")
+        parts.append(bytes([len(data)]) + data)
+    for room_type in rooms:
+        room = world[room_type.key]
+        parts.append(ROOM.pack(room.visited, len(room.rooms), len(room.enemies)))
+        parts.append(bytes(r.type.id for r in room.rooms))
+        parts.append(bytes(e.id for e in room.enemies))
+    return b"".join(parts)
+
+
+def load_game(data: bytes, player, content=None) -> tuple:
+    """
+    Resumes a saved game, putting the saved stats into the player.
+    Args
+        data (bytes): the save.
+        player (Player): the player, who is given the saved stats.
+        content (Content): the rooms and enemies that the game is made from. Defaults to `CONTENT`.
+    Returns
+        tuple[World, Location]: the game and the room that the player is about to enter.
+    """
+    content = content if content is not None else CONTENT
+    if data[:5] != MAGIC + bytes([VERSION]): # Older saves have a shorter header.
+        raise ValueError(f"This is not a version {VERSION} save.")
+    (magic, version, checksum, player.hp, player.atk, player.tl, player.difficulty, won, num_items, num_rooms,
+     current, player.battles, player.hits, player.seconds) = HEADER.unpack_from(data)
+    if checksum != content_checksum(content) or num_rooms != len(content.rooms):
+        raise ValueError("This save was made with different content.")
+    player.won = bool(won)
+
+    offset = HEADER.size
+    player.items = []
+    for i in range(num_items):
+        length = data[offset]
+        player.items.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+
+    world = World(player, content)
+    for room_type in content.rooms:
+        room = world[room_type.key]
+        visited, num_neighbours, num_enemies = ROOM.unpack_from(data, offset)
+        offset += ROOM.size
+        room.visited = bool(visited)
+        room.rooms = [world[content.rooms[i].key] for i in data[offset:offset + num_neighbours]]
+        offset += num_neighbours
+        room.enemies = [content.enemies[i] for i in data[offset:offset + num_enemies]]
+        offset += num_enemies
+    return world, world[content.rooms[current].key]
+
+
+def write_save(filename: str, world: World, current: Location) -> None:
+    """
+    Saves a game to a file. The file is replaced in one step, so a crash never leaves half a save.
+    Args
+        filename (str): the path to the save file.
+        world (World): the game.
+        current (Location): the room that the player is about to enter.
+    Returns
+        None
+    """
+    with open(filename + ".tmp", "wb") as file:
+        file.write(save_game(world, current))
+    replace(filename + ".tmp", filename)
+
+
+def read_save(filename: str, player, content=None) -> tuple:
+    """
+    Resumes a game from a file.
+    Args
+        filename (str): the path to the save file.
+        player (Player): the player, who is given the saved stats.
+        content (Content): the rooms and enemies that the game is made from. Defaults to `CONTENT`.
+    Returns
+        tuple[World, Location]: the game and the room that the player is about to enter.
+    """
+    with open(filename, "rb") as file:
+        return load_game(file.read(), player, content)
@@ -0,0 +1,466 @@
+"""
+ICS3U
+Paul Chen
+This file holds the game server, which lets many players play Dungeon Escape over telnet at the same time.
+The connections are handled by an asyncio event loop. Each game runs its normal, blocking code in a
+thread, and its `NetworkInterface` hands every read, write and pause over to the event loop. The threads are a
+stopgap until the game loop can run on the event loop itself, so their stack size and number are worked out
+from what a game was measured to use.
+"""
+
+import asyncio
+import os
+import re
+import threading
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from interface import CHOICE_PROMPT, CONTINUE_PROMPT, Interface
+from keyboard import Keyboard
+from leaderboard import Leaderboard
+from main import DIFFICULTY_MENU, LOGO, MENU, TUTORIAL, play
+from metrics import METRICS, enable
+from os import makedirs, name, path, remove
+from secrets import token_hex
+from player import Player
+from telemetry import Telemetry
+
+if name == "posix":
+    import fcntl
+    import resource
+else:
+    import msvcrt
+
+# Telnet commands sent by the client. These are removed from the input.
+TELNET_COMMAND = re.compile(rb"\xff\xfa.*?\xff\xf0|\xff[\xfb-\xfe].|\xff[\xf0-\xfa\xff]", re.DOTALL)
+
+# A resume code, which is also the name of the game's save file. It has 80 random bits, so it can't be guessed.
+RESUME_CODE = re.compile(r"[0-9a-f]{20}")
+RESUME_PROMPT = "Type your resume code, or press enter for a new game: "
+
+# Sent to players who connect while every game slot is in use, before they are disconnected.
+FULL = "The server is full. Please try again in a few minutes.\r\n"
+
+# The stack size of each game's thread in KiB. With 256 KiB stacks, the most stack any game thread had touched
+# after 300 seconds of 20 `loadtest.py` players finishing games, with saves, a leaderboard, gzipped telemetry
+# and metrics on, was 12 KiB. This leaves five times that, and 32 KiB, the least Python allows, also held up.
+STACK_KB = 64
+
+# The memory that each game takes in KiB, rounded up from the 104 to 116 KiB per session that `loadtest.py`
+# measured with 100 to 400 players.
+SESSION_KB = 128
+
+# Telnet's no-operation command, which clients ignore. It is sent before every pause, so the load tester can
+# leave the pauses out of its timings.
+NOP = b"\xff\xf1"
+
+
+class Disconnected(Exception):
+    """Raised in a game's thread when the player's connection has closed."""
+
+
+class Connection:
+    """Class that represents one player's connection. A task on the event loop reads lines from
+    the connection into a queue, which the game's thread takes them from.
+
+    Attributes:
+        reader (asyncio.StreamReader): the stream to read from.
+        writer (asyncio.StreamWriter): the stream to write to.
+        lines (asyncio.Queue): the lines that have been read but not used yet. None is put in the
+            queue when the connection closes.
+        closed (bool): True if the connection has closed else False.
+        task (asyncio.Task): the task that reads from the connection.
+    """
+    def __init__(self, reader, writer):
+        """
+        Inits connection class. Must be called from the event loop.
+        Args
+            reader (asyncio.StreamReader): the stream to read from.
+            writer (asyncio.StreamWriter): the stream to write to.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.lines = asyncio.Queue()
+        self.closed = False
+        self.task = asyncio.ensure_future(self.read_lines())
+
+    async def read_lines(self) -> None:
+        """
+        Reads lines from the connection into `lines` until the connection closes.
+        Args
+            None
+        Returns
+            None
+        """
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                line = TELNET_COMMAND.sub(b"", line)
+                self.lines.put_nowait(line.decode(errors="ignore").rstrip("\r\n"))
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.lines.put_nowait(None)
+
+    async def readline(self, tm=None) -> tuple:
+        """
+        Waits for the next line.
+        Args
+            tm (float): length of timeout in seconds, or None to wait forever.
+        Returns
+            tuple[str, bool]: the line and whether the input timed out or not.
+        """
+        try:
+            line = await asyncio.wait_for(self.lines.get(), tm)
+        except asyncio.TimeoutError:
+            return "", True
+        if line is None:
+            self.lines.put_nowait(None) # Leave the marker for the next read.
+            raise Disconnected()
+        return line, False
+
+    async def pause(self, tm) -> None:
+        """
+        Waits for a certain amount of time and throws away every line typed in that time.
+        Args
+            tm (float): length of the pause in seconds.
+        Returns
+            None
+        """
+        await asyncio.sleep(tm)
+        while not self.lines.empty():
+            if self.lines.get_nowait() is None:
+                self.lines.put_nowait(None)
+                raise Disconnected()
+
+
+class NetworkInterface(Interface):
+    """Interface that talks to a player over a `Connection`. It is used from the game's thread, and
+    runs everything on the event loop. Inherits from `Interface`.
+
+    Attributes:
+        conn (Connection): the player's connection.
+        loop (asyncio.AbstractEventLoop): the event loop that the connection belongs to.
+    """
+    def __init__(self, conn, loop):
+        """
+        Inits network interface class.
+        Args
+            conn (Connection): the player's connection.
+            loop (asyncio.AbstractEventLoop): the event loop that the connection belongs to.
+        """
+        self.conn = conn
+        self.loop = loop
+        super().__init__(Keyboard()) # Every read goes to the connection, never the server's terminal.
+
+    def call(self, coro):
+        """
+        Runs a coroutine on the event loop and waits for its result.
+        Args
+            coro (coroutine): the coroutine.
+        Returns
+            Any: the result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def write(self, text) -> None:
+        if self.conn.closed:
+            raise Disconnected()
+        self.loop.call_soon_threadsafe(self.conn.writer.write, text.replace("\n", "\r\n").encode())
+
+    def read(self, prompt) -> str:
+        self.write(prompt)
+        return self.call(self.conn.readline())[0]
+
+    def read_timed(self, tm) -> tuple:
+        return self.call(self.conn.readline(tm))
+
+    def read_until(self, target, tm) -> tuple:
+        # Telnet clients send whole lines unless they are switched to character mode, so Enter is still needed.
+        return self.read_timed(tm)
+
+    def ignore(self, tm) -> None:
+        if self.conn.closed:
+            raise Disconnected()
+        self.loop.call_soon_threadsafe(self.conn.writer.write, NOP)
+        self.call(self.conn.pause(tm))
+
+    def clear(self) -> None:
+        super().clear()
+        self.width, self.height = 80, 24 # The size of the player's terminal isn't known.
+
+    def clock(self) -> float:
+        return self.loop.time()
+
+    def select_difficulty(self) -> int:
+        return choose(self, DIFFICULTY_MENU)
+
+
+def session_limit(stack_kb: int) -> int:
+    """
+    Works out how many games can run at once, which is how many threads fit in half of the free memory, half of
+    the threads that the user may start, and the address space.
+    Args
+        stack_kb (int): the stack size of each game's thread in KiB. Only the pages a game touches use memory,
+            but all of it uses address space.
+    Returns
+        int: the number of games.
+    """
+    limits = []
+    try:
+        limits.append(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 1024 // 2 // SESSION_KB)
+    except (AttributeError, ValueError, OSError): # Not on this system, so the limit is the 1 GiB the old default used.
+        limits.append(2 ** 20 // SESSION_KB)
+    if name == "posix":
+        threads = resource.getrlimit(resource.RLIMIT_NPROC)[0]
+        if threads != resource.RLIM_INFINITY:
+            limits.append(threads // 2)
+        space = resource.getrlimit(resource.RLIMIT_AS)[0]
+        if space != resource.RLIM_INFINITY:
+            limits.append(space // 1024 // 2 // stack_kb)
+    return max(1, min(limits))
+
+
+def choose(io: Interface, text: str) -> int:
+    """
+    Shows a menu and asks the player to choose an option from 1 to 3.
+    Args
+        io (Interface): the player's interface.
+        text (str): the menu.
+    Returns
+        int: the player's choice.
+    """
+    io.set_room_info(LOGO + text)
+    inp = io.input(CHOICE_PROMPT, delay=False)
+    while not inp.isdigit() or int(inp) < 1 or int(inp) > 3:
+        io.push("Invalid Input", delay=False)
+        inp = io.input(CHOICE_PROMPT, delay=False)
+    return int(inp)
+
+
+def claim(save: str):
+    """
+    Locks a game, so it can't be played on two connections at once, even by different worker processes.
+    The lock is kept in a file next to the save, and the system lets go of it if the process dies.
+    Args
+        save (str): the save file of the game.
+    Returns
+        TextIOWrapper: the open lock file, or None if the game is being played on another connection.
+    """
+    lock = open(save + ".lock", "a")
+    try:
+        if name == "posix":
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def release(lock, save: str) -> None:
+    """
+    Lets go of the lock on a game. The lock file is only deleted once the game is over, since a connection
+    that opened it just before could otherwise lock it at the same time as one that makes a new one.
+    Args
+        lock (TextIOWrapper): the open lock file from `claim()`.
+        save (str): the save file of the game.
+    Returns
+        None
+    """
+    if not path.exists(save):
+        remove(lock.name)
+    lock.close()
+
+
+def resume_file(io: Interface, saves: str) -> tuple:
+    """
+    Asks the player for a resume code, so a game can be carried on after a disconnect. The game is locked
+    until `release()` is called.
+    Args
+        io (Interface): the player's interface.
+        saves (str): the directory that games are saved in.
+    Returns
+        tuple[str, TextIOWrapper]: the save file of the game, which only exists if the player is carrying on
+        a game, and the open lock file.
+    """
+    code = io.input(RESUME_PROMPT, delay=False).strip().lower()
+    while code:
+        save = path.join(saves, code + ".sav")
+        if not (RESUME_CODE.fullmatch(code) and path.exists(save)):
+            io.push("There is no saved game with that code.", delay=False)
+        else:
+            lock = claim(save)
+            if lock is None:
+                io.push("That game is being played on another connection.", delay=False)
+            elif path.exists(save): # Checked again, in case the game ended before it was locked.
+                return save, lock
+            else:
+                release(lock, save)
+                io.push("There is no saved game with that code.", delay=False)
+        code = io.input(RESUME_PROMPT, delay=False).strip().lower()
+    code = token_hex(10)
+    io.push(f"Your resume code is {code}. If you are disconnected, type it in to carry on.", delay=False)
+    save = path.join(saves, code + ".sav")
+    return save, claim(save)
+
+
+def session(conn: Connection, loop, saves=None, leaderboard=None, telemetry=None) -> None:
+    """
+    Runs the menus and games for one player, the same way as `main()`. This runs in a thread.
+    Args
+        conn (Connection): the player's connection.
+        loop (asyncio.AbstractEventLoop): the event loop that the connection belongs to.
+        saves (str): the directory that games are saved in, or None to not save games.
+        leaderboard (Leaderboard): where finished games are recorded, or None to not record them.
+        telemetry (Telemetry): where the games' events are written, or None to not write them.
+    Returns
+        None
+    """
+    io = NetworkInterface(conn, loop)
+    menu_choice = choose(io, MENU)
+    while menu_choice != 3:
+        if menu_choice == 1: # Play
+            save, lock = resume_file(io, saves) if saves else (None, None)
+            try:
+                if save and path.exists(save): # The saved game has the difficulty.
+                    play(Player(1, io), save=save, leaderboard=leaderboard, telemetry=telemetry)
+                else:
+                    play(Player(io.select_difficulty(), io), save=save, leaderboard=leaderboard, telemetry=telemetry)
+            finally: # Also after a disconnect, so the game can be carried on.
+                if lock is not None:
+                    release(lock, save)
+        elif menu_choice == 2: # Tutorial
+            io.set_room_info(TUTORIAL)
+        io.input(CONTINUE_PROMPT)
+
+        # A fresh interface so the last game's events aren't shown.
+        io = NetworkInterface(conn, loop)
+        menu_choice = choose(io, MENU)
+
+
+async def handle(reader, writer, executor, slots, saves=None, leaderboard=None, telemetry=None) -> None:
+    """
+    Plays the game with a new connection until the player quits or disconnects. If every game slot is in use,
+    the player is told the server is full and disconnected instead of waiting with a blank screen.
+    Args
+        reader (asyncio.StreamReader): the stream to read from.
+        writer (asyncio.StreamWriter): the stream to write to.
+        executor (ThreadPoolExecutor): the threads that games run in.
+        slots (asyncio.Semaphore): one slot for each thread in `executor`.
+        saves (str): the directory that games are saved in, or None to not save games.
+        leaderboard (Leaderboard): where finished games are recorded, or None to not record them.
+        telemetry (Telemetry): where the games' events are written, or None to not write them.
+    Returns
+        None
+    """
+    if slots.locked():
+        writer.write(FULL.encode())
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+        return
+
+    async with slots:
+        conn = Connection(reader, writer)
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, session, conn, asyncio.get_running_loop(),
+                                                             saves, leaderboard, telemetry)
+        except Disconnected:
+            pass
+        finally:
+            conn.task.cancel()
+            writer.close()
+
+
+async def save_metrics(filename: str, interval: float) -> None:
+    """
+    Saves a snapshot of the metrics every so often.
+    Args
+        filename (str): the path to the snapshot file.
+        interval (float): the number of seconds between snapshots.
+    Returns
+        None
+    """
+    while True:
+        await asyncio.sleep(interval)
+        METRICS.save(filename)
+
+
+async def serve(host: str, port: int, max_sessions: int, metrics_file=None, metrics_interval=10.0,
+                saves=None, leaderboard=None, telemetry=None, telemetry_mb=64.0, telemetry_gzip=False,
+                stack_kb=STACK_KB) -> None:
+    """
+    Runs the server forever.
+    Args
+        host (str): the address to listen on.
+        port (int): the port to listen on.
+        max_sessions (int): the number of games that can be played at once. Players past this are told the server
+            is full.
+        metrics_file (str): the path to save metrics to, or None to not measure anything.
+        metrics_interval (float): the number of seconds between saves of the metrics.
+        saves (str): the directory that games are saved in, or None to not save games.
+        leaderboard (str): the path to a database to record finished games in, or None to not record them.
+        telemetry (str): the path to a JSON Lines file to write the games' events to, or None to not write them.
+        telemetry_mb (float): the size in MB that the telemetry file is rotated at.
+        telemetry_gzip (bool): True to compress old telemetry files else False.
+        stack_kb (int): the stack size of each game's thread in KiB.
+    Returns
+        None
+    """
+    if saves:
+        makedirs(saves, exist_ok=True)
+    if leaderboard:
+        leaderboard = Leaderboard(leaderboard)
+    if telemetry:
+        telemetry = Telemetry(telemetry, int(telemetry_mb * 2 ** 20), telemetry_gzip)
+    if metrics_file:
+        enable()
+        asyncio.create_task(save_metrics(metrics_file, metrics_interval))
+
+    threading.stack_size(stack_kb * 1024)
+    executor = ThreadPoolExecutor(max_workers=max_sessions)
+    slots = asyncio.Semaphore(max_sessions)
+    server = await asyncio.start_server(lambda r, w: handle(r, w, executor, slots, saves, leaderboard, telemetry),
+                                        host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """
+    Entry point for the server.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Serves Dungeon Escape over telnet.")
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--port", type=int, default=2323, help="port to listen on")
+    parser.add_argument("--max-sessions", type=int, default=None,
+                        help="games that can be played at once, by default as many as fit in memory")
+    parser.add_argument("--stack-kb", type=int, default=STACK_KB, help="stack size of each game's thread in KiB")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="measure where time is spent and save it to FILE (Prometheus format if it ends in .prom)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="seconds between saves of the metrics")
+    parser.add_argument("--saves", metavar="DIR",
+                        help="save games in DIR so players can carry on with a resume code after a disconnect")
+    parser.add_argument("--leaderboard", metavar="FILE", help="record every finished game in this database")
+    parser.add_argument("--telemetry", metavar="FILE", help="write every event of every game to this JSON Lines file")
+    parser.add_argument("--telemetry-mb", type=float, default=64,
+                        help="size in MB that the telemetry file is rotated at")
+    parser.add_argument("--telemetry-gzip", action="store_true", help="compress old telemetry files")
+    args = parser.parse_args()
+    max_sessions = args.max_sessions if args.max_sessions is not None else session_limit(args.stack_kb)
+    asyncio.run(serve(args.host, args.port, max_sessions, args.metrics, args.metrics_interval, args.saves,
+                      args.leaderboard, args.telemetry, args.telemetry_mb, args.telemetry_gzip, args.stack_kb))
+
+
+if __name__ == "__main__":
+    main()
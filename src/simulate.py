@@ -0,0 +1,325 @@
+"""
+ICS3U
+Paul Chen
+This file holds the headless simulator. It plays full games of Dungeon Escape without a terminal, using
+a model of the player's typing instead of the timed battle, so that the difficulty of the game can be tuned.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from math import inf, nextafter
+from random import gauss, randint, random, seed
+from events import RoomEntered
+from interface import Interface
+from keyboard import Keyboard
+from main import play
+from player import Player
+
+
+class SimKeyboard(Keyboard):
+    """Keyboard that never waits. The clock only moves when the game pauses, so games played with it are
+    timed the same way every time. Inherits from `Keyboard`.
+
+    Attributes:
+        now (float): the time in seconds.
+    """
+    def __init__(self):
+        """
+        Inits simulated keyboard class.
+        """
+        self.now = 0.0
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        return "", False
+
+    def pause(self, tm) -> None:
+        # Always moves the clock, even if `tm` is too small to change it, so a loop waiting on it can't get stuck.
+        if tm > 0:
+            self.now = max(self.now + tm, nextafter(self.now, inf))
+
+    def clock(self) -> float:
+        return self.now
+
+
+class HeadlessInterface(Interface):
+    """Interface that never touches the terminal. Messages are thrown away, pauses return right away,
+    and questions are answered by a function instead of the keyboard.
+
+    Attributes:
+        answer (callable): function that takes the question and the last message pushed and returns the reply.
+        last (str): the last message that was pushed.
+    """
+    def __init__(self, answer):
+        """
+        Inits headless interface class. Unlike `Interface`, this doesn't clear the screen.
+        Args
+            answer (callable): function that takes the question and the last message pushed and returns the reply.
+        """
+        self.answer = answer
+        self.last = ""
+        super().__init__(SimKeyboard())
+        self.default_ignore = 0
+        self.show_map = False
+
+    def attach(self, events) -> None:
+        pass
+
+    def set_room_info(self, info) -> None:
+        pass
+
+    def push(self, message, delay=True) -> None:
+        self.last = message
+
+    def pop(self) -> None:
+        pass
+
+    def input(self, message, delay=True) -> str:
+        return self.answer(message, self.last)
+
+    def ignore(self, tm) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def display(self) -> None:
+        pass
+
+    def update(self) -> None:
+        pass
+
+
+class TypingModel:
+    """Model of how quickly and how accurately a player types the sequences in a battle.
+
+    Attributes:
+        cps (float): the number of characters the player types per second, including the enter key.
+        reaction (float): the number of seconds it takes the player to read a new sequence.
+        accuracy (float): the chance that a sequence is typed without any mistakes.
+        jitter (float): the standard deviation of the time taken for each sequence, as a fraction of the mean.
+    """
+    def __init__(self, cps=5.0, reaction=0.4, accuracy=0.95, jitter=0.2):
+        """
+        Inits typing model class.
+        Args
+            cps (float): the number of characters the player types per second.
+            reaction (float): the number of seconds it takes the player to read a new sequence.
+            accuracy (float): the chance that a sequence is typed without any mistakes.
+            jitter (float): the standard deviation of the time for each sequence, as a fraction of the mean.
+        """
+        self.cps = cps
+        self.reaction = reaction
+        self.accuracy = accuracy
+        self.jitter = jitter
+
+    def seconds(self, seq_len: int) -> float:
+        """
+        Works out how long the player takes to type one sequence.
+        Args
+            seq_len (int): the length of the sequence.
+        Returns
+            float: the number of seconds it takes.
+        """
+        mean = self.reaction + (seq_len + 1) / self.cps # The + 1 is the enter key.
+        return max(0.05, gauss(mean, mean * self.jitter))
+
+    def correct(self) -> bool:
+        """
+        Works out whether the player types one sequence without any mistakes.
+        Args
+            None
+        Returns
+            bool: True if the sequence is typed correctly else False.
+        """
+        return random() < self.accuracy
+
+    def __call__(self, seq_len: int, tl: float) -> int:
+        """
+        Plays one attack and returns the number of hits.
+        Args
+            seq_len (int): the length of the random sequence.
+            tl (float): the time limit for the attack.
+        Returns
+            int: the number of hits that the player has landed.
+        """
+        hits = 0
+        elapsed = 0.0
+        while True:
+            elapsed += self.seconds(seq_len)
+            if elapsed >= tl:
+                return hits
+            if self.correct():
+                hits += 1
+
+
+class RandomWalk:
+    """Answers the questions in the game by wandering the dungeon at random.
+
+    Attributes:
+        drink (float): the chance of drinking the potion in the witch's hut.
+    """
+    def __init__(self, drink=0.5):
+        """
+        Inits random walk class.
+        Args
+            drink (float): the chance of drinking the potion in the witch's hut.
+        """
+        self.drink = drink
+
+    def __call__(self, message: str, last: str) -> str:
+        """
+        Answers a question.
+        Args
+            message (str): the question.
+            last (str): the last message pushed. When choosing a room, this is the list of rooms.
+        Returns
+            str: the answer.
+        """
+        if message.startswith("Where"): # Choosing a room, the list has one line per room.
+            return str(randint(1, last.count("\n")))
+        if message.startswith("Do you want to drink"):
+            return "y" if random() < self.drink else "n"
+        return ""
+
+
+class SimPlayer(Player):
+    """Player that is controlled by a `TypingModel` instead of the keyboard. Inherits from `Player`.
+
+    Attributes:
+        model (callable): function that takes the sequence length and time limit and returns the number of hits.
+    """
+    def __init__(self, diff, model, answer):
+        """
+        Inits simulated player class.
+        Args
+            diff (int): the difficulty. It is a number from 1 to 3.
+            model (callable): function that takes the sequence length and time limit and returns the number of hits.
+            answer (callable): function that answers the questions in the game.
+        """
+        super().__init__(diff, HeadlessInterface(answer))
+        self.model = model
+
+    def attack(self, seq_len: int) -> int:
+        """
+        Returns the number of hits from the typing model.
+        Args
+            seq_len (int): the length of the random sequence.
+        Returns
+            int: the number of hits that the player has landed.
+        """
+        return self.model(seq_len, self.tl)
+
+
+def play_game(diff: int, model, answer) -> tuple:
+    """
+    Plays one full game with `main.play()`.
+    Args
+        diff (int): the difficulty. It is a number from 1 to 3.
+        model (callable): the typing model.
+        answer (callable): function that answers the questions in the game.
+    Returns
+        tuple[bool, int, int, int]: whether the player won, their HP left, the number of rooms
+        entered, and the number of battles fought.
+    """
+    player = SimPlayer(diff, model, answer)
+    entered = []
+    player.events.subscribe(entered.append, RoomEntered)
+    play(player)
+    return player.won, player.hp, len(entered), player.battles
+
+
+def run_batch(diff: int, games: int, rng_seed, model, answer) -> tuple:
+    """
+    Plays a batch of games. This is the function that runs in each worker process.
+    Args
+        diff (int): the difficulty. It is a number from 1 to 3.
+        games (int): the number of games to play.
+        rng_seed (int): the seed for the random number generator, or None for a random seed.
+        model (callable): the typing model.
+        answer (callable): function that answers the questions in the game.
+    Returns
+        tuple[int, int, int, int, int]: the number of games, wins, HP left by winners, rooms entered and battles fought.
+    """
+    seed(rng_seed)
+    wins = hp = rooms = battles = 0
+    for i in range(games):
+        result = play_game(diff, model, answer)
+        if result[0]:
+            wins += 1
+            hp += result[1]
+        rooms += result[2]
+        battles += result[3]
+    return games, wins, hp, rooms, battles
+
+
+def simulate(games: int, workers=None, chunk=2000, rng_seed=None, model=None, answer=None) -> dict:
+    """
+    Plays `games` games on every difficulty across a pool of processes.
+    Args
+        games (int): the number of games to play per difficulty.
+        workers (int): the number of processes, defaults to the number of cores.
+        chunk (int): the number of games given to a process at a time.
+        rng_seed (int): the seed for the batches, or None for random seeds.
+        model (callable): the typing model, defaults to `TypingModel()`.
+        answer (callable): function that answers the questions in the game, defaults to `RandomWalk()`.
+    Returns
+        dict[int, tuple[int, int, int, int, int]]: the totals from `run_batch()` for each difficulty.
+    """
+    model = model if model is not None else TypingModel()
+    answer = answer if answer is not None else RandomWalk()
+    totals = {diff: (0, 0, 0, 0, 0) for diff in range(1, 4)}
+    with ProcessPoolExecutor(max_workers=workers or cpu_count()) as pool:
+        futures = []
+        for diff in range(1, 4):
+            for start in range(0, games, chunk):
+                # Every batch gets its own seed so that the results can be reproduced.
+                batch_seed = None if rng_seed is None else hash((rng_seed, diff, start))
+                futures.append((diff, pool.submit(run_batch, diff, min(chunk, games - start),
+                                                  batch_seed, model, answer)))
+        for diff, future in futures:
+            totals[diff] = tuple(a + b for a, b in zip(totals[diff], future.result()))
+    return totals
+
+
+def report(totals: dict) -> str:
+    """
+    Formats the results of `simulate()` as a table.
+    Args
+        totals (dict): the totals from `simulate()`.
+    Returns
+        str: the table.
+    """
+    lines = [f"{'Difficulty':<12}{'Games':>10}{'Win rate':>10}{'HP left':>10}{'Rooms':>10}{'Battles':>10}"]
+    for diff, (games, wins, hp, rooms, battles) in totals.items():
+        lines.append(f"{diff:<12}{games:>10}{wins / games:>10.2%}{hp / max(wins, 1):>10.1f}"
+                     f"{rooms / games:>10.2f}{battles / games:>10.2f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """
+    Entry point for the simulator.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Plays Dungeon Escape without a terminal and reports the results.")
+    parser.add_argument("--games", type=int, default=10000, help="games to play per difficulty")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes")
+    parser.add_argument("--chunk", type=int, default=2000, help="games per batch")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random number generator")
+    parser.add_argument("--cps", type=float, default=5.0, help="characters typed per second")
+    parser.add_argument("--reaction", type=float, default=0.4, help="seconds to read a sequence")
+    parser.add_argument("--accuracy", type=float, default=0.95, help="chance of typing a sequence correctly")
+    parser.add_argument("--drink", type=float, default=0.5, help="chance of drinking the witch's potion")
+    args = parser.parse_args()
+
+    totals = simulate(args.games, args.workers, args.chunk, args.seed,
+                      TypingModel(args.cps, args.reaction, args.accuracy), RandomWalk(args.drink))
+    print(report(totals))
+
+
+if __name__ == "__main__":
+    main()
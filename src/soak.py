@@ -0,0 +1,153 @@
+"""
+ICS3U
+Paul Chen
+This file holds the soak test, which checks that a long running process doesn't slowly use more memory or get
+slower. An agent plays many games back to back through the menus in `main.py`, the same way a server process
+does, and every so often the process's memory, the number of live objects and the time taken by
+`generate_graph()`, which comes from the metrics, are measured. At the end the measurements from the start and the end are compared.
+"""
+
+import gc
+import main as game
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from os import devnull, getpid
+from statistics import median
+from agents import AGENTS, AgentInterface, AgentKeyboard
+from loadtest import rss
+from metrics import Metrics, disable, enable
+
+
+class Soak:
+    """Class that takes the measurements. Its `record()` is passed to `run()` as the `on_game_over` hook, so it
+    is told about every game that ends.
+
+    Attributes:
+        every (int): the number of games between measurements.
+        games (int): the number of games played so far.
+        wins (int): the number of games won so far.
+        metrics (Metrics): where the metrics record the time spent in `generate_graph()`.
+        graph_time (float): the seconds spent in `generate_graph()` up to the last measurement.
+        graph_calls (int): the number of calls to `generate_graph()` up to the last measurement.
+        samples (list[tuple[int, int, int, float]]): the number of games played, the memory in bytes, the number
+            of objects and the average microseconds per `generate_graph()` at each measurement.
+        out (file): where the measurements are printed, since the game's own output is thrown away.
+    """
+    def __init__(self, every: int, out=None):
+        """
+        Inits soak class.
+        Args
+            every (int): the number of games between measurements.
+            out (file): where the measurements are printed. Defaults to `sys.stdout`.
+        """
+        self.out = out if out is not None else sys.stdout
+        self.every = every
+        self.games = 0
+        self.wins = 0
+        self.metrics = Metrics()
+        self.graph_time = 0.0
+        self.graph_calls = 0
+        self.samples = []
+
+    def record(self, player) -> None:
+        """
+        Counts a finished game, and takes a measurement every `every` games.
+        Args
+            player (Player): the player at the end of the game.
+        Returns
+            None
+        """
+        self.games += 1
+        self.wins += player.won
+        if self.games % self.every == 0:
+            self.sample()
+
+    def sample(self) -> None:
+        """
+        Measures the memory, the objects and the time in `generate_graph()`, and prints them.
+        Args
+            None
+        Returns
+            None
+        """
+        gc.collect()
+        memory = rss(getpid())
+        objects = len(gc.get_objects())
+        histogram = self.metrics.histogram("generate_seconds", step="graph")
+        total, calls = (histogram.sum, histogram.count) if histogram is not None else (0.0, 0)
+        graph = (total - self.graph_time) / max(calls - self.graph_calls, 1) * 1e6
+        self.graph_time, self.graph_calls = total, calls
+        self.samples.append((self.games, memory, objects, graph))
+        print(f"{self.games:>10}{'-' if memory is None else f'{memory / 2 ** 20:.1f}':>10}{objects:>10}"
+              f"{graph:>14.1f}{self.wins / self.games:>10.2%}", file=self.out, flush=True)
+
+
+def check(samples: list, memory=0.05, objects=0.01, graph=1.5) -> list:
+    """
+    Compares the measurements from the start and the end of a soak test. The first measurement is left out,
+    since caches and the allocator are still warming up, and the rest are split into thirds.
+    Args
+        samples (list[tuple[int, int, int, float]]): the measurements from `Soak`.
+        memory (float): the largest fraction that the memory can grow by.
+        objects (float): the largest fraction that the number of objects can grow by.
+        graph (float): the largest ratio between the times of `generate_graph()`.
+    Returns
+        list[str]: a description of each measurement that didn't stay flat. It is empty if they all did.
+    """
+    samples = samples[1:]
+    third = max(1, len(samples) // 3)
+    start, end = samples[:third], samples[-third:]
+    problems = []
+    if start[0][1] is not None:
+        before, after = median(s[1] for s in start), median(s[1] for s in end)
+        if after > before * (1 + memory):
+            problems.append(f"memory grew from {before / 2 ** 20:.1f} MB to {after / 2 ** 20:.1f} MB")
+    before, after = median(s[2] for s in start), median(s[2] for s in end)
+    if after > before * (1 + objects):
+        problems.append(f"objects grew from {before:.0f} to {after:.0f}")
+    before, after = median(s[3] for s in start), median(s[3] for s in end)
+    if after > before * graph:
+        problems.append(f"generate_graph went from {before:.1f} us to {after:.1f} us")
+    return problems
+
+
+def main() -> None:
+    """
+    Entry point for the soak test. Exits with status 1 if anything didn't stay flat.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Plays many games in one process and checks that nothing builds up.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games to play")
+    parser.add_argument("--every", type=int, default=5000, help="games between measurements")
+    parser.add_argument("--agent", choices=list(AGENTS), default="typing", help="the agent that plays")
+    parser.add_argument("--difficulty", type=int, choices=[1, 2, 3], default=1, help="difficulty to play on")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random number generator")
+    args = parser.parse_args()
+
+    soak = Soak(args.every)
+    enable(soak.metrics)
+    print(f"{'Games':>10}{'RSS MB':>10}{'Objects':>10}{'Graph us':>14}{'Win rate':>10}")
+    try:
+        with open(devnull, "w") as out, redirect_stdout(out): # Throws away the logo and menus.
+            game.run(AgentKeyboard(AGENTS[args.agent](args.difficulty), args.games), 0, args.seed, AgentInterface,
+                     on_game_over=soak.record)
+    finally:
+        disable()
+
+    if len(soak.samples) < 2:
+        print("Too few measurements, play more games or measure more often.")
+        return
+    problems = check(soak.samples)
+    for problem in problems:
+        print(problem)
+    print("Everything stayed flat." if not problems else "Something built up.")
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
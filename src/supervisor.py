@@ -0,0 +1,258 @@
+"""
+ICS3U
+Paul Chen
+This file holds the supervisor, which runs the game server on every core. One process can only run Python on
+one core at a time, so the supervisor starts a worker process for each core and listens for players itself.
+Each new connection is handed to the worker with the fewest sessions by sending the socket over a Unix socket,
+and the game stays in that worker until the player leaves. If a worker crashes, only its own players are
+disconnected, and a new worker is started in its place.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import selectors
+import socket
+import threading
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, strftime
+from leaderboard import Leaderboard
+from server import STACK_KB, handle, session_limit
+
+# Workers are started fresh instead of forked, so they don't get copies of the listening socket or of the
+# other workers' channels, and each one sees its channel close when the supervisor goes away.
+SPAWN = multiprocessing.get_context("spawn")
+
+
+class Worker:
+    """Class that holds the supervisor's side of a worker process.
+
+    Attributes:
+        index (int): the worker's number, which stays the same when it is restarted.
+        process (multiprocessing.Process): the process.
+        channel (socket.socket): the Unix socket that connections are sent over. The worker sends a byte back
+            every time a session ends.
+        sessions (int): the number of sessions running in the worker.
+        total (int): the number of sessions handed to the worker since it was started.
+    """
+    def __init__(self, index: int, max_sessions: int, saves=None, leaderboard=None, stack_kb=STACK_KB):
+        """
+        Inits worker class and starts the process.
+        Args
+            index (int): the worker's number.
+            max_sessions (int): the number of games that the worker can run at once.
+            saves (str): the directory that games are saved in, or None to not save games.
+            leaderboard (str): the path to a database to record finished games in, or None to not record them.
+            stack_kb (int): the stack size of each game's thread in KiB.
+        """
+        self.index = index
+        self.channel, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.process = SPAWN.Process(target=work, args=(theirs, max_sessions, saves, leaderboard, stack_kb),
+                                     name=f"worker-{index}", daemon=True)
+        self.process.start()
+        theirs.close()
+        self.sessions = 0
+        self.total = 0
+
+    def hand_over(self, conn: socket.socket) -> bool:
+        """
+        Sends a connection to the worker.
+        Args
+            conn (socket.socket): the player's connection.
+        Returns
+            bool: True if the worker took the connection else False.
+        """
+        try:
+            socket.send_fds(self.channel, [b"c"], [conn.fileno()])
+        except OSError: # The worker has died.
+            return False
+        self.sessions += 1
+        self.total += 1
+        return True
+
+    def stop(self) -> None:
+        """
+        Stops the worker. Its sessions are ended.
+        Args
+            None
+        Returns
+            None
+        """
+        self.channel.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+
+def work(channel: socket.socket, max_sessions: int, saves=None, leaderboard=None, stack_kb=STACK_KB) -> None:
+    """
+    Entry point for a worker process. Runs the games for the connections that the supervisor sends until the
+    supervisor goes away.
+    Args
+        channel (socket.socket): the Unix socket that connections are sent over.
+        max_sessions (int): the number of games that can be played at once.
+        saves (str): the directory that games are saved in, or None to not save games.
+        leaderboard (str): the path to a database to record finished games in, or None to not record them.
+        stack_kb (int): the stack size of each game's thread in KiB.
+    Returns
+        None
+    """
+    if leaderboard:
+        leaderboard = Leaderboard(leaderboard)
+    try:
+        asyncio.run(serve_channel(channel, max_sessions, saves, leaderboard, stack_kb))
+    except KeyboardInterrupt: # The supervisor handles Ctrl-C.
+        pass
+    finally:
+        if leaderboard:
+            leaderboard.close()
+
+
+async def serve_channel(channel: socket.socket, max_sessions: int, saves=None, leaderboard=None,
+                        stack_kb=STACK_KB) -> None:
+    """
+    Plays the game with every connection that arrives on the channel, the same way as `server.serve()`.
+    Args
+        channel (socket.socket): the Unix socket that connections are sent over.
+        max_sessions (int): the number of games that can be played at once.
+        saves (str): the directory that games are saved in, or None to not save games.
+        leaderboard (Leaderboard): where finished games are recorded, or None to not record them.
+        stack_kb (int): the stack size of each game's thread in KiB.
+    Returns
+        None
+    """
+    loop = asyncio.get_running_loop()
+    closed = loop.create_future()
+    threading.stack_size(stack_kb * 1024)
+    executor = ThreadPoolExecutor(max_workers=max_sessions)
+    slots = asyncio.Semaphore(max_sessions)
+    channel.setblocking(False)
+
+    async def session(conn) -> None:
+        reader, writer = await asyncio.open_connection(sock=conn)
+        try:
+            await handle(reader, writer, executor, slots, saves, leaderboard)
+        finally:
+            channel.send(b"-") # Tells the supervisor that the session is over.
+
+    def receive() -> None:
+        try:
+            message, fds, flags, address = socket.recv_fds(channel, 1024, 16)
+        except BlockingIOError:
+            return
+        if not message: # The supervisor has gone away.
+            loop.remove_reader(channel.fileno())
+            closed.set_result(None)
+        for fd in fds:
+            asyncio.ensure_future(session(socket.socket(fileno=fd)))
+
+    loop.add_reader(channel.fileno(), receive)
+    await closed
+
+
+def supervise(host: str, port: int, workers: int, max_sessions: int, saves=None, leaderboard=None,
+              report=10.0, stack_kb=STACK_KB) -> None:
+    """
+    Runs the supervisor forever. Connections are accepted here and handed to the worker with the fewest
+    sessions, dead workers are restarted, and the number of sessions in each worker is printed every so often.
+    Args
+        host (str): the address to listen on.
+        port (int): the port to listen on.
+        workers (int): the number of worker processes.
+        max_sessions (int): the number of games that each worker can run at once.
+        saves (str): the directory that games are saved in, or None to not save games. Any worker can resume
+            any game, since the saves are files.
+        leaderboard (str): the path to a database to record finished games in, or None to not record them.
+        report (float): the number of seconds between reports.
+        stack_kb (int): the stack size of each game's thread in KiB.
+    Returns
+        None
+    """
+    if saves:
+        os.makedirs(saves, exist_ok=True)
+    listener = socket.create_server((host, port), backlog=1024)
+    pool = [Worker(i, max_sessions, saves, leaderboard, stack_kb) for i in range(workers)]
+    restarts = 0
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ, "accept")
+    for worker in pool:
+        selector.register(worker.channel, selectors.EVENT_READ, worker)
+        selector.register(worker.process.sentinel, selectors.EVENT_READ, worker)
+
+    next_report = monotonic() + report
+    try:
+        while True:
+            for key, events in selector.select(max(0.0, next_report - monotonic())):
+                if key.data == "accept":
+                    conn, address = listener.accept()
+                    # Tries the workers from least to most loaded, in case one has just died.
+                    for worker in sorted(pool, key=lambda w: w.sessions):
+                        if worker.hand_over(conn):
+                            break
+                    conn.close() # The worker has its own copy.
+                    continue
+
+                worker = key.data
+                if worker not in pool: # Already restarted through its other file.
+                    continue
+                if key.fileobj is worker.channel:
+                    ended = worker.channel.recv(4096)
+                    if ended:
+                        worker.sessions -= len(ended)
+                        continue
+
+                # The worker has died. Its sessions are gone, but every other worker carries on.
+                selector.unregister(worker.channel)
+                selector.unregister(worker.process.sentinel)
+                worker.stop()
+                print(f"{strftime('%H:%M:%S')} worker {worker.index} exited with code {worker.process.exitcode}, "
+                      f"{worker.sessions} sessions lost, restarting", flush=True)
+                new = Worker(worker.index, max_sessions, saves, leaderboard, stack_kb)
+                pool[pool.index(worker)] = new
+                selector.register(new.channel, selectors.EVENT_READ, new)
+                selector.register(new.process.sentinel, selectors.EVENT_READ, new)
+                restarts += 1
+
+            if monotonic() >= next_report:
+                next_report += report
+                counts = ", ".join(f"{w.index}: {w.sessions} ({w.total} total)" for w in pool)
+                print(f"{strftime('%H:%M:%S')} sessions per worker {{{counts}}}, "
+                      f"{sum(w.sessions for w in pool)} playing, {restarts} restarts", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in pool:
+            worker.stop()
+        listener.close()
+
+
+def main() -> None:
+    """
+    Entry point for the supervisor.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Serves Dungeon Escape over telnet with one worker process per core.")
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--port", type=int, default=2323, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--max-sessions", type=int, default=None,
+                        help="games that each worker can run at once, by default as many as fit in memory")
+    parser.add_argument("--stack-kb", type=int, default=STACK_KB, help="stack size of each game's thread in KiB")
+    parser.add_argument("--saves", metavar="DIR",
+                        help="save games in DIR so players can carry on with a resume code after a disconnect")
+    parser.add_argument("--leaderboard", metavar="FILE", help="record every finished game in this database")
+    parser.add_argument("--report", type=float, default=10.0, help="seconds between reports of the session counts")
+    args = parser.parse_args()
+    # The workers share the memory, so each gets an equal part of it.
+    max_sessions = args.max_sessions if args.max_sessions is not None else \
+        max(1, session_limit(args.stack_kb) // args.workers)
+    supervise(args.host, args.port, args.workers, max_sessions, args.saves, args.leaderboard, args.report,
+              args.stack_kb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+ICS3U
+Paul Chen
+This file holds the telemetry writer, which saves every event of every game to a JSON Lines file for offline
+analysis: the rooms the player goes through, the hits and damage of each battle round, the witch's potions and
+how each game ended. Games only put their events in a queue, and a background thread writes them in batches.
+If the disk can't keep up and the queue fills, new events are dropped and counted instead of making the games
+wait. The file is rotated when it gets too big, and the old files can be compressed.
+"""
+
+import gzip
+import json
+import shutil
+from argparse import ArgumentParser
+from contextlib import suppress
+from itertools import count
+from os import path, remove, rename
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic, time
+from events import GameOver, RoomEntered
+
+
+class Telemetry:
+    """Class that writes game events to a JSON Lines file, one object per line. Every line has the game's number,
+    the seconds since the game started and the name of the event, along with the event's attributes. Rooms and
+    enemies are written as their names. The time comes from this process's own clock, not the interface's, since
+    reading the interface's clock would be written into input logs and change how they replay.
+
+    Attributes:
+        filename (str): the path to the file being written. Old files are renamed to `filename.1`,
+            `filename.2` and so on, with `.gz` on the end if they are compressed.
+        max_bytes (int): the size that the file is rotated at.
+        compress (bool): True if old files are compressed with gzip else False.
+        batch (int): the most events written at once.
+        interval (float): the longest time in seconds that an event waits before being written.
+        file (BufferedWriter): the file being written, or None if it couldn't be opened again after a rotation.
+        queue (Queue): the events waiting to be written. None marks the end.
+        closed (bool): True once `close()` has been called else False.
+        writer (Thread): the thread that writes the events.
+        games (itertools.count): where the games' numbers come from.
+        written (int): the number of events written.
+        dropped (int): the number of events dropped because the queue was full or the file couldn't be written.
+        lock (Lock): stops two games from counting a dropped event at the same time.
+    """
+    def __init__(self, filename: str, max_bytes=64 * 2 ** 20, compress=False, batch=1000, interval=1.0,
+                 queue_size=100000):
+        """
+        Inits telemetry class, opens the file and starts the background thread.
+        Args
+            filename (str): the path to the file. Events are added to the end if it exists. An `OSError` is raised
+                here if it can't be opened.
+            max_bytes (int): the size that the file is rotated at.
+            compress (bool): True to compress old files with gzip else False.
+            batch (int): the most events written at once.
+            interval (float): the longest time in seconds that an event waits before being written.
+            queue_size (int): the most events that can wait to be written before new ones are dropped.
+        """
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.batch = batch
+        self.interval = interval
+        self.file = open(filename, "ab")
+        self.queue = Queue(queue_size)
+        self.closed = False
+        self.games = count(1)
+        self.written = 0
+        self.dropped = 0
+        self.lock = Lock()
+        self.writer = Thread(target=self.write, name="telemetry", daemon=True)
+        self.writer.start()
+
+    def watch(self, player) -> None:
+        """
+        Subscribes to a game's events, so they are all written.
+        Args
+            player (Player): the player of the game, after the dungeon has been set up.
+        Returns
+            None
+        """
+        game = next(self.games)
+        start = monotonic()
+        room = None # The room the player is in.
+        self.put({"game": game, "t": 0.0, "event": "GameStarted", "time": round(time(), 3),
+                  "difficulty": player.difficulty // 4})
+
+        def record(event) -> None:
+            nonlocal room
+            fields = {"game": game, "t": round(monotonic() - start, 3), "event": type(event).__name__}
+            for name in type(event).__slots__:
+                value = getattr(event, name)
+                fields[name] = getattr(value, "name", value)
+            if isinstance(event, RoomEntered):
+                fields["from"] = room
+                room = fields["location"]
+            elif isinstance(event, GameOver):
+                fields.update(hp=player.hp, atk=player.atk, battles=player.battles, hits=player.hits)
+            self.put(fields)
+
+        player.events.subscribe(record)
+
+    def put(self, fields: dict) -> None:
+        """
+        Queues an event to be written, or drops it if the queue is full.
+        Args
+            fields (dict): the event's fields.
+        Returns
+            None
+        """
+        try:
+            self.queue.put_nowait(fields)
+        except Full:
+            with self.lock:
+                self.dropped += 1
+
+    def write(self) -> None:
+        """
+        Writes queued events until `close()` is called. This runs in the background thread. Events that can't be
+        written, because the disk is full or a rotation failed, are counted as dropped.
+        Args
+            None
+        Returns
+            None
+        """
+        reported = 0 # The number of dropped events that have been written to the file.
+        done = False
+        while not done:
+            # Waits a little for more events, so they are written together.
+            records = []
+            deadline = monotonic() + self.interval
+            while len(records) < self.batch:
+                try:
+                    record = self.queue.get(timeout=max(0.0, deadline - monotonic()))
+                except Empty:
+                    done = self.closed
+                    break
+                if record is None:
+                    done = True
+                    break
+                records.append(record)
+
+            # Leaves a note where events were dropped, so gaps in the games can be told apart from bugs.
+            dropped = self.dropped - reported
+            lines = list(records)
+            if dropped:
+                lines.append({"event": "Dropped", "time": round(time(), 3), "events": dropped})
+            if not lines:
+                continue
+            data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines).encode()
+            try:
+                self.append(data)
+            except OSError:
+                self.close_file() # Opened again for the next batch.
+                with self.lock:
+                    self.dropped += len(records)
+                continue
+            self.written += len(records)
+            reported += dropped
+        self.close_file()
+
+    def append(self, data: bytes) -> None:
+        """
+        Adds data to the end of the file, rotating it first if the data would make it too big.
+        Args
+            data (bytes): the data.
+        Returns
+            None
+        """
+        if self.file is None: # Opening it failed last time.
+            self.file = open(self.filename, "ab")
+        if self.file.tell() and self.file.tell() + len(data) > self.max_bytes:
+            self.close_file()
+            self.rotate()
+            self.file = open(self.filename, "ab")
+        self.file.write(data)
+        self.file.flush()
+
+    def close_file(self) -> None:
+        """
+        Closes the file, throwing away anything that couldn't be written to it.
+        Args
+            None
+        Returns
+            None
+        """
+        if self.file is not None:
+            with suppress(OSError):
+                self.file.close()
+            self.file = None
+
+    def rotate(self) -> None:
+        """
+        Renames the file to the first unused old file name, compressing it if `compress` is True.
+        Args
+            None
+        Returns
+            None
+        """
+        number = 1
+        while path.exists(f"{self.filename}.{number}") or path.exists(f"{self.filename}.{number}.gz"):
+            number += 1
+        old = f"{self.filename}.{number}"
+        rename(self.filename, old)
+        if self.compress:
+            with open(old, "rb") as src, gzip.open(old + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            remove(old)
+
+    def close(self) -> None:
+        """
+        Writes every queued event and stops the background thread. This never waits for room in the queue, so it
+        can't get stuck behind a writer that has stopped.
+        Args
+            None
+        Returns
+            None
+        """
+        self.closed = True
+        try:
+            self.queue.put_nowait(None) # Wakes the writer up.
+        except Full: # The writer stops when it finds the queue empty instead.
+            pass
+        self.writer.join()
+
+
+def read(filename: str) -> list:
+    """
+    Reads the events in a telemetry file, which can be compressed.
+    Args
+        filename (str): the path to the file.
+    Returns
+        list[dict]: the events, in the order they were written.
+    """
+    with (gzip.open if filename.endswith(".gz") else open)(filename, "rt") as file:
+        return [json.loads(line) for line in file]
+
+
+def main() -> None:
+    """
+    Entry point for summarising telemetry files.
+    Args
+        None
+    Returns
+        None
+    """
+    parser = ArgumentParser(description="Summarises the events in telemetry files.")
+    parser.add_argument("files", nargs="+", help="telemetry files, which can be compressed")
+    args = parser.parse_args()
+
+    counts = {}
+    for filename in args.files:
+        for record in read(filename):
+            n = record["events"] if record["event"] == "Dropped" else 1 # Dropped notes count several events.
+            counts[record["event"]] = counts.get(record["event"], 0) + n
+    for event, n in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"{event:<16}{n:>10}")
+
+
+if __name__ == "__main__":
+    main()
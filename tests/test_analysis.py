@@ -0,0 +1,84 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the battle solver. Its exact chances are checked against battles played many times
+through `Location.battle` with a seeded random number generator.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+from analysis import MAX_HP, battle, enemy_stacks
+from content import CONTENT
+from locations import World
+from simulate import RandomWalk, SimPlayer
+
+# The chance of each number of hits in one attack, the same for every sequence length.
+HITS = [0.2, 0.3, 0.5]
+
+
+def sample_hits(seq_len: int, tl: float) -> int:
+    """
+    Picks a number of hits from `HITS`.
+    Args
+        seq_len (int): the length of the random sequence.
+        tl (float): the time limit for the attack.
+    Returns
+        int: the number of hits.
+    """
+    return random.choices(range(len(HITS)), HITS)[0]
+
+
+class TestBattle(unittest.TestCase):
+    """Compares the solver with played battles."""
+
+    def played(self, enemies: list, atk: int, games: int) -> np.ndarray:
+        """
+        Plays a battle many times and counts the HP left.
+        Args
+            enemies (list[EnemyType]): the enemies in the room.
+            atk (int): the player's ATK.
+            games (int): the number of battles to play.
+        Returns
+            np.ndarray: the fraction of battles that left each amount of HP.
+        """
+        counts = np.zeros(MAX_HP + 1)
+        for i in range(games):
+            player = SimPlayer(1, sample_hits, RandomWalk())
+            player.atk = atk
+            room = World(player)["Hall"]
+            room.enemies = list(enemies)
+            room.battle()
+            counts[player.hp] += 1
+        return counts / games
+
+    def test_battle(self):
+        random.seed(0)
+        hits = {seq_len: np.array(HITS) for seq_len in range(1, 6)}
+        for enemies, atk in [([CONTENT.enemy("Guard")], 6), ([CONTENT.enemy("Goblin"), CONTENT.enemy("Ogre")], 8)]:
+            start = np.zeros(MAX_HP + 1)
+            start[MAX_HP] = 1.0
+            exact = battle({atk: start}, enemies, hits)[atk]
+            self.assertAlmostEqual(exact.sum(), 1.0)
+            played = self.played(enemies, atk, 4000)
+
+            # With 4000 battles, each chance is within about 0.02 of the exact one.
+            self.assertLess(abs(exact - played).max(), 0.025)
+            self.assertLess(abs((exact * np.arange(MAX_HP + 1)).sum() - (played * np.arange(MAX_HP + 1)).sum()), 1.0)
+
+    def test_enemy_stacks(self):
+        for room_type in CONTENT.rooms:
+            for difficulty in (4, 8, 12):
+                stacks = enemy_stacks(room_type, difficulty)
+                self.assertAlmostEqual(sum(chance for chance, stack in stacks), 1.0)
+                for chance, stack in stacks:
+                    self.assertEqual(stack[:len(room_type.enemies)], room_type.enemies)
+
+
+if __name__ == "__main__":
+    unittest.main()
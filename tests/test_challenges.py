@@ -0,0 +1,52 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the challenge pools, which must hand out the same sequences for the same seed
+whether they are refilled in the background or not.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from challenges import ChallengeSource
+
+
+class TestChallenges(unittest.TestCase):
+    """Takes sequences from seeded pools."""
+
+    def test_seeded(self):
+        # Enough sequences to refill the pools many times.
+        background = ChallengeSource(7, pool_size=64)
+        foreground = ChallengeSource(7, pool_size=64, background=False)
+        first = [background.next(3) for i in range(1000)]
+        self.assertEqual(first, [foreground.next(3) for i in range(1000)])
+        self.assertNotEqual(first, [ChallengeSource(8, pool_size=64).next(3) for i in range(1000)])
+
+    def test_difficulties(self):
+        # Each difficulty has its own generator, so taking sequences for another difficulty doesn't change them.
+        alone = ChallengeSource(1, pool_size=16, background=False)
+        mixed = ChallengeSource(1, pool_size=16, background=False)
+        expected = [alone.next(2) for i in range(100)]
+        got = []
+        for i in range(100):
+            mixed.next(5)
+            got.append(mixed.next(2))
+        self.assertEqual(got, expected)
+
+    def test_letters(self):
+        source = ChallengeSource(0, alphabet="ab", alphabets={2: "xyz"}, lengths={2: 6}, pool_size=8)
+        for i in range(50):
+            seq = source.next(1)
+            self.assertEqual(len(seq), 1)
+            self.assertLessEqual(set(seq), set("ab"))
+            seq = source.next(2)
+            self.assertEqual(len(seq), 6)
+            self.assertLessEqual(set(seq), set("xyz"))
+            self.assertEqual(len(source.next(4)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for loading the content, which turns the rooms and enemies in a JSON file into records
+with integer ids, and for the enemy stats that are worked out once when it is loaded.
+"""
+
+import json
+import os
+import random
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from content import CONTENT, Content, load_content
+from interface import Interface
+from keyboard import Keyboard
+from locations import BEHAVIOURS, World, generate_room_enemies
+from player import Player
+
+# A small content file with one room of each kind that the tests need.
+DATA = {
+    "enemies": [
+        {"key": "Rat", "name": "Giant Rat", "hp": 10, "atk": 2, "num_hits": [1, 2]},
+        {"key": "Bat", "name": "Bat", "hp": 5, "atk": 1, "num_hits": [2, 2]},
+    ],
+    "rooms": [
+        {"key": "Cellar", "name": "Cellar", "behaviour": "Hall",
+         "enemies": ["Rat"], "possible_enemies": ["Rat", "Bat"]},
+        {"key": "Tower", "name": "Tower", "behaviour": "Location", "description": "A tall tower.", "unique": True,
+         "enemies": [], "possible_enemies": []},
+    ],
+}
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+class TestContent(unittest.TestCase):
+    """Loads content files."""
+
+    def test_load(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "content.json")
+            with open(filename, "w", encoding="utf-8") as file:
+                json.dump(DATA, file)
+            content = load_content(filename)
+
+        self.assertEqual([enemy.key for enemy in content.enemies], ["Rat", "Bat"])
+        self.assertEqual(content.enemy_ids, {"Rat": 0, "Bat": 1})
+        self.assertEqual(content.room_ids, {"Cellar": 0, "Tower": 1})
+        rat = content.enemy("Rat")
+        self.assertEqual((rat.id, rat.name, rat.hp, rat.atk, rat.num_hits), (0, "Giant Rat", 10, 2, (1, 2)))
+
+        # The rooms point at the same records as the enemy list, and the optional fields have defaults.
+        cellar, tower = content.room("Cellar"), content.room("Tower")
+        self.assertIs(cellar.enemies[0], rat)
+        self.assertEqual(cellar.possible_enemies, (rat, content.enemy("Bat")))
+        self.assertEqual((cellar.description, cellar.unique), ("", False))
+        self.assertEqual((tower.id, tower.description, tower.unique), (1, "A tall tower.", True))
+
+    def test_unknown_enemy(self):
+        data = {"enemies": [], "rooms": [dict(DATA["rooms"][0])]}
+        with self.assertRaises(KeyError):
+            Content(data)
+
+    def test_records(self):
+        # The records have slots, so they don't carry a dictionary each.
+        for record in [CONTENT.enemies[0], CONTENT.rooms[0]]:
+            self.assertFalse(hasattr(record, "__dict__"))
+            with self.assertRaises(AttributeError):
+                record.colour = "red"
+
+    def test_game_content(self):
+        for i, room in enumerate(CONTENT.rooms):
+            self.assertEqual(room.id, i)
+            self.assertIn(room.behaviour, BEHAVIOURS)
+            for enemy in room.enemies + room.possible_enemies:
+                self.assertIs(CONTENT.enemies[enemy.id], enemy)
+        for key in ["Entrance", "Stairway", "Hall"]:
+            self.assertEqual(CONTENT.room(key).key, key)
+
+
+class TestEnemyTable(unittest.TestCase):
+    """Checks the enemy stats against the formula and uses them to fill rooms."""
+
+    def test_difficulty(self):
+        for enemy in CONTENT.enemies:
+            expected = max(1, min(5, int((enemy.hp + enemy.atk * (enemy.num_hits[0] + enemy.num_hits[1])) // 15)))
+            self.assertEqual(enemy.difficulty, expected, enemy.key)
+        self.assertEqual(CONTENT.enemy("Ghost").difficulty, 1) # Clamped from below.
+        self.assertEqual(CONTENT.enemy("Dragon").difficulty, 5) # Clamped from above.
+
+    def test_enemy(self):
+        random.seed(0)
+        for enemy_type in CONTENT.enemies:
+            enemy = enemy_type()
+            self.assertIs(enemy.type, enemy_type)
+            self.assertEqual(enemy.hp, enemy_type.hp)
+            self.assertFalse(hasattr(enemy, "__dict__"))
+            for i in range(50):
+                self.assertTrue(enemy_type.num_hits[0] <= enemy.attack() <= enemy_type.num_hits[1])
+
+    def test_room_enemies(self):
+        random.seed(0)
+        world = World(Player(1, QuietInterface(Keyboard())))
+        room = world["Hall"]
+        for difficulty in (4, 8, 12, 100):
+            for i in range(50):
+                room.enemies = []
+                generate_room_enemies(room, difficulty)
+                total = sum(enemy.difficulty for enemy in room.enemies)
+                self.assertTrue(total >= difficulty or len(room.enemies) == 4)
+                # The last enemy is the one that took the room over the difficulty.
+                self.assertLess(total - room.enemies[-1].difficulty, difficulty)
+                self.assertTrue(set(room.enemies) <= set(room.type.possible_enemies))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the event bus and the events that the rooms publish during a game.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from content import CONTENT
+from events import EnemyAppeared, EnemyHit, Event, EventBus, GameOver, PlayerHit, RoomEntered
+from interface import Interface
+from keyboard import Keyboard
+from main import play
+from player import Player
+from simulate import RandomWalk, SimPlayer, TypingModel
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+class Counted(Event):
+    """Event that counts how many times it has been formatted.
+
+    Attributes:
+        formatted (int): the number of calls to `messages()`.
+    """
+    __slots__ = ("formatted",)
+
+    def __init__(self):
+        """
+        Inits counted class.
+        """
+        self.formatted = 0
+
+    def messages(self) -> tuple:
+        self.formatted += 1
+        return ("counted",)
+
+
+class TestEventBus(unittest.TestCase):
+    """Subscribes to a bus and publishes events on it."""
+
+    def test_subscribe(self):
+        bus = EventBus()
+        seen = []
+        bus.subscribe(lambda event: seen.append(("all", type(event))))
+        bus.subscribe(lambda event: seen.append(("over", event.won)), GameOver)
+        bus.subscribe(lambda event: seen.append(("hit", type(event))), EnemyHit, PlayerHit)
+        bus.publish(GameOver(True))
+        bus.publish(PlayerHit(CONTENT.enemy("Guard"), 2, 10))
+        bus.publish(RoomEntered(None))
+        self.assertEqual(seen, [("all", GameOver), ("over", True), ("all", PlayerHit), ("hit", PlayerHit),
+                                ("all", RoomEntered)])
+
+    def test_unsubscribe(self):
+        bus = EventBus()
+        seen = []
+        bus.subscribe(seen.append)
+        bus.subscribe(seen.append, GameOver)
+        bus.unsubscribe(seen.append)
+        bus.publish(GameOver(False))
+        self.assertEqual(seen, [])
+
+    def test_lazy(self):
+        # Nothing is formatted until something shows the event.
+        event = Counted()
+        EventBus().publish(event)
+        self.assertEqual(event.formatted, 0)
+        io = QuietInterface(Keyboard())
+        io.default_ignore = 0
+        bus = EventBus()
+        io.attach(bus)
+        bus.publish(event)
+        self.assertEqual(event.formatted, 1)
+        self.assertEqual(io.history.tail(1), ["counted"])
+
+    def test_messages(self):
+        self.assertEqual(EnemyAppeared(CONTENT.enemy("Ogre"), 40).messages()[0].split("\n")[0],
+                         "An Ogre walks up to you...")
+        self.assertEqual(EnemyHit(CONTENT.enemy("Guard"), 3, 18, 6).messages(),
+                         ("You have hit 3 times dealing 18 damage.", "The Guard is left with 6 HP."))
+        self.assertEqual(len(EnemyHit(CONTENT.enemy("Guard"), 4, 24, 0).messages()), 3)
+
+
+class TestGameEvents(unittest.TestCase):
+    """Plays games and checks the events that were published."""
+
+    def test_game(self):
+        random.seed(0)
+        for i in range(30):
+            player = SimPlayer(1 + i % 3, TypingModel(), RandomWalk())
+            events = []
+            player.events.subscribe(events.append)
+            play(player)
+
+            self.assertIsInstance(events[0], RoomEntered)
+            self.assertEqual(events[0].location.type.key, "Entrance")
+            self.assertIsInstance(events[-1], GameOver)
+            self.assertEqual(sum(isinstance(event, GameOver) for event in events), 1)
+            self.assertEqual(events[-1].won, player.won)
+            self.assertEqual(sum(event.hits for event in events if isinstance(event, EnemyHit)), player.hits)
+            # The HP in each hit follows on from the enemy's HP when it appeared.
+            for event in events:
+                if isinstance(event, EnemyAppeared):
+                    enemy_hp = event.hp
+                if isinstance(event, EnemyHit):
+                    enemy_hp = max(0, enemy_hp - event.damage)
+                    self.assertEqual(event.hp, enemy_hp)
+                if isinstance(event, PlayerHit):
+                    self.assertEqual(event.damage, event.hits * event.enemy.atk)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the history and its scrollback file, which every game in a session shares.
+"""
+
+import os
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from history import History, Scrollback
+
+
+class TestHistory(unittest.TestCase):
+    """Fills histories past what they keep in memory."""
+
+    def test_shared_scrollback(self):
+        with TemporaryDirectory() as directory:
+            scrollback = Scrollback(os.path.join(directory, "scrollback.txt"), size=64)
+            first = History(capacity=5, scrollback=scrollback)
+            for i in range(100):
+                first.append(f"first {i}")
+            self.assertEqual(len(first), 100)
+            self.assertEqual(first.tail(3, skip=95), ["first 2", "first 3", "first 4"])
+
+            # The next game starts with an empty history, but keeps using the same file.
+            second = History(capacity=5, scrollback=scrollback)
+            self.assertEqual(len(second), 0)
+            for i in range(10):
+                second.append(f"second {i}")
+            self.assertEqual(second.tail(10), [f"second {i}" for i in range(10)])
+            self.assertEqual([second.pop() for i in range(10)], [f"second {i}" for i in reversed(range(10))])
+            scrollback.close()
+            self.assertTrue(scrollback.file.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
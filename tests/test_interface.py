@@ -0,0 +1,82 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for drawing the screen, which has to fit in the player's terminal.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from interface import Interface
+from keyboard import Keyboard
+from minimap import beside
+
+
+class ScreenInterface(Interface):
+    """Interface that keeps what it writes instead of drawing it. Inherits from `Interface`.
+
+    Attributes:
+        written (list[str]): everything written.
+    """
+    def __init__(self, width: int, height: int):
+        """
+        Inits screen interface class.
+        Args
+            width (int): the width of the terminal.
+            height (int): the height of the terminal.
+        """
+        self.written = []
+        super().__init__(Keyboard())
+        self.width, self.height = width, height
+
+    def write(self, text) -> None:
+        self.written.append(text)
+
+
+class TestRender(unittest.TestCase):
+    """Draws frames in terminals of different sizes."""
+
+    def test_fits(self):
+        io = ScreenInterface(80, 24)
+        io.set_room_info("\n".join(f"info {i}" for i in range(5)))
+        for i in range(3):
+            io.push(f"event {i}", delay=False)
+        self.assertEqual(io.frame[0], "info 0")
+        self.assertEqual(io.frame[-1], "event 2")
+        self.assertTrue(io.written[-1].endswith(f"\033[{len(io.frame) + 1};1H\033[J"))
+
+    def test_short_terminal(self):
+        io = ScreenInterface(80, 12)
+        io.set_room_info("\n".join(f"info {i}" for i in range(20)))
+        for i in range(10):
+            io.push(f"event {i}", delay=False)
+
+        # One row is left for the prompt, and the newest events are kept.
+        self.assertEqual(len(io.frame), 11)
+        self.assertEqual(io.frame[-10:], [f"event {i}" for i in range(10)])
+        self.assertTrue(io.written[-1].endswith("\033[12;1H\033[J"))
+
+    def test_tiny_terminal(self):
+        io = ScreenInterface(80, 0)
+        io.push("event", delay=False)
+        self.assertEqual(io.frame, ["event"])
+
+
+class TestBeside(unittest.TestCase):
+    """Adds a map to some room info."""
+
+    def test_beside(self):
+        self.assertEqual(beside("ab\ncd", ["Map:", "x"], 20, 5), "ab    Map:\ncd    x")
+        self.assertEqual(beside("ab\ncd", ["Map:", "x", "y"], 20, 2), "ab\ncd")
+
+    def test_below(self):
+        self.assertEqual(beside("abcdef\n", ["Map:", "x"], 10, 5), "abcdef\n\nMap:\nx\n")
+        self.assertEqual(beside("abcdef\n", ["Map:", "x"], 10, 4), "abcdef\n")
+        self.assertEqual(beside("abcdefghijklmnop\n", ["Map:", "x"], 10, 5), "abcdefghijklmnop\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
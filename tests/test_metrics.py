@@ -0,0 +1,77 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the metrics, checking that measuring doesn't change how the game reads input.
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import locations
+import main
+from interface import Interface
+from keyboard import Keyboard
+from metrics import Metrics, disable, enable
+from player import Player
+
+
+class LineKeyboard(Keyboard):
+    """Keyboard that types the same line every time, straight away."""
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        return "abc", False
+
+    def pause(self, tm) -> None:
+        pass
+
+
+class TestMetrics(unittest.TestCase):
+    """Reads input with the metrics turned on."""
+
+    def tearDown(self):
+        disable()
+
+    def test_streaming_echo(self):
+        metrics = Metrics()
+        enable(metrics)
+        with open(os.devnull, "w") as out, redirect_stdout(out):
+            io = Interface(LineKeyboard(), streaming=True)
+            self.assertEqual(io.timed_input(1, delay=False, target="abc"), ("abc", False))
+        echo = [h for h in metrics.snapshot()["histograms"] if h["name"] == "echo_seconds"]
+        self.assertEqual(echo[0]["count"], 1)
+
+    def test_echo(self):
+        metrics = Metrics()
+        enable(metrics)
+        with open(os.devnull, "w") as out, redirect_stdout(out):
+            io = Interface(LineKeyboard())
+            self.assertEqual(io.timed_input(1, delay=False, target="abc"), ("abc", False))
+            self.assertEqual(io.timed_input(1, delay=False), ("abc", False))
+        self.assertEqual(metrics.histogram("echo_seconds").count, 2)
+
+    def test_generate(self):
+        generate_graph = main.generate_graph
+        metrics = Metrics()
+        enable(metrics)
+
+        # `main` imported the function by name, so it is timed there too.
+        self.assertIsNot(main.generate_graph, generate_graph)
+        with open(os.devnull, "w") as out, redirect_stdout(out):
+            world = locations.World(Player(1, Interface(LineKeyboard())))
+        for i in range(3):
+            main.generate_graph(world)
+        main.generate_enemies(world, 4)
+        self.assertEqual(metrics.histogram("generate_seconds", step="graph").count, 3)
+        self.assertEqual(metrics.histogram("generate_seconds", step="enemies").count, 1)
+
+        disable()
+        self.assertIs(main.generate_graph, generate_graph)
+        self.assertIs(locations.generate_graph, generate_graph)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the route planner. Its distances and steps are checked against a breadth first
+search, on random trees and on the dungeons that the hints are given in.
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import deque
+from itertools import permutations
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from interface import Interface
+from keyboard import Keyboard
+from locations import decode_prufer
+from planner import GOALS, Planner, plan
+from player import Player
+from procedural import ProceduralWorld
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+def bfs(size: int, neighbours, start: int) -> list:
+    """
+    Finds the distance from one room to every room with a breadth first search.
+    Args
+        size (int): the number of rooms.
+        neighbours (callable): function that takes a room and returns the rooms next to it.
+        start (int): the room to start from.
+    Returns
+        list[int]: the distance to each room, or -1 if it can't be reached.
+    """
+    dist = [-1] * size
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        room = queue.popleft()
+        for nxt in neighbours(room):
+            if dist[nxt] == -1:
+                dist[nxt] = dist[room] + 1
+                queue.append(nxt)
+    return dist
+
+
+def random_tree(size: int, rng: random.Random) -> list:
+    """
+    Makes a random tree.
+    Args
+        size (int): the number of rooms.
+        rng (Random): the random number generator.
+    Returns
+        list[list[int]]: the rooms next to each room.
+    """
+    adjacency = [[] for i in range(size)]
+    for room, parent in enumerate(decode_prufer([rng.randrange(size) for i in range(size - 2)], size)):
+        if parent != -1:
+            adjacency[room].append(parent)
+            adjacency[parent].append(room)
+    for rooms in adjacency: # So the walk doesn't always see the rooms in the order they were numbered.
+        rng.shuffle(rooms)
+    return adjacency
+
+
+class TestPlanner(unittest.TestCase):
+    """Compares the planner with breadth first searches."""
+
+    def check(self, adjacency: list, root: int, block: int, pairs) -> None:
+        """
+        Checks the distance and the first step between pairs of rooms.
+        Args
+            adjacency (list[list[int]]): the rooms next to each room.
+            root (int): the room that the tree hangs from.
+            block (int): the number of steps of the tour in each block.
+            pairs (iterable[tuple[int, int]]): the pairs of rooms.
+        Returns
+            None
+        """
+        size = len(adjacency)
+        planner = Planner(size, adjacency.__getitem__, root, block)
+        dists = {}
+        for u, v in pairs:
+            if v not in dists:
+                dists[v] = bfs(size, adjacency.__getitem__, v)
+            self.assertEqual(planner.distance(u, v), dists[v][u], (u, v))
+            if u != v:
+                nxt = planner.step(u, v, adjacency.__getitem__)
+                self.assertIn(nxt, adjacency[u])
+                self.assertEqual(dists[v][nxt], dists[v][u] - 1, (u, v))
+
+    def test_small(self):
+        rng = random.Random(0)
+        for size in range(2, 30):
+            adjacency = random_tree(size, rng)
+            # Small blocks, so queries use partial blocks and the sparse table.
+            self.check(adjacency, rng.randrange(size), 3, [(u, v) for u in range(size) for v in range(size)])
+
+    def test_large(self):
+        rng = random.Random(1)
+        size = 5000
+        adjacency = random_tree(size, rng)
+        targets = [rng.randrange(size) for i in range(5)]
+        self.check(adjacency, 0, 64, [(rng.randrange(size), v) for v in targets for i in range(200)])
+
+    def test_path(self):
+        # A path is as deep as a tree can be, which the walk must handle without recursion.
+        size = 20000
+        adjacency = [[i - 1, i + 1] for i in range(size)]
+        adjacency[0], adjacency[-1] = [1], [size - 2]
+        self.check(adjacency, 0, 64, [(0, size - 1), (size - 1, 0), (123, 17000), (size // 2, size // 2)])
+
+
+class TestHints(unittest.TestCase):
+    """Follows the hints through procedurally generated dungeons."""
+
+    def test_follow(self):
+        random.seed(2)
+        for i in range(20):
+            world = ProceduralWorld(Player(1, QuietInterface(Keyboard())), 200)
+
+            # The hints treat the dungeon as a tree, so the entrance can be reached back through the stairway.
+            adjacency = [list(world.neighbours(room)) for room in range(world.size)]
+            adjacency[1].append(0)
+            dists = {room: bfs(world.size, adjacency.__getitem__, room)
+                     for room in [world.find(key) for key in GOALS.values()] + [1]}
+            goals = [world.find(key) for key in GOALS.values()]
+            here = world.find("Hall")
+            best = min(dists[order[0]][here] + dists[order[0]][order[1]] + dists[order[1]][1] + 1
+                       for order in permutations(goals))
+
+            # Following every hint takes the player out in as many moves as the first hint says.
+            location = world["Hall"]
+            moves, nxt = plan(world, location)
+            self.assertEqual(moves, best)
+            while location is not world["Entrance"]:
+                self.assertIn(world.index(nxt), adjacency[world.index(location)])
+                location = nxt
+                for item, key in GOALS.items():
+                    if world.index(location) == world.find(key) and item not in world.player.items:
+                        world.player.items.append(item)
+                if location is not world["Entrance"]:
+                    left, nxt = plan(world, location)
+                    self.assertEqual(left, moves - 1)
+                    moves = left
+                else:
+                    self.assertEqual(moves, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
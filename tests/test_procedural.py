@@ -0,0 +1,127 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for making dungeons from Prufer sequences, both the normal dungeon and the large
+procedurally generated ones that keep their rooms in flat arrays.
+"""
+
+import heapq
+import os
+import sys
+import unittest
+from array import array
+from random import Random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from content import CONTENT
+from interface import Interface
+from keyboard import Keyboard
+from locations import decode_prufer
+from player import Player
+from procedural import ProceduralWorld, compact_adjacency
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+def reference_decode(prufer: list, n: int) -> list:
+    """
+    Decodes a Prufer sequence the slow way, finding the smallest leaf with a heap at every step.
+    Args
+        prufer (list[int]): the Prufer sequence.
+        n (int): the number of vertices in the tree.
+    Returns
+        list[int]: the parent of each vertex when the tree is rooted at vertex n - 1. The root's parent is -1.
+    """
+    parent = [-1] * n
+    degree = [1] * n
+    for v in prufer:
+        degree[v] += 1
+    leaves = [v for v in range(n) if degree[v] == 1]
+    heapq.heapify(leaves)
+    for v in prufer:
+        leaf = heapq.heappop(leaves)
+        parent[leaf] = v
+        degree[v] -= 1
+        if degree[v] == 1:
+            heapq.heappush(leaves, v)
+    if n >= 2:
+        parent[heapq.heappop(leaves)] = n - 1
+    return parent
+
+
+class TestPrufer(unittest.TestCase):
+    """Decodes Prufer sequences and checks them against the slow decoder."""
+
+    def test_small(self):
+        self.assertEqual(list(decode_prufer([], 1)), [-1])
+        self.assertEqual(list(decode_prufer([], 2)), [1, -1])
+        self.assertEqual(list(decode_prufer([3, 3, 3], 5)), [3, 3, 3, 4, -1])
+
+    def test_reference(self):
+        rng = Random(0)
+        for n in list(range(3, 40)) * 20 + [1000, 5000]:
+            prufer = [rng.randrange(n) for i in range(n - 2)]
+            self.assertEqual(list(decode_prufer(prufer, n)), reference_decode(prufer, n), prufer)
+
+    def test_path(self):
+        # Every vertex but the ends appears once, so each leaf comes from below the pointer.
+        n = 50
+        prufer = list(range(n - 2, 0, -1))
+        self.assertEqual(list(decode_prufer(prufer, n)), reference_decode(prufer, n))
+
+
+class TestProcedural(unittest.TestCase):
+    """Makes large dungeons and checks their shape."""
+
+    def test_compact_adjacency(self):
+        rng = Random(1)
+        size = 30
+        us = array("i", [rng.randrange(size) for i in range(200)])
+        vs = array("i", [rng.randrange(size) for i in range(200)])
+        offsets, targets = compact_adjacency(size, us, vs)
+        self.assertEqual(len(offsets), size + 1)
+        for room in range(size):
+            expected = [v for u, v in zip(us, vs) if u == room]
+            self.assertEqual(list(targets[offsets[room]:offsets[room + 1]]), expected)
+
+    def test_world(self):
+        for size in (20, 500):
+            player = Player(1, QuietInterface(Keyboard()))
+            world = ProceduralWorld(player, size)
+            self.assertEqual(len(world.kinds), size)
+            self.assertEqual(list(world.neighbours(0)), [1])
+            self.assertEqual(list(world.neighbours(1)), [2])
+
+            # Rooms 2 and up are a tree, so every edge goes both ways and every room can be reached from the hall.
+            edges = sum(len(world.neighbours(room)) for room in range(2, size))
+            self.assertEqual(edges, 2 * (size - 3) + 1) # The hall also leads back to the stairway.
+            seen, stack = {2}, [2]
+            while stack:
+                for nxt in world.neighbours(stack.pop()):
+                    if nxt > 1 and nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            self.assertEqual(len(seen), size - 2)
+            for room in range(2, size):
+                for nxt in world.neighbours(room):
+                    if nxt > 1:
+                        self.assertIn(room, world.neighbours(nxt))
+
+            # Each unique room appears once.
+            for room_type in CONTENT.rooms:
+                if room_type.unique:
+                    self.assertEqual(world.kinds.count(room_type.id), 1, room_type.key)
+
+    def test_too_small(self):
+        with self.assertRaises(ValueError):
+            ProceduralWorld(Player(1, QuietInterface(Keyboard())), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
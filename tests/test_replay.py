@@ -0,0 +1,201 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for recording and replaying games, and for saving and resuming them. A scripted
+keyboard plays whole sessions through `main.run()` with a fake clock, the same way a person at the terminal
+would, so anything that reads the keyboard or the clock differently when recording and replaying is caught.
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from random import Random
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inputlog import HEADER, MAGIC, InputLog, RecordingKeyboard, ReplayError, read_log
+from interface import Interface
+from keyboard import Keyboard
+from locations import World, generate_enemies, generate_graph
+from main import run
+from player import Player
+from replay import replay
+from save import load_game, save_game, write_save
+from telemetry import Telemetry, read
+
+
+class ScriptKeyboard(Keyboard):
+    """Keyboard that plays one game on easy and quits. It picks rooms at random, never drinks the potion and
+    never types anything in battles, so the game is lost quickly. Time only passes when the game waits.
+
+    Attributes:
+        now (float): the time on the fake clock.
+        choices (iterator): the answers to the menus.
+        random (Random): picks the rooms.
+    """
+    def __init__(self, seed: int):
+        """
+        Inits script keyboard class.
+        Args
+            seed (int): the seed for picking rooms.
+        """
+        self.now = 0.0
+        self.choices = iter(["1", "1", "3"]) # Play, easy, then quit.
+        self.random = Random(seed)
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        if tm is not None:
+            self.now += tm + 0.01 # A little past the timeout, like a real keyboard.
+            return "", True
+        self.now += 0.5
+        if prompt.startswith("Your choice"):
+            return next(self.choices), False
+        if prompt.startswith("Do you want to drink"):
+            return "n", False
+        return str(self.random.randint(1, 3)), False
+
+    def pause(self, tm) -> None:
+        self.now += tm
+
+    def clock(self) -> float:
+        return self.now
+
+
+class Games:
+    """Stands in for a `Leaderboard` and keeps the finished games.
+
+    Attributes:
+        games (list[tuple[Player, float]]): the player and seconds of each game.
+    """
+    def __init__(self):
+        """
+        Inits games class.
+        """
+        self.games = []
+
+    def record(self, player, seconds: float) -> None:
+        self.games.append((player, seconds))
+
+
+class TestReplay(unittest.TestCase):
+    """Records sessions and checks that they play back to the end."""
+
+    def record(self, directory: str, seed: int, **options) -> str:
+        """
+        Records one session.
+        Args
+            directory (str): where the log is written.
+            seed (int): the seed of the session.
+            options: passed on to `run()`.
+        Returns
+            str: the path to the log.
+        """
+        filename = os.path.join(directory, f"{seed}.log")
+        log = InputLog(filename)
+        keyboard = RecordingKeyboard(ScriptKeyboard(seed), log, seed, 0)
+        with open(os.devnull, "w") as out, redirect_stdout(out):
+            run(keyboard, 0, seed, Interface, **options)
+        log.close()
+        return filename
+
+    def check(self, filename: str) -> None:
+        """
+        Plays back a log and checks that every record was used.
+        Args
+            filename (str): the path to the log.
+        Returns
+            None
+        """
+        finished, position, seconds = replay(filename)
+        self.assertTrue(finished)
+        self.assertEqual(position, len(read_log(filename)))
+
+    def test_replay(self):
+        with TemporaryDirectory() as directory:
+            for seed in range(5):
+                self.check(self.record(directory, seed))
+
+    def test_record_twice(self):
+        with TemporaryDirectory() as directory:
+            # The second recording replaces the first instead of being added after it.
+            filename = self.record(directory, 0)
+            first = read_log(filename)
+            self.assertEqual(self.record(directory, 0), filename)
+            self.assertEqual(read_log(filename), first)
+            self.check(filename)
+
+    def test_bad_header(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "game.log")
+            for data in [b"", MAGIC, HEADER.pack(MAGIC, 1), HEADER.pack(b"DESV", 2)]:
+                with open(filename, "wb") as file:
+                    file.write(data)
+                with self.assertRaises(ReplayError):
+                    read_log(filename)
+
+    def test_replay_with_leaderboard(self):
+        with TemporaryDirectory() as directory:
+            for seed in range(5):
+                games = Games()
+                self.check(self.record(directory, seed, leaderboard=games))
+                player, seconds = games.games[0]
+                self.assertGreater(player.battles, 0)
+                self.assertGreater(seconds, 0)
+
+    def test_replay_with_telemetry(self):
+        with TemporaryDirectory() as directory:
+            telemetry = Telemetry(os.path.join(directory, "events.jsonl"), interval=0.05)
+            for seed in range(5):
+                self.check(self.record(directory, seed, telemetry=telemetry))
+            telemetry.close()
+            events = read(telemetry.filename)
+            self.assertEqual(sum(event["event"] == "GameOver" for event in events), 5)
+
+
+class TestSave(unittest.TestCase):
+    """Saves games and resumes them."""
+
+    def test_stats(self):
+        player = Player(2, Interface(ScriptKeyboard(0)))
+        world = World(player)
+        generate_enemies(world, player.difficulty)
+        generate_graph(world)
+        player.hp, player.atk, player.battles, player.hits, player.seconds = 57, 8, 4, 61, 93.25
+        player.items = ["Key"]
+
+        resumed = Player(1, Interface(ScriptKeyboard(0)))
+        resumed_world, current = load_game(save_game(world, world["Hall"]), resumed)
+        self.assertEqual((resumed.hp, resumed.atk, resumed.tl, resumed.difficulty, resumed.items),
+                         (57, 8, player.tl, player.difficulty, ["Key"]))
+        self.assertEqual((resumed.battles, resumed.hits, resumed.seconds), (4, 61, 93.25))
+        self.assertEqual(current.name, world["Hall"].name)
+        self.assertEqual([r.name for r in resumed_world["Hall"].rooms], [r.name for r in world["Hall"].rooms])
+
+    def test_old_version(self):
+        player = Player(1, Interface(ScriptKeyboard(0)))
+        with self.assertRaises(ValueError):
+            load_game(b"DESV\x01" + bytes(20), player)
+
+    def test_resume(self):
+        with TemporaryDirectory() as directory:
+            save = os.path.join(directory, "game.sav")
+            player = Player(3, Interface(ScriptKeyboard(0)))
+            world = World(player)
+            generate_enemies(world, player.difficulty)
+            generate_graph(world)
+            write_save(save, world, world["Entrance"])
+
+            # The saved game is on hard, so the difficulty isn't asked for.
+            keyboard = ScriptKeyboard(0)
+            keyboard.choices = iter(["1", "3"]) # Play, then quit.
+            players = []
+            with open(os.devnull, "w") as out, redirect_stdout(out):
+                run(keyboard, 0, 0, Interface, save, on_game_over=players.append)
+            self.assertEqual([p.difficulty for p in players], [player.difficulty])
+            self.assertFalse(os.path.exists(save))
+
+
+if __name__ == "__main__":
+    unittest.main()
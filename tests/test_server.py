@@ -0,0 +1,102 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the server's resume codes, which let a player carry on a saved game after a
+disconnect. A saved game must never be played on two connections at once.
+"""
+
+import os
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from interface import Interface
+from keyboard import Keyboard
+from server import RESUME_CODE, claim, release, resume_file, session_limit
+
+
+class ScriptKeyboard(Keyboard):
+    """Keyboard that types a list of lines.
+
+    Attributes:
+        lines (iterator): the lines to type.
+    """
+    def __init__(self, lines: list):
+        """
+        Inits script keyboard class.
+        Args
+            lines (list[str]): the lines to type.
+        """
+        self.lines = iter(lines)
+
+    def read_line(self, prompt, tm=None) -> tuple:
+        return next(self.lines), False
+
+    def pause(self, tm) -> None:
+        pass
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+class TestResume(unittest.TestCase):
+    """Locks saved games and resumes them."""
+
+    def test_claim(self):
+        with TemporaryDirectory() as directory:
+            save = os.path.join(directory, "game.sav")
+            open(save, "wb").close()
+            lock = claim(save)
+            self.assertIsNotNone(lock)
+            self.assertIsNone(claim(save))
+
+            # The lock file stays while the game can still be resumed.
+            release(lock, save)
+            self.assertTrue(os.path.exists(save + ".lock"))
+            lock = claim(save)
+            self.assertIsNotNone(lock)
+
+            # And is deleted once the game is over.
+            os.remove(save)
+            release(lock, save)
+            self.assertFalse(os.path.exists(save + ".lock"))
+
+    def test_resume(self):
+        with TemporaryDirectory() as directory:
+            code = "0123456789abcdef0123"
+            save = os.path.join(directory, code + ".sav")
+            open(save, "wb").close()
+
+            # Another connection is playing the game, so a new game is started.
+            lock = claim(save)
+            io = QuietInterface(ScriptKeyboard([code, ""]))
+            new, new_lock = resume_file(io, directory)
+            self.assertIn("That game is being played on another connection.", io.history.tail(len(io.history)))
+            self.assertNotEqual(new, save)
+            self.assertTrue(RESUME_CODE.fullmatch(os.path.basename(new)[:-len(".sav")]))
+            release(new_lock, new)
+            release(lock, save)
+
+            # Once it has let go, the game can be resumed.
+            resumed, lock = resume_file(QuietInterface(ScriptKeyboard([code])), directory)
+            self.assertEqual(resumed, save)
+            release(lock, save)
+
+
+class TestSessionLimit(unittest.TestCase):
+    """Works out how many games can run at once."""
+
+    def test_session_limit(self):
+        self.assertGreaterEqual(session_limit(64), 1)
+        # Bigger stacks never fit more games.
+        self.assertLessEqual(session_limit(1024), session_limit(64))
+
+
+if __name__ == "__main__":
+    unittest.main()
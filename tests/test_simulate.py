@@ -0,0 +1,37 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the headless simulator, which has to play the same game as `main.play()`.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulate import HeadlessInterface, RandomWalk, TypingModel, play_game
+
+
+class TestSimulate(unittest.TestCase):
+    """Plays games without a terminal."""
+
+    def test_clock(self):
+        io = HeadlessInterface(RandomWalk())
+        self.assertEqual(io.clock(), 0.0)
+        io.keyboard.pause(1.5)
+        self.assertEqual(io.clock(), 1.5)
+        self.assertFalse(io.streaming)
+
+    def test_play_game(self):
+        random.seed(1)
+        for i in range(20):
+            won, hp, rooms, battles = play_game(1, TypingModel(), RandomWalk())
+            self.assertEqual(won, hp > 0)
+            self.assertGreaterEqual(rooms, battles)
+            self.assertGreaterEqual(battles, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the soak test, and for setting up a world again, which must leave nothing behind
+from the last dungeon.
+"""
+
+import os
+import random
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from agents import AgentInterface, AgentKeyboard, GreedyAgent
+from interface import Interface
+from keyboard import Keyboard
+from locations import World, generate_enemies, generate_graph
+from main import run
+from metrics import disable, enable
+from player import Player
+from soak import Soak, check
+
+
+class QuietInterface(Interface):
+    """Interface that draws nothing. Inherits from `Interface`."""
+
+    def write(self, text) -> None:
+        pass
+
+
+def layout(world: World) -> tuple:
+    """
+    Describes a world's dungeon.
+    Args
+        world (World): the game.
+    Returns
+        tuple[dict, dict]: the names of the rooms next to each room and of the enemies in each room.
+    """
+    return ({key: [room.name for room in location.rooms] for key, location in world.locations.items()},
+            {key: [enemy.key for enemy in location.enemies] for key, location in world.locations.items()})
+
+
+class TestReset(unittest.TestCase):
+    """Sets up the same world many times."""
+
+    def test_repeat(self):
+        world = World(Player(3, QuietInterface(Keyboard())))
+        rooms = len(world.locations)
+        for i in range(50):
+            world.planner = world.minimap = object()
+            random.seed(i)
+            generate_enemies(world, world.player.difficulty)
+            generate_graph(world)
+
+            # The same dungeon as a new world would get from the same seed. The entrance, stairway and hall are
+            # joined by three one-way connections, and the other rooms by a tree of two-way ones.
+            fresh = World(Player(3, QuietInterface(Keyboard())))
+            random.seed(i)
+            generate_enemies(fresh, fresh.player.difficulty)
+            generate_graph(fresh)
+            self.assertEqual(layout(world), layout(fresh))
+            self.assertEqual(sum(len(location.rooms) for location in world.locations.values()), 3 + 2 * (rooms - 3))
+            self.assertIsNone(world.planner)
+            self.assertIsNone(world.minimap)
+            for location in world.locations.values():
+                self.assertLessEqual(len(location.enemies), len(location.type.enemies) + 4)
+
+
+class TestSoak(unittest.TestCase):
+    """Runs a short soak test and checks the measurements."""
+
+    def tearDown(self):
+        disable()
+
+    def test_soak(self):
+        out = StringIO()
+        soak = Soak(5, out)
+        enable(soak.metrics)
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            run(AgentKeyboard(GreedyAgent(1), 20), 0, 0, AgentInterface, on_game_over=soak.record)
+        self.assertEqual(soak.games, 20)
+        self.assertEqual([sample[0] for sample in soak.samples], [5, 10, 15, 20])
+        self.assertTrue(all(sample[3] > 0 for sample in soak.samples))
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
+
+    def test_check(self):
+        flat = [(i, 100 * 2 ** 20, 1000, 30.0) for i in range(10)]
+        self.assertEqual(check(flat), [])
+        growing = [(i, (100 + 10 * i) * 2 ** 20, 1000 + 100 * i, 30.0 * (i + 1)) for i in range(10)]
+        self.assertEqual(len(check(growing)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
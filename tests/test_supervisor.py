@@ -0,0 +1,75 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the supervisor, which hands each connection to a worker process by sending the
+socket over a Unix socket. The worker must play the game on the socket it was sent and say when it is done.
+"""
+
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from interface import CHOICE_PROMPT
+from supervisor import Worker
+
+
+def read_until(conn: socket.socket, text: str) -> bytes:
+    """
+    Reads from a connection until some text arrives.
+    Args
+        conn (socket.socket): the connection.
+        text (str): the text to wait for.
+    Returns
+        bytes: everything that was read.
+    """
+    data = b""
+    while text.encode() not in data:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TestHandOver(unittest.TestCase):
+    """Sends connections to a worker process."""
+
+    def setUp(self):
+        self.worker = Worker(0, 2)
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_session(self):
+        for i in range(2):
+            player, theirs = socket.socketpair()
+            player.settimeout(30)
+            self.worker.channel.settimeout(30)
+            self.assertTrue(self.worker.hand_over(theirs))
+            theirs.close() # The worker has its own copy.
+            self.assertEqual((self.worker.sessions, self.worker.total), (1, i + 1))
+
+            # The worker plays the game on the socket, and says so when the player quits.
+            self.assertIn(CHOICE_PROMPT.encode(), read_until(player, CHOICE_PROMPT))
+            player.sendall(b"3\r\n")
+            self.assertEqual(self.worker.channel.recv(16), b"-")
+            while player.recv(65536): # The worker closes the socket once the game is over.
+                pass
+            player.close()
+            self.worker.sessions -= 1
+
+    def test_dead_worker(self):
+        self.worker.process.terminate()
+        self.worker.process.join()
+        player, theirs = socket.socketpair()
+        self.assertFalse(self.worker.hand_over(theirs))
+        self.assertEqual(self.worker.sessions, 0)
+        player.close()
+        theirs.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
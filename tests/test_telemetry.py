@@ -0,0 +1,64 @@
+"""
+ICS3U
+Paul Chen
+This file holds the tests for the telemetry writer: events are written in order, files are rotated and
+compressed, and a file that can't be written drops events instead of stopping the game or `close()`.
+"""
+
+import os
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from telemetry import Telemetry, read
+
+
+class TestTelemetry(unittest.TestCase):
+    """Writes events with `Telemetry` and reads them back."""
+
+    def test_write(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "events.jsonl")
+            telemetry = Telemetry(filename, interval=0.05)
+            for i in range(100):
+                telemetry.put({"event": "Test", "i": i})
+            telemetry.close()
+            self.assertEqual([record["i"] for record in read(filename)], list(range(100)))
+            self.assertEqual((telemetry.written, telemetry.dropped), (100, 0))
+
+    def test_rotate(self):
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "events.jsonl")
+            telemetry = Telemetry(filename, max_bytes=500, compress=True, batch=10, interval=0.05)
+            for i in range(200):
+                telemetry.put({"event": "Test", "i": i})
+            telemetry.close()
+            old = sorted((name for name in os.listdir(directory) if name.endswith(".gz")),
+                         key=lambda name: int(name.split(".")[2]))
+            self.assertTrue(old)
+            records = [record for name in old for record in read(os.path.join(directory, name))] + read(filename)
+            self.assertEqual([record["i"] for record in records], list(range(200)))
+
+    def test_bad_path(self):
+        with TemporaryDirectory() as directory:
+            with self.assertRaises(OSError):
+                Telemetry(os.path.join(directory, "missing", "events.jsonl"))
+
+    @unittest.skipUnless(os.path.exists("/dev/full"), "needs /dev/full")
+    def test_full_disk(self):
+        telemetry = Telemetry("/dev/full", queue_size=2, interval=0.01)
+        for i in range(1000):
+            telemetry.put({"event": "Test", "i": i})
+        closer = Thread(target=telemetry.close, daemon=True)
+        closer.start()
+        closer.join(5)
+        self.assertFalse(closer.is_alive())
+        self.assertEqual(telemetry.written, 0)
+        self.assertEqual(telemetry.dropped, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()